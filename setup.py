@@ -6,6 +6,7 @@ setup(
     version='0.0.0',
     packages=find_packages(),
     install_requires=[
-        'pygame'
+        'pygame',
+        'numpy'
     ]
 )
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Headless frame-time benchmarks for Render.
+
+Renders reproducible scenes of increasing size into an offscreen surface and prints one JSON object per
+(scene, backend) run, so results can be diffed or collected by CI:
+
+    python src/benchmark.py --frames 120 --scenes cube prisms-100 --backends painter zbuffer --output bench.jsonl
+"""
+from utils.Headless import init_headless
+from utils.Camera import Camera
+from utils.Point import Point3D, Plane
+from utils.Polygon import Polygon3D, Prism, Cube, CompositeShape
+from utils.Mesh import Mesh
+from utils.Render import Render
+from constants import VIEWPORT_RESOLUTION
+import numpy as np
+import argparse
+import json
+import math
+import resource
+import sys
+import time
+import tracemalloc
+
+XY = Plane((0, 1))
+YZ = Plane((1, 2))
+
+def prism_field(count: int, seed: int = 0) -> CompositeShape:
+    """
+    count prisms of assorted sizes spread over (and a little beyond) the viewport, at assorted depths.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = VIEWPORT_RESOLUTION
+
+    origins = rng.uniform((-200, -200, 0), (width + 200, height + 200, 2000), (count, 3))
+    edges = rng.uniform(20, 120, (count, 3))
+
+    return CompositeShape([Prism(Point3D(*origin), *edge) for origin, edge in zip(origins.tolist(), edges.tolist())])
+
+def subdivided_cube(origin: Point3D, edge: float, divisions: int) -> Polygon3D:
+    """
+    A cube whose sides are each split into divisions x divisions quads, 6 * divisions^2 faces in total.
+    """
+    steps = np.linspace(0, edge, divisions + 1)
+    u, v = np.meshgrid(steps, steps, indexing="ij")
+    u, v = u.reshape(-1), v.reshape(-1)
+    zero, full = np.zeros_like(u), np.full_like(u, edge)
+
+    # One grid per side, wound so the normals point outwards.
+    sides = [
+        np.stack([v, u, zero], axis=1), np.stack([u, v, full], axis=1),
+        np.stack([zero, v, u], axis=1), np.stack([full, u, v], axis=1),
+        np.stack([u, zero, v], axis=1), np.stack([v, full, u], axis=1)
+    ]
+
+    row = divisions + 1
+    i, j = np.meshgrid(np.arange(divisions), np.arange(divisions), indexing="ij")
+    corner = (i * row + j).reshape(-1)
+    quads = np.stack([corner, corner + row, corner + row + 1, corner + 1], axis=1)
+
+    vertices = np.concatenate(sides) + origin.coords
+    faces = np.concatenate([quads + side * row * row for side in range(6)])
+
+    # Grid points along the cube's edges exist once per side, weld them so the mesh is closed.
+    vertices, inverse = np.unique(vertices.round(9), axis=0, return_inverse=True)
+
+    return Polygon3D.from_mesh(Mesh(vertices, inverse.reshape(-1)[faces]))
+
+SCENES = {
+    "cube": lambda: Cube(Point3D(1000, 480, 0), 200),
+    "prisms-100": lambda: prism_field(100),
+    "prisms-500": lambda: prism_field(500),
+    "prisms-2000": lambda: prism_field(2000),
+    "mesh-20k": lambda: subdivided_cube(Point3D(830, 290, 100), 500, 58),
+    "mesh-100k": lambda: subdivided_cube(Point3D(830, 290, 100), 500, 129)
+}
+
+def face_count(scene) -> int:
+    if isinstance(scene, CompositeShape):
+        return sum(mesh.face_count for mesh in scene.meshes)
+
+    return scene.mesh.face_count
+
+def render_frames(render: Render, scene, frames: int) -> list[float]:
+    """
+    Renders frames frames, turning the scene a little each time so nothing can be cached across frames.
+    Returns the per-frame latencies in seconds.
+    """
+    center = scene.center()
+    latencies = []
+
+    for _ in range(frames):
+        start = time.perf_counter()
+
+        scene.rotate(center, math.radians(1), XY)
+        render.begin_frame()
+        render.surface.fill((255, 255, 255))
+        render.draw_polygon(scene)
+        render.end_frame()
+
+        latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+def run(name: str, backend: str, frames: int, warmup: int, surface, workers: int | None = None) -> dict:
+    scene = SCENES[name]()
+    render = Render(Camera(0, 0, 0, 0, 0), surface, backend, workers=workers)
+
+    render_frames(render, scene, warmup)
+    latencies = np.array(render_frames(render, scene, frames))
+
+    # Peak memory is measured on a separate short pass, tracemalloc slows allocation down too much to time under it.
+    tracemalloc.start()
+    render_frames(render, scene, min(frames, 5))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    render.close()
+
+    return {
+        "scene": name,
+        "backend": backend,
+        "faces": face_count(scene),
+        "frames": frames,
+        "resolution": list(surface.get_size()),
+        "fps": frames / latencies.sum(),
+        "latency_ms": {
+            "mean": latencies.mean() * 1000,
+            "p50": np.percentile(latencies, 50) * 1000,
+            "p90": np.percentile(latencies, 90) * 1000,
+            "p99": np.percentile(latencies, 99) * 1000,
+            "max": latencies.max() * 1000
+        },
+        "peak_frame_bytes": peak,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Render frame-time benchmarks.")
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=list(SCENES))
+    parser.add_argument("--backends", nargs="+", choices=["painter", "zbuffer", "tiled"], default=["painter", "zbuffer"])
+    parser.add_argument("--workers", type=int, help="Worker processes for the tiled backend (default: one per core).")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--output", help="Append results to this file instead of printing them.")
+    args = parser.parse_args()
+
+    surface = init_headless()
+    output = open(args.output, "a") if args.output else sys.stdout
+
+    for name in args.scenes:
+        for backend in args.backends:
+            print(json.dumps(run(name, backend, args.frames, args.warmup, surface, args.workers)), file=output, flush=True)
+
+    if args.output:
+        output.close()
@@ -18,4 +18,12 @@ class PolygonVertexError(GraphicsException):
 
 class PolygonFaceError(GraphicsException):
      def __init__(self, message="Polygon3D faces of incorrect or inconsistent type"):
-          super().__init__(message)
\ No newline at end of file
+          super().__init__(message)
+
+class MeshError(GraphicsException):
+    def __init__(self, message="Mesh vertex or index buffers of incorrect shape or out of range"):
+        super().__init__(message)
+
+class MeshFormatError(GraphicsException):
+    def __init__(self, message="Mesh file malformed or of unsupported format"):
+        super().__init__(message)
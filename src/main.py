@@ -2,9 +2,17 @@ import pygame as pg
 from pygame import gfxdraw
 from utils.Camera import Camera
 from utils.Point import Point3D, Point2D, Plane
-from utils.Polygon import Face, Cube, CompositeShape
+from utils.Polygon import Face, Cube
 from utils.Render import Render
+from utils.Transform import Transform
+from utils.Instancing import InstancedShape
+from utils.Headless import init_headless
+from utils.Capture import FrameCapture
+from utils.Shading import Shader, SHADING_MODES
+from utils.Loop import GameLoop, QualityController
+from utils.functions import ATTENUATION_CURVES
 from constants import VIEWPORT_RESOLUTION
+import argparse
 import math
 
 XY = Plane((0, 1))
@@ -12,35 +20,60 @@ XZ = Plane((0, 2))
 YZ = Plane((1, 2))
 
 if __name__ == "__main__":
-    pg.init() 
-    
-    window = pg.display.set_mode(VIEWPORT_RESOLUTION)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headless", action="store_true", help="Render offscreen, without opening a window.")
+    parser.add_argument("--frames", type=int, default=0, help="Stop after this many frames (0 runs until the window is closed).")
+    parser.add_argument("--backend", choices=["painter", "zbuffer", "tiled"], default="painter")
+    parser.add_argument("--fps", type=int, default=60, help="Target frame rate.")
+    parser.add_argument("--adaptive", action="store_true", help="Lower antialiasing and resolution when frames miss the target frame rate.")
+    parser.add_argument("--shading", choices=SHADING_MODES, help="Light mesh faces instead of drawing their plain colours.")
+    parser.add_argument("--attenuation", choices=list(ATTENUATION_CURVES), help="Depth attenuation curve of the projection.")
+    parser.add_argument("--capture", help="Record frames, to this directory as PNGs or to this file as raw RGB (see --capture-format).")
+    parser.add_argument("--capture-format", choices=["png", "raw"], default="png")
+    parser.add_argument("--capture-policy", choices=["block", "drop"], default="block", help="What to do when the writer falls behind.")
+    args = parser.parse_args()
+
+    if args.headless:
+        window = init_headless()
+    else:
+        pg.init() 
+        window = pg.display.set_mode(VIEWPORT_RESOLUTION)
+
     window.fill((255, 255, 255))
-    pg.display.update()
+    if not args.headless:
+        pg.display.update()
 
-    render = Render(Camera(1, 2, 3, 4, 5), window)
-    poly = Cube(Point3D(300, 300, 0), 100)
-    poly2 = Cube(Point3D(450, 300, 0), 100)
+    # Render clears and presents only the regions that changed, the cursor cube is a small part of the window.
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture, window.get_size(), args.capture_format, args.capture_policy)
 
-    construct = CompositeShape([poly, poly2])
+    render = Render(Camera(0, 0, 0, 0, 0), window, args.backend, dirty_rects=True, capture=capture,
+                    shading=Shader(args.shading) if args.shading else None, attenuation=args.attenuation)
 
-    angle = 0
+    # The cube following the mouse is built once and moved with its instance transform every frame.
+    poly = InstancedShape(Cube(Point3D(0, 0, 0), 100).mesh)
+    cursor = poly.add(Transform.translation((300, 300, 0)))
 
-    while True:
-        angle += 0.1
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                pg.quit()
-                exit()
+    # The cube spins at 6 degrees a second whatever the frame rate, see GameLoop.
+    angle = 0
 
-        render.draw_polygon(poly)
+    def update(dt: float) -> bool:
+        global angle
+        angle = (angle + 6 * dt) % 360
 
         x, y = pg.mouse.get_pos()
 
-        poly = Cube(Point3D(x, y, 0), 100)
-        poly.rotate(poly.center(), math.radians(angle), XY)
+        # Same placement as Cube(Point3D(x, y, 0), 100).rotate(center, radians(angle), XY), see Transform.rotation
+        # for the extra half turn.
+        spin = Transform.rotation(Point3D(50, 50, 50), math.radians(angle) + math.pi, XY)
+        poly.set_transform(cursor, Transform.translation((x, y, 0)) @ spin)
 
-        angle = angle % 360
-        pg.display.update()
-        window.fill((255, 255, 255))
- 
\ No newline at end of file
+        return True
+
+    quality = QualityController(1 / args.fps) if args.adaptive else None
+    loop = GameLoop(render, update, lambda render: render.draw_polygon(poly), target_fps=args.fps, quality=quality, present=not args.headless)
+    loop.run(args.frames)
+
+    render.close()
+    pg.quit()
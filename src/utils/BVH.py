@@ -0,0 +1,366 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+from utils.Projection import project
+from constants import VIEWPORT_RESOLUTION
+import numpy as np
+
+# Point queries skip the top levels of the tree, starting from the (at most 2^PICK_DEPTH) nodes this far down.
+PICK_DEPTH = 4
+
+class BVH:
+    """
+    A bounding volume hierarchy of axis aligned boxes over the faces of several meshes (the components of a CompositeShape).
+
+    The upper levels of the tree split the components, and below each component sits its own subtree splitting its faces.
+    Every node covers a contiguous range of BVH.order, the face numbers (numbered consecutively mesh after mesh) in tree order,
+    so a node that is entirely visible hands over its whole range without visiting its children.
+
+    Nodes are stored in pre-order (children always come after their parent) in flat arrays. Each component's subtree occupies
+    a contiguous run of nodes, which lets BVH.refit update one component without touching the rest of the tree.
+    """
+
+    def __init__(self, meshes: list[Mesh], leaf_size: int = 8):
+        self.meshes = list(meshes)
+        self.leaf_size = leaf_size
+        self._build()
+
+    def _build(self):
+        meshes = self.meshes
+        self.face_starts = np.cumsum([0] + [mesh.face_count for mesh in meshes])
+        self.versions = [mesh.version for mesh in meshes]
+        self.component_nodes = [None] * len(meshes)
+
+        self._begin()
+        bounds = [mesh.face_bounds() for mesh in meshes]
+        nonempty = [index for index, mesh in enumerate(meshes) if mesh.face_count]
+        if nonempty:
+            self._build_components(nonempty, bounds, -1)
+
+        self.lo, self.hi, self.left, self.right, self.parent, self.start, self.end, self.order = self._finish()
+
+        self._pick_seeds = None
+        self._screen_key = None
+
+    def _begin(self):
+        self._lo, self._hi, self._left, self._right, self._parent, self._start, self._end = ([] for _ in range(7))
+        self._order = []
+
+    def _finish(self) -> tuple[np.ndarray]:
+        arrays = (
+            np.array(self._lo, dtype=np.float64).reshape(-1, 3), np.array(self._hi, dtype=np.float64).reshape(-1, 3),
+            np.array(self._left, dtype=np.int64), np.array(self._right, dtype=np.int64), np.array(self._parent, dtype=np.int64),
+            np.array(self._start, dtype=np.int64), np.array(self._end, dtype=np.int64), np.array(self._order, dtype=np.int64)
+        )
+
+        del self._lo, self._hi, self._left, self._right, self._parent, self._start, self._end, self._order
+        return arrays
+
+    def _new_node(self, parent: int) -> int:
+        self._lo.append(None)
+        self._hi.append(None)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._parent.append(parent)
+        self._start.append(len(self._order))
+        self._end.append(None)
+
+        return len(self._lo) - 1
+
+    def _close_node(self, node: int, lo: np.ndarray, hi: np.ndarray):
+        self._lo[node] = lo
+        self._hi[node] = hi
+        self._end[node] = len(self._order)
+
+    def _build_components(self, components: list[int], bounds: list, parent: int) -> int:
+        if len(components) == 1:
+            component = components[0]
+            lo, hi = bounds[component]
+            first = len(self._lo)
+            node = self._build_faces(np.arange(len(lo)), lo, hi, self.face_starts[component], parent)
+            self.component_nodes[component] = (first, len(self._lo))
+
+            return node
+
+        node = self._new_node(parent)
+        lo = np.array([bounds[component][0].min(axis=0) for component in components])
+        hi = np.array([bounds[component][1].max(axis=0) for component in components])
+
+        halves = self._split((lo + hi) / 2)
+        self._left[node] = self._build_components([components[i] for i in halves[0]], bounds, node)
+        self._right[node] = self._build_components([components[i] for i in halves[1]], bounds, node)
+        self._close_node(node, lo.min(axis=0), hi.max(axis=0))
+
+        return node
+
+    def _build_faces(self, faces: np.ndarray, lo: np.ndarray, hi: np.ndarray, face_start: int, parent: int) -> int:
+        node = self._new_node(parent)
+
+        if len(faces) <= self.leaf_size:
+            self._order.extend((faces + face_start).tolist())
+        else:
+            halves = self._split((lo[faces] + hi[faces]) / 2)
+            self._left[node] = self._build_faces(faces[halves[0]], lo, hi, face_start, node)
+            self._right[node] = self._build_faces(faces[halves[1]], lo, hi, face_start, node)
+
+        self._close_node(node, lo[faces].min(axis=0), hi[faces].max(axis=0))
+
+        return node
+
+    @staticmethod
+    def _split(centers: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Median split of the items along the axis their centers are most spread over.
+        """
+        axis = np.argmax(centers.max(axis=0) - centers.min(axis=0))
+        middle = len(centers) // 2
+        ranked = np.argpartition(centers[:, axis], middle)
+
+        return ranked[:middle], ranked[middle:]
+
+    def refit(self, component: int):
+        """
+        Recomputes the boxes of one component's subtree and of its ancestors, without rebuilding anything.
+        The split structure is kept, so refitting after large motions can leave looser boxes than a rebuild would.
+        """
+        if self.component_nodes[component] is None:
+            return
+
+        first, last = self.component_nodes[component]
+        lo, hi = self.meshes[component].face_bounds()
+        face_start = self.face_starts[component]
+
+        nodes = np.arange(first, last)
+        leaves = nodes[self.left[nodes] < 0]
+        ranges = self.start[leaves]
+        local = self.order[self.start[first]:self.end[first]] - face_start
+        offset = self.start[first]
+
+        # Leaves cover consecutive runs of the component's range, in order.
+        self.lo[leaves] = np.minimum.reduceat(lo[local], ranges - offset, axis=0)
+        self.hi[leaves] = np.maximum.reduceat(hi[local], ranges - offset, axis=0)
+
+        for node in nodes[self.left[nodes] >= 0][::-1].tolist():
+            self._refit_node(node)
+
+        node = self.parent[first]
+        while node >= 0:
+            self._refit_node(node)
+            node = self.parent[node]
+
+        self.versions[component] = self.meshes[component].version
+        self._screen_key = None
+
+    def _refit_node(self, node: int):
+        left, right = self.left[node], self.right[node]
+        self.lo[node] = np.minimum(self.lo[left], self.lo[right])
+        self.hi[node] = np.maximum(self.hi[left], self.hi[right])
+
+    def replace(self, component: int, mesh: Mesh):
+        """
+        Swaps the mesh of one component (an LODShape changing level) and rebuilds that component's subtree only,
+        splicing it in place of the old one. The boxes of its ancestors are refitted, the upper levels keep their splits.
+        """
+        old = self.meshes[component]
+        self.meshes[component] = mesh
+
+        if self.component_nodes[component] is None or not mesh.face_count:
+            # The component enters or leaves the upper levels, which are only ever built whole.
+            self._build()
+            return
+
+        first, last = self.component_nodes[component]
+        parent = self.parent[first]
+        order_start, order_end = self.start[first], self.end[first]
+        next_start = self.face_starts[component + 1]
+        added_faces = mesh.face_count - old.face_count
+
+        lo, hi = mesh.face_bounds()
+        self._begin()
+        self._build_faces(np.arange(mesh.face_count), lo, hi, self.face_starts[component], -1)
+        sub_lo, sub_hi, sub_left, sub_right, sub_parent, sub_start, sub_end, sub_order = self._finish()
+        added_nodes = len(sub_lo) - (last - first)
+
+        # The rest of the tree keeps its node numbers and face ranges, shifted past the new subtree.
+        def shift(values: np.ndarray, threshold: int, amount: int) -> np.ndarray:
+            return np.where(values >= threshold, values + amount, values)
+
+        def splice(array: np.ndarray, subtree: np.ndarray) -> np.ndarray:
+            return np.concatenate([array[:first], subtree, array[last:]])
+
+        self.lo = splice(self.lo, sub_lo)
+        self.hi = splice(self.hi, sub_hi)
+        self.left = splice(shift(self.left, last, added_nodes), np.where(sub_left >= 0, sub_left + first, -1))
+        self.right = splice(shift(self.right, last, added_nodes), np.where(sub_right >= 0, sub_right + first, -1))
+        self.parent = splice(shift(self.parent, last, added_nodes), np.where(sub_parent >= 0, sub_parent + first, parent))
+        self.start = splice(shift(self.start, order_end, added_faces), sub_start + order_start)
+        self.end = splice(shift(self.end, order_end, added_faces), sub_end + order_start)
+        # Components sit in the tree in spatial order, not in mesh order: later meshes' faces can be on either side.
+        order = shift(self.order, next_start, added_faces)
+        self.order = np.concatenate([order[:order_start], sub_order, order[order_end:]])
+
+        self.face_starts[component + 1:] += added_faces
+        self.component_nodes = [
+            nodes if nodes is None or nodes[0] < last else (nodes[0] + added_nodes, nodes[1] + added_nodes)
+            for nodes in self.component_nodes
+        ]
+        self.component_nodes[component] = (first, first + len(sub_lo))
+
+        node = parent
+        while node >= 0:
+            self._refit_node(node)
+            node = self.parent[node]
+
+        self.versions[component] = mesh.version
+        self._pick_seeds = None
+        self._screen_key = None
+
+    def update(self, meshes: list[Mesh] | None = None) -> int:
+        """
+        Refits every component whose mesh changed since it was last fitted. Returns how many were refitted.
+        meshes, given, is the current list of meshes (CompositeShape.meshes): components now drawing another mesh
+        than the one the tree was built over, like LODShapes after a level change, are swapped in through replace.
+        """
+        if meshes is not None:
+            for component, mesh in enumerate(meshes):
+                if mesh is not self.meshes[component]:
+                    self.replace(component, mesh)
+
+        changed = [index for index, mesh in enumerate(self.meshes) if mesh.version != self.versions[index]]
+        for component in changed:
+            self.refit(component)
+
+        return len(changed)
+
+    def query(self, viewport: tuple[int] = VIEWPORT_RESOLUTION, near: float = -np.inf, far: float = np.inf, projection = project) -> list[np.ndarray]:
+        """
+        Frustum query. Walks the tree one level at a time, projecting the 8 corners of every box on the frontier at once,
+        and drops whole subtrees whose screen bounds miss the viewport or whose depth range misses [near, far].
+
+        Returns, for each mesh, the array of its face indices that may be visible.
+        """
+        width, height = viewport
+        accepted = []
+
+        frontier = np.zeros(1, dtype=np.int64) if len(self.lo) else np.zeros(0, dtype=np.int64)
+        corner_mask = np.array([[(i >> axis) & 1 for axis in range(3)] for i in range(8)], dtype=bool)
+
+        while len(frontier):
+            lo, hi = self.lo[frontier], self.hi[frontier]
+            corners = np.where(corner_mask[None], hi[:, None], lo[:, None]).reshape(-1, 3)
+            screen = projection(corners).reshape(-1, 8, 2)
+
+            smin, smax = screen.min(axis=1), screen.max(axis=1)
+            touching = (smax[:, 0] >= 0) & (smin[:, 0] <= width) & (smax[:, 1] >= 0) & (smin[:, 1] <= height) & (hi[:, 2] > near) & (lo[:, 2] < far)
+            contained = (smin[:, 0] >= 0) & (smax[:, 0] <= width) & (smin[:, 1] >= 0) & (smax[:, 1] <= height) & (lo[:, 2] > near) & (hi[:, 2] < far)
+
+            leaf = self.left[frontier] < 0
+            done = touching & (contained | leaf)
+            accepted.extend(zip(self.start[frontier[done]].tolist(), self.end[frontier[done]].tolist()))
+
+            descend = frontier[touching & ~done]
+            frontier = np.concatenate([self.left[descend], self.right[descend]])
+
+        faces = np.concatenate([self.order[start:end] for start, end in accepted]) if accepted else np.zeros(0, dtype=np.int64)
+        faces.sort()
+
+        splits = np.searchsorted(faces, self.face_starts[1:-1])
+        return [part - start for part, start in zip(np.split(faces, splits), self.face_starts[:-1])]
+
+    def pick(self, points: np.ndarray, projection = project, key = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Point query, for picking. Walks the tree for every screen point at once, descending into the boxes whose
+        projected corners surround the point. The walk starts PICK_DEPTH levels down and moves two levels at a time,
+        since with a few points the cost is in the number of steps rather than the number of boxes.
+
+        key identifies the projection (see Picker, which passes the camera and its version). Given one, the screen
+        bounds of every box are kept until the key or the boxes change, so picks from an unmoving camera (hovering
+        the mouse) only project the boxes no earlier pick reached.
+
+        Returns matching arrays of point numbers and faces (numbered consecutively mesh after mesh) that may be drawn
+        under those points.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        seeds, jumps = self._pick_steps()
+
+        rays = np.repeat(np.arange(len(points)), len(seeds))
+        nodes = np.tile(seeds, len(points))
+        accepted_rays, accepted_nodes = [], []
+
+        while len(nodes):
+            # Points share boxes, each box is projected once per step. A single point never visits a box twice.
+            if len(points) > 1:
+                boxes, box = np.unique(nodes, return_inverse=True)
+            else:
+                boxes, box = nodes, slice(None)
+            bounds = self._screen_bounds(boxes, projection, key)
+
+            under = points[rays]
+            inside = ((under >= bounds[box, 0]) & (under <= bounds[box, 1])).all(axis=1)
+            rays, nodes = rays[inside], nodes[inside]
+
+            leaf = self.left[nodes] < 0
+            accepted_rays.append(rays[leaf])
+            accepted_nodes.append(nodes[leaf])
+
+            rays, nodes = np.repeat(rays[~leaf], 4), jumps[nodes[~leaf]].reshape(-1)
+            rays, nodes = rays[nodes >= 0], nodes[nodes >= 0]
+
+        rays = np.concatenate(accepted_rays) if accepted_rays else np.zeros(0, dtype=np.int64)
+        nodes = np.concatenate(accepted_nodes) if accepted_nodes else np.zeros(0, dtype=np.int64)
+
+        # Every leaf covers order[start:end].
+        counts = self.end[nodes] - self.start[nodes]
+        positions = np.repeat(self.start[nodes] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+        return np.repeat(rays, counts), self.order[positions]
+
+    def _screen_bounds(self, nodes: np.ndarray, projection, key) -> np.ndarray:
+        """
+        The (N, 2, 2) screen space boxes (min and max corner) of the given nodes' boxes, from the cache for key.
+        """
+        if key is None:
+            return _project_boxes(self.lo[nodes], self.hi[nodes], projection)
+
+        if key != self._screen_key:
+            self._screen_key = key
+            self._screen = np.empty((len(self.lo), 2, 2))
+            self._projected = np.zeros(len(self.lo), dtype=bool)
+
+        missing = nodes[~self._projected[nodes]]
+        if len(missing):
+            self._screen[missing] = _project_boxes(self.lo[missing], self.hi[missing], projection)
+            self._projected[missing] = True
+
+        return self._screen[nodes]
+
+    def _pick_steps(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The nodes pick starts from, and for every inner node the (up to 4, padded with -1) nodes two levels below it,
+        or its leaf children. The structure never changes after construction, only the boxes do, so both are cached.
+        """
+        if self._pick_seeds is None:
+            frontier = np.zeros(1 if len(self.lo) else 0, dtype=np.int64)
+            seeds = []
+            for _ in range(PICK_DEPTH):
+                leaf = self.left[frontier] < 0
+                seeds.append(frontier[leaf])
+                frontier = np.concatenate([self.left[frontier[~leaf]], self.right[frontier[~leaf]]])
+
+            # Leaves have no children, their rows are never read.
+            children = np.maximum(np.stack([self.left, self.right], axis=1), 0)
+            below = np.stack([self.left[children], self.right[children]], axis=2)
+            itself = np.stack([children, np.full_like(children, -1)], axis=2)
+
+            self._pick_seeds = np.concatenate(seeds + [frontier])
+            self._pick_jumps = np.where((self.left[children] >= 0)[..., None], below, itself).reshape(-1, 4)
+
+        return self._pick_seeds, self._pick_jumps
+
+_CORNERS = np.array([[(i >> axis) & 1 for axis in range(3)] for i in range(8)], dtype=bool)
+
+def _project_boxes(lo: np.ndarray, hi: np.ndarray, projection) -> np.ndarray:
+    # The screen box of a box is the one around its 8 projected corners.
+    corners = np.where(_CORNERS[None], hi[:, None], lo[:, None]).reshape(-1, 3)
+    screen = projection(corners).reshape(-1, 8, 2)
+
+    return np.stack([screen.min(axis=1), screen.max(axis=1)], axis=1)
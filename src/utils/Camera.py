@@ -1,8 +1,175 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+from utils.Point import Point3D, Plane
+from utils.Projection import Projection, VanishingPointProjection, project_homogeneous
+from utils.Transform import Transform
+from constants import VIEWPORT_RESOLUTION
+import numpy as np
+
+def _setting(name: str) -> property:
+    """
+    A camera attribute whose assignment invalidates the cached matrices.
+    """
+    attribute = "_" + name
+
+    def get(camera: Camera):
+        return getattr(camera, attribute)
+
+    def set(camera: Camera, value):
+        setattr(camera, attribute, value)
+        camera._changed()
+
+    return property(get, set)
+
 class Camera:
-    def __init__(self, x: float, y: float, z: float, theta: float, phi: float):
-        self.x = x
-        self.y = y
-        self.z = z 
+    """
+    The viewpoint Render draws from. The camera sits at (x, y, z) away from its rest position, turned by theta
+    (yaw, in the xz plane) and phi (pitch, in the yz plane) around pivot, by default the viewport center at depth 0.
+    At rest (everything 0) the view is the original fixed one, so scenes look the same as with no camera at all.
+
+    Rendering moves the world instead of the camera: Camera.view is the transform taking world vertices to camera
+    space, where projection (by default the original vanishing-point one) maps them to the screen. Both are only
+    computed when an attribute changes and then reused for every vertex. For matrix projections they are folded into
+    one matrix, see Camera.matrix, so projecting a vertex is a single matrix product whatever the view.
+
+    Camera.version changes with every change, so caches of screen coordinates can tell when they are stale.
+    """
+    x = _setting("x")
+    y = _setting("y")
+    z = _setting("z")
+    theta = _setting("theta")
+    phi = _setting("phi")
+    projection = _setting("projection")
+    pivot = _setting("pivot")
+
+    def __init__(self, x: float, y: float, z: float, theta: float, phi: float, projection: Projection | None = None, pivot: tuple[float] | None = None):
+        self._x = x
+        self._y = y
+        self._z = z
+
+        self._theta = theta
+        self._phi = phi
+
+        self._projection = projection if projection is not None else VanishingPointProjection()
+        self._pivot = pivot or (VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2, 0)
+
+        self.version = 0
+        self._view = None
+        self._at_rest = None
+        self._matrix = None
+
+    def _changed(self):
+        self.version += 1
+        self._view = None
+        self._at_rest = None
+        self._matrix = None
+
+    def move(self, dx: float, dy: float, dz: float) -> Camera:
+        self._x += dx
+        self._y += dy
+        self._z += dz
+        self._changed()
+
+        return self
+
+    def turn(self, dtheta: float, dphi: float) -> Camera:
+        self._theta += dtheta
+        self._phi += dphi
+        self._changed()
+
+        return self
+
+    @property
+    def attenuation(self):
+        """
+        The depth attenuation curve of the camera's vanishing-point projection. Assigning a curve (or a registered
+        name, see VanishingPointProjection) swaps in a copy of the projection using it.
+        """
+        return getattr(self._projection, "attenuation", None)
+
+    @attenuation.setter
+    def attenuation(self, attenuation):
+        if not isinstance(self._projection, VanishingPointProjection):
+            raise ValueError(f"{type(self._projection).__name__} has no attenuation curve, only VanishingPointProjection does.")
+
+        self.projection = self._projection.with_attenuation(attenuation)
+
+    @property
+    def position(self) -> np.ndarray:
+        """
+        Where the pivot, the point the view is centred on, is in the world.
+        """
+        return np.add(self._pivot, (self._x, self._y, self._z), dtype=np.float64)
+
+    @property
+    def view(self) -> Transform:
+        """
+        World to camera space: undo the camera's translation, then its yaw and pitch around the pivot.
+        """
+        if self._view is None:
+            pivot = Point3D(*self._pivot)
+            self._view = (
+                Transform.rotation(pivot, -self._phi, Plane((1, 2)))
+                @ Transform.rotation(pivot, -self._theta, Plane((0, 2)))
+                @ Transform.translation((-self._x, -self._y, -self._z))
+            )
+
+        return self._view
+
+    @property
+    def at_rest(self) -> bool:
+        """
+        Whether the view is the identity, checked once per change rather than per call.
+        """
+        if self._at_rest is None:
+            self._at_rest = self.view.is_identity()
+
+        return self._at_rest
+
+    @property
+    def matrix(self) -> np.ndarray | None:
+        """
+        The projection matrix times the view matrix, or None when the projection has no matrix.
+        """
+        if self._matrix is None and self._projection.matrix is not None:
+            self._matrix = self._projection.matrix @ self.view.matrix
+
+        return self._matrix
+
+    def to_view(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        World vertices in camera space. Returns vertices itself at rest.
+        """
+        if self.at_rest:
+            return vertices
+
+        return self.view.apply(vertices)
+
+    def view_mesh(self, mesh: Mesh) -> Mesh:
+        """
+        mesh in camera space: mesh itself at rest, otherwise a transformed copy sharing its topology and caches.
+        """
+        if self.at_rest:
+            return mesh
+
+        return mesh.transformed(self.view)
+
+    def unproject(self, screen: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        """
+        The (N, 3) world points at the given camera-space depths that project to the (N, 2) screen coordinates,
+        see Projection.unproject.
+        """
+        points = self._projection.unproject(screen, depths)
+        if self.at_rest:
+            return points
+
+        return self.view.inverse().apply(points)
+
+    def project(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        (N, 3) world vertices to (N, 2) screen coordinates.
+        """
+        if self.matrix is not None:
+            return project_homogeneous(vertices, self._matrix)
 
-        self.theta = theta 
-        self.phi = phi 
\ No newline at end of file
+        return self._projection.project(self.to_view(np.asarray(vertices, dtype=np.float64)))
@@ -0,0 +1,188 @@
+from __future__ import annotations
+import pygame as pg
+import numpy as np
+import threading
+import queue
+import struct
+import zlib
+import sys
+import os
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class FrameCapture:
+    """
+    Records finished frames to disk without stalling the render loop.
+
+    capture copies the surface into one of a fixed pool of buffers and queues it; background writer threads encode
+    it and hand the buffer back to the pool. Nothing is allocated per frame, on either side. For 32-bit surfaces
+    the copy is a plain copy of the packed pixels (about a millisecond at 2160x1080), unpacking them into RGB is
+    left to the writers. The heavy work (zlib compression, checksums, file writes) releases the GIL, so the
+    writers run alongside the render loop.
+
+    format "png" writes path/frame_000000.png, path/frame_000001.png... (workers threads encode in parallel).
+    format "raw" appends every frame to the single file path as packed 8-bit RGB rows, top to bottom, for example
+    for `ffmpeg -f rawvideo -pix_fmt rgb24 -s WIDTHxHEIGHT -i path`. It always uses one writer to keep frames in order.
+
+    When every buffer is waiting to be written, policy decides what capture does: "block" waits for a free buffer
+    (backpressure, every frame is recorded) and "drop" skips the frame and counts it in dropped.
+
+    Errors raised by the writers are re-raised by the next capture or close, the first one when several frames failed.
+    written only counts the frames that were written successfully.
+    """
+
+    def __init__(self, path: str, resolution: tuple[int], format: str = "png", policy: str = "block", buffers: int = 4, workers: int = 2,
+                 compression: int = 1):
+        if format not in ("png", "raw"):
+            raise ValueError(f"Unknown capture format {format}, expected png or raw.")
+        if policy not in ("block", "drop"):
+            raise ValueError(f"Unknown capture policy {policy}, expected block or drop.")
+
+        self.path = path
+        self.width, self.height = resolution
+        self.format = format
+        self.policy = policy
+        self.compression = compression
+
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+
+        # Buffers hold one packed 32-bit pixel per entry, row by row like the surface's own memory.
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put(np.empty((self.height, self.width), dtype=np.uint32))
+
+        self._pending = queue.Queue()
+        self._error = None
+        self._lock = threading.Lock()
+
+        self._stream = None
+        if format == "png":
+            os.makedirs(path, exist_ok=True)
+        else:
+            self._stream = open(path, "wb")
+            workers = 1
+
+        self._writers = [threading.Thread(target=self._write_frames, daemon=True) for _ in range(workers)]
+        for writer in self._writers:
+            writer.start()
+
+    def capture(self, surface: pg.Surface) -> bool:
+        """
+        Queues the current contents of surface. Returns False when the frame was dropped.
+        """
+        self._raise_error()
+
+        if self.policy == "block":
+            buffer = self._free.get()
+        else:
+            try:
+                buffer = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return False
+
+        if surface.get_bytesize() == 4:
+            pixels = np.asarray(surface.get_view("2"))
+            np.copyto(buffer, pixels.T)
+            channels = [_byte_index(shift) for shift in surface.get_shifts()[:3]]
+        else:
+            pixels = pg.surfarray.pixels3d(surface)
+            np.copyto(_bytes(buffer)[..., :3], pixels.transpose(1, 0, 2))
+            channels = [0, 1, 2]
+        del pixels # Unlocks the surface
+
+        self._pending.put((self.captured, buffer, channels))
+        self.captured += 1
+
+        return True
+
+    def close(self):
+        """
+        Waits for every queued frame to be written, then stops the writers.
+        """
+        for _ in self._writers:
+            self._pending.put(None)
+        for writer in self._writers:
+            writer.join()
+        self._writers = []
+
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+        self._raise_error()
+
+    def _raise_error(self):
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _write_frames(self):
+        # Per-writer scratch holding the frame row by row. PNG rows start with a byte for their filter type (0, none).
+        if self._stream is not None:
+            scratch = rows = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        else:
+            scratch = np.zeros((self.height, 1 + self.width * 3), dtype=np.uint8)
+            rows = scratch[:, 1:].reshape(self.height, self.width, 3)
+
+        while True:
+            task = self._pending.get()
+            if task is None:
+                return
+
+            index, buffer, channels = task
+            try:
+                packed = _bytes(buffer)
+                for channel, byte in enumerate(channels):
+                    rows[..., channel] = packed[..., byte]
+            finally:
+                self._free.put(buffer)
+
+            name = os.path.join(self.path, f"frame_{index:06d}.png") if self._stream is None else None
+            try:
+                if name is None:
+                    self._stream.write(scratch)
+                else:
+                    with open(name, "wb") as file:
+                        write_png(file, scratch, self.width, self.height, self.compression)
+            except Exception as error:
+                # A truncated PNG would pass for a recorded frame.
+                if name is not None and os.path.exists(name):
+                    os.remove(name)
+
+                # Later failures usually follow from the first one (a full disk...), that is the one worth raising.
+                with self._lock:
+                    if self._error is None:
+                        self._error = error
+                continue
+
+            with self._lock:
+                self.written += 1
+
+def _bytes(buffer: np.ndarray) -> np.ndarray:
+    return buffer.view(np.uint8).reshape(*buffer.shape, 4)
+
+def _byte_index(shift: int) -> int:
+    """
+    Where in a packed 32-bit pixel, as stored in memory, the channel at the given bit shift is.
+    """
+    return shift // 8 if sys.byteorder == "little" else 3 - shift // 8
+
+def write_png(file, rows: np.ndarray, width: int, height: int, compression: int = 6):
+    """
+    Writes an 8-bit RGB PNG. rows is the (height, 1 + width * 3) array of scanlines, each starting with its filter
+    type byte (0 for none).
+    """
+    def chunk(kind: bytes, data: bytes):
+        file.write(struct.pack(">I", len(data)))
+        file.write(kind)
+        file.write(data)
+        file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    file.write(PNG_SIGNATURE)
+    chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    chunk(b"IDAT", zlib.compress(rows, compression))
+    chunk(b"IEND", b"")
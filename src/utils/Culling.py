@@ -0,0 +1,124 @@
+from __future__ import annotations
+from utils.Mesh import Mesh, newell_normals
+from utils.Projection import Projection, VanishingPointProjection
+from constants import VIEWPORT_RESOLUTION
+import numpy as np
+
+class CullStats:
+    """
+    Running counts of what a Culler has seen since the last reset.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total = 0
+        self.backfacing = 0
+        self.outside = 0
+        self.clipped = 0
+
+    @property
+    def culled(self) -> int:
+        return self.backfacing + self.outside
+
+    def __str__(self) -> str:
+        return f'CullStats(total={self.total}, backfacing={self.backfacing}, outside={self.outside}, clipped={self.clipped})'
+
+def face_normals(mesh: Mesh) -> np.ndarray:
+    """
+    Returns the (F, 3) array of (unnormalised) face normals, see newell_normals.
+    Mesh.normals caches unit normals across frames.
+    """
+    return newell_normals(mesh.vertices, mesh.indices, mesh.offsets)
+
+def clip_polygon(polygon: list[list[float]], width: float, height: float) -> list[list[float]]:
+    """
+    Sutherland-Hodgman clipping of a screen-space polygon against the rectangle [0, width] x [0, height].
+    """
+    # Each edge is (axis, bound, keep values above the bound)
+    for axis, bound, above in ((0, 0, True), (0, width, False), (1, 0, True), (1, height, False)):
+        if not polygon:
+            break
+
+        clipped = []
+        previous = polygon[-1]
+        previous_in = (previous[axis] >= bound) if above else (previous[axis] <= bound)
+
+        for point in polygon:
+            point_in = (point[axis] >= bound) if above else (point[axis] <= bound)
+
+            if point_in != previous_in:
+                t = (bound - previous[axis]) / (point[axis] - previous[axis])
+                clipped.append([previous[0] + t * (point[0] - previous[0]), previous[1] + t * (point[1] - previous[1])])
+            if point_in:
+                clipped.append(point)
+
+            previous, previous_in = point, point_in
+
+        polygon = clipped
+
+    return polygon
+
+class Culler:
+    """
+    Decides which faces of a projected mesh need drawing at all.
+
+    Back-face culling compares each face normal with the direction the projection looks along at that face, see
+    Projection.view_directions. By default that is the default VanishingPointProjection, Render passes its camera's
+    projection and keeps it current. This only holds for closed meshes with outward winding,
+    Culler(backface=False) turns it off.
+
+    Meshes are expected in camera space, see Camera.view_mesh.
+
+    The view volume is the viewport rectangle between the near and far depths. Faces entirely outside it are dropped,
+    faces straddling the viewport edges are reported as partial so the caller can clip them. Faces reaching the
+    projection's min_depth are dropped whole whatever near is, their corners there project through infinity.
+    """
+
+    def __init__(self, viewport: tuple[int] = VIEWPORT_RESOLUTION, backface: bool = True, near: float = -5000, far: float = np.inf, projection: Projection | None = None):
+        self.width, self.height = viewport
+        self.backface = backface
+        self.near = near
+        self.far = far
+        self.projection = projection if projection is not None else VanishingPointProjection()
+        self.stats = CullStats()
+
+    def cull(self, mesh: Mesh, screen: np.ndarray, faces: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        screen is the projection of mesh.vertices. Returns the indices of the faces to draw, and a boolean array
+        (one per returned face) marking those that cross the viewport edges and need clipping.
+        faces restricts the test to a subset of the mesh's faces, for example the candidates from a BVH query.
+        """
+        if faces is None:
+            faces = np.arange(mesh.face_count)
+        self.stats.total += len(faces)
+
+        if self.backface and len(faces):
+            view = self.projection.view_directions(mesh.face_centers()[faces])
+            facing = np.einsum("ij,ij->i", mesh.normals()[faces], view) < 0
+            self.stats.backfacing += len(faces) - np.count_nonzero(facing)
+            faces = faces[facing]
+
+        if len(faces) == 0:
+            return faces, np.zeros(0, dtype=bool)
+
+        # Per-face screen bounds and depth range, over the faces that survived so far.
+        sizes = mesh.face_sizes[faces]
+        corner_starts = np.cumsum(sizes) - sizes
+        positions = np.repeat(mesh.offsets[:-1][faces] - corner_starts, sizes) + np.arange(corner_starts[-1] + sizes[-1])
+
+        corners = mesh.indices[positions]
+        xs, ys, zs = screen[corners, 0], screen[corners, 1], mesh.vertices[corners, 2]
+
+        xmin, xmax = np.minimum.reduceat(xs, corner_starts), np.maximum.reduceat(xs, corner_starts)
+        ymin, ymax = np.minimum.reduceat(ys, corner_starts), np.maximum.reduceat(ys, corner_starts)
+        zmin, zmax = np.minimum.reduceat(zs, corner_starts), np.maximum.reduceat(zs, corner_starts)
+
+        inside = (xmax >= 0) & (xmin <= self.width) & (ymax >= 0) & (ymin <= self.height) & (zmax > self.near) & (zmin < self.far) & (zmin > self.projection.min_depth)
+        self.stats.outside += len(faces) - np.count_nonzero(inside)
+
+        faces = faces[inside]
+        partial = ((xmin < 0) | (xmax > self.width) | (ymin < 0) | (ymax > self.height))[inside]
+        self.stats.clipped += np.count_nonzero(partial)
+
+        return faces, partial
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import pygame as pg
+import numpy as np
+
+class DirtyRects:
+    """
+    Tracks the screen regions drawn on the current frame and the previous one, so a frame can be cleared and
+    presented region by region instead of as a whole.
+
+    Whatever was drawn last frame has to be erased and whatever is drawn this frame has to be shown, so both sets
+    are dirty. Overlapping rectangles are merged before presenting. When the dirty area exceeds full_ratio of the
+    screen, updating rectangle by rectangle stops paying off and rects returns None to ask for a full update.
+
+    Rectangles are grown by margin pixels on every side to cover antialiased edges drawn just outside a polygon.
+    """
+
+    def __init__(self, size: tuple[int], full_ratio: float = 0.5, margin: int = 2):
+        self.width, self.height = size
+        self.full_ratio = full_ratio
+        self.margin = margin
+
+        self.previous = []
+        self.current = []
+        self._full = True
+
+    def begin_frame(self) -> list[pg.Rect] | None:
+        """
+        Starts a new frame. Returns the regions drawn on the frame before, which now need clearing,
+        or None when the whole screen does.
+        """
+        self.previous, self.current = self.current, []
+        return None if self._full else self.previous
+
+    @property
+    def full(self) -> bool:
+        """
+        Whether the current frame is cleared and presented as a whole.
+        """
+        return self._full
+
+    def invalidate(self):
+        """
+        Asks for a full clear and update on the next frame, for when the surface changed behind the tracker's back.
+        """
+        self._full = True
+
+    def add(self, left: float, top: float, right: float, bottom: float):
+        """
+        Marks a region given by its float screen bounds. Regions are clipped to the screen, empty ones are ignored.
+        """
+        left = max(int(np.floor(left)) - self.margin, 0)
+        top = max(int(np.floor(top)) - self.margin, 0)
+        right = min(int(np.ceil(right)) + self.margin + 1, self.width)
+        bottom = min(int(np.ceil(bottom)) + self.margin + 1, self.height)
+
+        if right > left and bottom > top:
+            self.current.append(pg.Rect(left, top, right - left, bottom - top))
+
+    def add_bounds(self, lows: np.ndarray, highs: np.ndarray):
+        """
+        Marks several regions at once from (R, 2) arrays of lower and upper (x, y) corners. Rows holding infinities
+        (groups with nothing drawn) are skipped.
+        """
+        drawn = np.isfinite(lows).all(axis=1) & np.isfinite(highs).all(axis=1)
+        for (left, top), (right, bottom) in zip(lows[drawn].tolist(), highs[drawn].tolist()):
+            self.add(left, top, right, bottom)
+
+    def add_rect(self, rect: pg.Rect | None):
+        if rect is not None:
+            self.current.append(rect.clip(pg.Rect(0, 0, self.width, self.height)))
+
+    def rects(self) -> list[pg.Rect] | None:
+        """
+        The merged dirty regions of this frame, or None when the whole screen should be updated.
+        """
+        if self._full:
+            self._full = False
+            return None
+
+        merged = merge_rects(self.previous + self.current)
+        if sum(rect.width * rect.height for rect in merged) > self.full_ratio * self.width * self.height:
+            return None
+
+        return merged
+
+def merge_rects(rects: list[pg.Rect]) -> list[pg.Rect]:
+    """
+    Unions overlapping or touching rectangles until none overlap or touch. Quadratic, meant for the handful of
+    regions of one frame.
+    """
+    merged = []
+    for rect in rects:
+        if rect.width == 0 or rect.height == 0:
+            continue
+
+        rect = pg.Rect(rect)
+        # A union can grow into rectangles already checked, so keep absorbing until nothing overlaps.
+        # Grown by a pixel on every side, rectangles sharing an edge collide too (pygame's own test excludes them).
+        overlapping = rect.inflate(2, 2).collidelistall(merged)
+        while overlapping:
+            for index in reversed(overlapping):
+                rect.union_ip(merged.pop(index))
+            overlapping = rect.inflate(2, 2).collidelistall(merged)
+
+        merged.append(rect)
+
+    return merged
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from utils.Mesh import Mesh, DEFAULT_FACE_COLOR
+import numpy as np
+import math
+
+# Procedural meshes, built straight into Mesh buffers without going through Faces or Points.
+# Screen y grows downwards, so "up" (heights, sphere and torus tops) is towards -y.
+# Every generator winds faces counter-clockwise seen from outside (normals point outwards), like Prism.
+
+def heightfield(heights: np.ndarray, spacing: tuple[float] = (1, 1), origin: tuple[float] = (0, 0, 0),
+                color: tuple[int] | np.ndarray = DEFAULT_FACE_COLOR) -> Mesh:
+    """
+    A grid of quads over the xz plane, one per cell of the (R + 1, C + 1) array of heights, where
+    heights[r, c] raises the vertex at origin + (c * spacing[0], 0, r * spacing[1]). Faces point up.
+    color is one colour for every face or an (R * C, 3) array, row by row.
+    """
+    heights = np.asarray(heights, dtype=np.float64)
+    rows, columns = heights.shape[0] - 1, heights.shape[1] - 1
+    left, top, front = origin
+
+    vertices = np.empty((rows + 1, columns + 1, 3))
+    vertices[..., 0] = left + np.arange(columns + 1) * spacing[0]
+    vertices[..., 1] = top - heights
+    vertices[..., 2] = (front + np.arange(rows + 1) * spacing[1])[:, None]
+
+    # Cell (r, c) has corner vertex r * (C + 1) + c.
+    corner = (np.arange(rows)[:, None] * (columns + 1) + np.arange(columns)).reshape(-1)
+    indices = np.stack([corner, corner + 1, corner + columns + 2, corner + columns + 1], axis=1).reshape(-1)
+
+    return _mesh(vertices.reshape(-1, 3), indices, np.arange(rows * columns + 1) * 4, color)
+
+def grid(columns: int, rows: int, spacing: tuple[float] = (1, 1), origin: tuple[float] = (0, 0, 0),
+         color: tuple[int] | np.ndarray = DEFAULT_FACE_COLOR) -> Mesh:
+    """
+    A flat heightfield of columns x rows quads.
+    """
+    return heightfield(np.zeros((rows + 1, columns + 1)), spacing, origin, color)
+
+def uv_sphere(center: tuple[float], radius: float, segments: int = 24, rings: int = 12,
+              color: tuple[int] | np.ndarray = DEFAULT_FACE_COLOR) -> Mesh:
+    """
+    A closed sphere of segments slices around the vertical axis and rings stacks from pole to pole.
+    Faces touching a pole are triangles, the rest are quads.
+    """
+    if segments < 3 or rings < 2:
+        raise ValueError("A UV sphere needs at least 3 segments and 2 rings.")
+
+    x, y, z = center
+    # Vertex 0 is the top pole, ring k (1 <= k < rings) holds vertices 1 + (k - 1) * segments onwards, the last one is the bottom pole.
+    polar = np.arange(1, rings) * (math.pi / rings)
+    azimuth = np.arange(segments) * (2 * math.pi / segments)
+
+    vertices = np.empty((2 + (rings - 1) * segments, 3))
+    vertices[0] = x, y - radius, z
+    vertices[-1] = x, y + radius, z
+    ring_vertices = vertices[1:-1].reshape(rings - 1, segments, 3)
+    ring_vertices[..., 0] = x + radius * np.sin(polar)[:, None] * np.cos(azimuth)
+    ring_vertices[..., 1] = y - radius * np.cos(polar)[:, None]
+    ring_vertices[..., 2] = z + radius * np.sin(polar)[:, None] * np.sin(azimuth)
+
+    column = np.arange(segments)
+    following = (column + 1) % segments
+    bottom = len(vertices) - 1
+    last_ring = 1 + (rings - 2) * segments
+
+    top_cap = np.stack([np.zeros(segments, dtype=np.int64), 1 + column, 1 + following], axis=1)
+    ring = 1 + np.arange(rings - 2)[:, None] * segments
+    bands = np.stack([ring + column, ring + segments + column, ring + segments + following, ring + following], axis=2)
+    bottom_cap = np.stack([np.full(segments, bottom), last_ring + following, last_ring + column], axis=1)
+
+    indices = np.concatenate([top_cap.reshape(-1), bands.reshape(-1), bottom_cap.reshape(-1)])
+    sizes = np.concatenate([np.full(segments, 3), np.full((rings - 2) * segments, 4), np.full(segments, 3)])
+
+    return _mesh(vertices, indices, np.concatenate([[0], np.cumsum(sizes)]), color)
+
+def torus(center: tuple[float], major_radius: float, minor_radius: float, segments: int = 32, sides: int = 16,
+          color: tuple[int] | np.ndarray = DEFAULT_FACE_COLOR) -> Mesh:
+    """
+    A closed torus of quads lying in the xz plane: segments slices around the vertical axis at major_radius,
+    each a ring of sides vertices around the tube of minor_radius.
+    """
+    if segments < 3 or sides < 3:
+        raise ValueError("A torus needs at least 3 segments and 3 sides.")
+
+    x, y, z = center
+    around = np.arange(segments) * (2 * math.pi / segments)
+    tube = np.arange(sides) * (2 * math.pi / sides)
+    distance = major_radius + minor_radius * np.cos(tube)
+
+    # Vertex i * sides + j sits at angle around[i] around the axis and tube[j] around the tube.
+    vertices = np.empty((segments, sides, 3))
+    vertices[..., 0] = x + np.cos(around)[:, None] * distance
+    vertices[..., 1] = y - minor_radius * np.sin(tube)
+    vertices[..., 2] = z + np.sin(around)[:, None] * distance
+
+    segment = np.arange(segments)[:, None]
+    side = np.arange(sides)
+    next_segment = (segment + 1) % segments
+    next_side = (side + 1) % sides
+
+    indices = np.stack([
+        segment * sides + side,
+        next_segment * sides + side,
+        next_segment * sides + next_side,
+        segment * sides + next_side
+    ], axis=2).reshape(-1)
+
+    return _mesh(vertices.reshape(-1, 3), indices, np.arange(segments * sides + 1) * 4, color)
+
+def _mesh(vertices: np.ndarray, indices: np.ndarray, offsets: np.ndarray, color: tuple[int] | np.ndarray) -> Mesh:
+    colors = np.empty((len(offsets) - 1, 3), dtype=np.uint8)
+    colors[:] = color
+
+    return Mesh.from_buffers(vertices, indices.astype(np.int64), offsets.astype(np.int64), colors)
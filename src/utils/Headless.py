@@ -0,0 +1,14 @@
+from constants import VIEWPORT_RESOLUTION
+import pygame as pg
+import os
+
+def init_headless(resolution: tuple[int] = VIEWPORT_RESOLUTION) -> pg.Surface:
+    """
+    Initialises pygame without a display (SDL's dummy video driver) and returns an offscreen Surface to render into.
+    Must be called before anything else initialises pygame, the driver is picked at that point.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    pg.init()
+    return pg.Surface(resolution)
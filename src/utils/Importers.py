@@ -0,0 +1,609 @@
+from __future__ import annotations
+from exceptions.GraphicsExceptions import MeshFormatError
+from utils.Mesh import Mesh, DEFAULT_FACE_COLOR
+from utils.Polygon import Polygon3D, CompositeShape
+import numpy as np
+import os
+
+# Text formats are read this many bytes at a time, binary formats are converted this many records at a time.
+BLOCK_SIZE = 1 << 22
+RECORD_CHUNK = 1 << 20
+
+_NEWLINE = ord("\n")
+_SLASH = ord("/")
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[ord(" "), ord("\t"), ord("\r"), ord("\n"), ord("\v"), ord("\f")]] = True
+
+# OBJ colours are 0-1 floats.
+_OBJ_DEFAULT_COLOR = np.array(DEFAULT_FACE_COLOR) / 255
+
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8"
+}
+
+def load_mesh(path: str) -> Mesh:
+    """
+    Reads an .obj, .ply or .stl file into a Mesh, picking the reader from the file extension.
+    """
+    return _reader(path)(path)
+
+def load_shape(path: str, split_objects: bool = True, validate: bool = False) -> Polygon3D | CompositeShape:
+    """
+    Reads a mesh file into something Render can draw. With split_objects, an OBJ file holding several objects
+    (o or g statements) becomes a CompositeShape with one component per object.
+
+    Scanned assets are rarely watertight, so the closure check is off unless validate is set.
+    """
+    if _reader(path) is read_obj and split_objects:
+        mesh, object_starts = _read_obj(path, BLOCK_SIZE)
+        if len(object_starts) > 2:
+            return CompositeShape([
+                Polygon3D.from_mesh(mesh.submesh(slice(start, stop)), validate)
+                for start, stop in zip(object_starts[:-1], object_starts[1:])
+            ])
+    else:
+        mesh = load_mesh(path)
+
+    return Polygon3D.from_mesh(mesh, validate)
+
+def _reader(path: str):
+    readers = {".obj": read_obj, ".ply": read_ply, ".stl": read_stl}
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension not in readers:
+        raise MeshFormatError(f"No mesh reader for {extension or 'extensionless'} files: {path}")
+
+    return readers[extension]
+
+def _blocks(file, block_size: int):
+    """
+    Yields the rest of file in blocks of roughly block_size bytes, each ending on a line boundary.
+    """
+    carry = b""
+    while True:
+        block = file.read(block_size)
+        if not block:
+            if carry.strip():
+                yield carry + b"\n"
+            return
+
+        block = carry + block
+        cut = block.rfind(b"\n") + 1
+        carry, block = block[cut:], block[:cut]
+
+        if block:
+            yield block
+
+def _lines(block: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The bytes of a block as an array, and the start and end (the newline) position of every line in it.
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    ends = np.flatnonzero(data == _NEWLINE)
+    starts = np.empty_like(ends)
+    starts[0:1] = 0
+    starts[1:] = ends[:-1] + 1
+
+    return data, starts, ends
+
+def _first_token(data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Position of the first non-whitespace byte of every line, or the line's end when it is blank.
+    Steps once per column of indentation, which is short, instead of building per-byte index arrays.
+    """
+    first = starts.copy()
+    indented = np.flatnonzero(_WHITESPACE[data[first]] & (first < ends))
+    while len(indented):
+        first[indented] += 1
+        indented = indented[_WHITESPACE[data[first[indented]]] & (first[indented] < ends[indented])]
+
+    return first
+
+def _keyword(data: np.ndarray, first: np.ndarray, ends: np.ndarray, keyword: bytes) -> np.ndarray:
+    """
+    Which lines start (after indentation) with keyword as a whole token.
+    """
+    match = ends - first > len(keyword)
+    for position, byte in enumerate(keyword):
+        match &= data[np.minimum(first + position, len(data) - 1)] == byte
+
+    return match & _WHITESPACE[data[np.minimum(first + len(keyword), len(data) - 1)]]
+
+def _tokens(data: np.ndarray, starts: np.ndarray, ends: np.ndarray, path: str, strip_slashes: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parses the numbers on each of the given line ranges [start, end) of a block. Returns all numbers flattened,
+    and how many each line held. strip_slashes drops everything after a "/" in a token (OBJ's v/vt/vn corners).
+
+    Every temporary is one byte per byte of the block, the parsing itself is a single np.fromiter pass over the tokens.
+    """
+    if len(starts) == 0:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    # Blank out everything but the requested ranges.
+    inside = np.zeros(len(data) + 1, dtype=np.int8)
+    inside[starts] += 1
+    inside[ends] -= 1
+    inside = np.cumsum(inside[:-1], dtype=np.int8).view(bool)
+    text = np.where(inside, data, np.uint8(ord(" ")))
+
+    blank = _WHITESPACE[text]
+    if strip_slashes:
+        slashed = text == _SLASH
+        while True:
+            spreading = slashed[:-1] & ~blank[1:] & ~slashed[1:]
+            if not spreading.any():
+                break
+            slashed[1:] |= spreading
+
+        text[slashed] = ord(" ")
+        blank |= slashed
+
+    begins = ~blank
+    begins[1:] &= blank[:-1]
+
+    # Sums over [start, end) for every line, the interleaved [end, next start) sums are dropped.
+    bounds = np.stack([starts, ends], axis=1).reshape(-1)
+    counts = np.add.reduceat(begins, bounds, dtype=np.int64)[::2]
+    # Splitting on whitespace yields exactly the tokens counted above, float raises on any that is not a number.
+    tokens = text.tobytes().split()
+    try:
+        values = np.fromiter(map(float, tokens), dtype=np.float64, count=len(tokens))
+    except ValueError:
+        raise MeshFormatError(f"Unreadable number in {path}.") from None
+
+    return values, counts
+
+def _columns(values: np.ndarray, counts: np.ndarray, first: int, width: int) -> np.ndarray:
+    """
+    Columns first to first + width of every line parsed by _tokens.
+    """
+    positions = np.cumsum(counts) - counts + first
+    return values[positions[:, None] + np.arange(width)]
+
+def _face_colors(vertex_colors: np.ndarray, indices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Per-face colours averaged from per-vertex colours.
+    """
+    if len(offsets) < 2:
+        return np.zeros((0, 3), dtype=np.uint8)
+
+    totals = np.add.reduceat(vertex_colors[indices].astype(np.float64), offsets[:-1], axis=0)
+    return np.round(totals / np.diff(offsets)[:, None]).astype(np.uint8)
+
+def _finish(vertices: np.ndarray, indices: np.ndarray, sizes: np.ndarray, colors: np.ndarray | None, path: str) -> Mesh:
+    if len(sizes) and sizes.min() < 3:
+        raise MeshFormatError(f"Face with fewer than 3 vertices in {path}.")
+    if len(indices) and (indices.min() < 0 or indices.max() >= len(vertices)):
+        raise MeshFormatError(f"Face index out of range for {len(vertices)} vertices in {path}.")
+
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+
+    if colors is None:
+        colors = np.empty((len(sizes), 3), dtype=np.uint8)
+        colors[:] = DEFAULT_FACE_COLOR
+
+    return Mesh.from_buffers(vertices, indices, offsets, colors)
+
+def read_obj(path: str, block_size: int = BLOCK_SIZE) -> Mesh:
+    """
+    Streams a Wavefront OBJ file into a Mesh. Only geometry is read: v and f statements (with 1-based or negative
+    relative indices, texture and normal references are ignored). Vertex colours written as "v x y z r g b"
+    are averaged into face colours. Everything else (vt, vn, materials...) is skipped.
+
+    The file is parsed a block of lines at a time with array operations, memory use beyond the resulting
+    Mesh is bounded by block_size.
+    """
+    return _read_obj(path, block_size)[0]
+
+def _read_obj(path: str, block_size: int) -> tuple[Mesh, np.ndarray]:
+    """
+    Also returns the face index every object (o or g statement) starts at, with the face count appended.
+    """
+    vertex_blocks, color_blocks, index_blocks, size_blocks = [], [], [], []
+    object_starts = [0]
+    vertex_count = face_count = 0
+
+    with open(path, "rb") as file:
+        for block in _blocks(file, block_size):
+            data, starts, ends = _lines(block)
+            first = _first_token(data, starts, ends)
+
+            is_vertex = _keyword(data, first, ends, b"v")
+            is_face = _keyword(data, first, ends, b"f")
+
+            values, counts = _tokens(data, first[is_vertex] + 1, ends[is_vertex], path)
+            if len(counts) and counts.min() < 3:
+                raise MeshFormatError(f"Vertex with fewer than 3 coordinates in {path}.")
+
+            vertex_blocks.append(_columns(values, counts, 0, 3))
+            color_blocks.append(_vertex_colors(values, counts))
+
+            values, sizes = _tokens(data, first[is_face] + 1, ends[is_face], path, strip_slashes=True)
+            indices = values.astype(np.int64)
+
+            # Negative indices count back from the last vertex defined before the face's line.
+            defined = vertex_count + (np.cumsum(is_vertex) - is_vertex)[is_face]
+            relative = np.repeat(defined, sizes)
+            indices = np.where(indices < 0, relative + indices, indices - 1)
+
+            index_blocks.append(indices)
+            size_blocks.append(sizes)
+
+            is_object = _keyword(data, first, ends, b"o") | _keyword(data, first, ends, b"g")
+            faces_before = face_count + (np.cumsum(is_face) - is_face)[is_object]
+            object_starts.extend(faces_before.tolist())
+
+            vertex_count += int(is_vertex.sum())
+            face_count += len(sizes)
+
+    vertex_colors = None
+    if any(block is not None for block in color_blocks):
+        vertex_colors = np.concatenate([
+            block if block is not None else np.broadcast_to(_OBJ_DEFAULT_COLOR, vertex_block.shape)
+            for block, vertex_block in zip(color_blocks, vertex_blocks)
+        ])
+        vertex_colors = np.clip(vertex_colors * 255, 0, 255)
+    del color_blocks
+
+    vertices = _concatenate(vertex_blocks, (0, 3), np.float64)
+    indices = _concatenate(index_blocks, (0,), np.int64)
+    sizes = _concatenate(size_blocks, (0,), np.int64)
+    del vertex_blocks, index_blocks, size_blocks
+
+    mesh = _finish(vertices, indices, sizes, None, path)
+    if vertex_colors is not None:
+        mesh.colors = _face_colors(vertex_colors, mesh.indices, mesh.offsets)
+
+    # Objects without faces (a "g" right before an "o" for example) are dropped.
+    return mesh, np.unique(np.append(object_starts, face_count))
+
+def _vertex_colors(values: np.ndarray, counts: np.ndarray) -> np.ndarray | None:
+    """
+    The colours of a block of "v" lines parsed by _tokens, None when no line has one. Lines are read one by one:
+    "v x y z r g b" has a colour, "v x y z" and "v x y z w" get the default face colour.
+    """
+    colored = counts >= 6
+    if not colored.any():
+        return None
+
+    colors = np.empty((len(counts), 3))
+    colors[:] = _OBJ_DEFAULT_COLOR
+    positions = (np.cumsum(counts) - counts)[colored] + 3
+    colors[colored] = values[positions[:, None] + np.arange(3)]
+
+    return colors
+
+def _concatenate(blocks: list[np.ndarray], empty_shape: tuple[int], dtype) -> np.ndarray:
+    if not blocks:
+        return np.zeros(empty_shape, dtype=dtype)
+
+    return np.concatenate(blocks).astype(dtype, copy=False)
+
+class _PlyElement:
+    """
+    One element declared in a PLY header: its name, record count, fixed-size properties (name, dtype) and at most
+    one list property (name, count dtype, item dtype) with the fixed properties before and after it.
+    """
+    def __init__(self, name: str, count: int):
+        self.name = name
+        self.count = count
+        self.before = []
+        self.list = None
+        self.after = []
+
+    @property
+    def names(self) -> list[str]:
+        return [name for name, _ in self.before + self.after]
+
+    def add(self, words: list[str], path: str):
+        if words[1] == "list":
+            if self.list is not None:
+                raise MeshFormatError(f"PLY element {self.name} with several list properties is not supported: {path}")
+
+            self.list = (words[4], _ply_type(words[2], path), _ply_type(words[3], path))
+        elif self.list is None:
+            self.before.append((words[2], _ply_type(words[1], path)))
+        else:
+            self.after.append((words[2], _ply_type(words[1], path)))
+
+def _ply_type(name: str, path: str) -> str:
+    if name not in _PLY_TYPES:
+        raise MeshFormatError(f"Unknown PLY property type {name} in {path}")
+
+    return _PLY_TYPES[name]
+
+def _read_ply_header(file, path: str) -> tuple[str, list[_PlyElement]]:
+    if file.readline().strip() != b"ply":
+        raise MeshFormatError(f"Not a PLY file: {path}")
+
+    form, elements = None, []
+    while True:
+        line = file.readline()
+        if not line:
+            raise MeshFormatError(f"PLY header without end_header: {path}")
+
+        words = line.decode("ascii", "replace").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        elif words[0] == "format":
+            form = words[1]
+        elif words[0] == "element":
+            elements.append(_PlyElement(words[1], int(words[2])))
+        elif words[0] == "property":
+            elements[-1].add(words, path)
+        elif words[0] == "end_header":
+            break
+
+    if form not in ("ascii", "binary_little_endian", "binary_big_endian"):
+        raise MeshFormatError(f"Unsupported PLY format {form}: {path}")
+
+    return form, elements
+
+def read_ply(path: str, block_size: int = BLOCK_SIZE) -> Mesh:
+    """
+    Reads an ASCII or binary PLY file into a Mesh. Vertex x/y/z and the face vertex_indices (or vertex_index)
+    list are read, colours come from face red/green/blue properties or, failing that, are averaged from vertex ones.
+    Other elements and properties are skipped.
+
+    Binary files are memory-mapped and converted a chunk of records at a time. Faces are read in runs of equal
+    size with one array operation per run, so an all-triangle or all-quad mesh is a single pass. ASCII files are
+    streamed in blocks like OBJ.
+    """
+    with open(path, "rb") as file:
+        form, elements = _read_ply_header(file, path)
+        header_size = file.tell()
+
+        if form == "ascii":
+            columns = _read_ply_ascii(file, elements, block_size, path)
+
+    if form != "ascii":
+        columns = _read_ply_binary(path, header_size, elements, "<" if form == "binary_little_endian" else ">")
+
+    vertex = columns.get("vertex")
+    face = columns.get("face")
+    if vertex is None or face is None:
+        raise MeshFormatError(f"PLY file without vertex or face element: {path}")
+
+    properties, _, _ = vertex
+    if not {"x", "y", "z"} <= properties.keys():
+        raise MeshFormatError(f"PLY vertices without x, y and z: {path}")
+
+    vertices = np.stack([properties["x"], properties["y"], properties["z"]], axis=1).astype(np.float64)
+    face_properties, indices, sizes = face
+
+    face_colors = _ply_colors(face_properties)
+    mesh = _finish(vertices, indices, sizes, face_colors, path)
+
+    vertex_colors = _ply_colors(properties)
+    if face_colors is None and vertex_colors is not None:
+        mesh.colors = _face_colors(vertex_colors, mesh.indices, mesh.offsets)
+
+    return mesh
+
+def _ply_colors(properties: dict[str, np.ndarray]) -> np.ndarray | None:
+    names = [name for name in ("red", "green", "blue") if name in properties]
+    if len(names) != 3:
+        names = [name for name in ("diffuse_red", "diffuse_green", "diffuse_blue") if name in properties]
+    if len(names) != 3:
+        return None
+
+    colors = np.stack([properties[name] for name in names], axis=1)
+    if colors.dtype.kind == "f":
+        colors = np.clip(colors * 255, 0, 255)
+
+    return colors.astype(np.uint8)
+
+# Only these properties are kept, everything else in a PLY file is skipped without being converted.
+_PLY_KEPT = {"x", "y", "z", "red", "green", "blue", "diffuse_red", "diffuse_green", "diffuse_blue"}
+
+def _read_ply_binary(path: str, offset: int, elements: list[_PlyElement], endian: str) -> dict:
+    """
+    Returns {element name: (kept fixed properties, list items, list sizes)} for every element.
+    """
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    columns = dict()
+
+    for element in elements:
+        if element.list is None:
+            dtype = np.dtype([(name, endian + kind) for name, kind in element.before])
+            end = offset + dtype.itemsize * element.count
+            if end > len(raw):
+                raise MeshFormatError(f"PLY file truncated in element {element.name}: {path}")
+
+            records = raw[offset:end].view(dtype)
+            kept = {name: np.empty(element.count, dtype=records.dtype[name]) for name in element.names if name in _PLY_KEPT}
+            for start in range(0, element.count, RECORD_CHUNK):
+                chunk = records[start:start + RECORD_CHUNK]
+                for name, column in kept.items():
+                    column[start:start + RECORD_CHUNK] = chunk[name]
+
+            columns[element.name] = (kept, None, None)
+            offset = end
+        else:
+            columns[element.name], offset = _read_ply_lists(raw, offset, element, endian, path)
+
+    return columns
+
+def _read_ply_lists(raw: np.ndarray, offset: int, element: _PlyElement, endian: str, path: str) -> tuple[tuple, int]:
+    """
+    Reads a binary element holding a list property. Records are variable-sized, so they are walked in runs that
+    share a list length: each run is viewed as one structured array, its end is where the length first changes.
+    """
+    list_name, count_kind, item_kind = element.list
+    before = [(name, endian + kind) for name, kind in element.before]
+    after = [(name, endian + kind) for name, kind in element.after]
+    count_type = np.dtype(endian + count_kind)
+    prefix = np.dtype(before).itemsize if before else 0
+
+    kept = {name: [] for name in element.names if name in _PLY_KEPT}
+    item_runs, size_runs = [], []
+    done = window = 0
+    previous = None
+
+    while done < element.count:
+        if offset + prefix + count_type.itemsize > len(raw):
+            raise MeshFormatError(f"PLY file truncated in element {element.name}: {path}")
+
+        size = int(raw[offset + prefix:offset + prefix + count_type.itemsize].view(count_type)[0])
+        fields = before + [("size", count_type)] + ([("items", endian + item_kind, (size,))] if size else []) + after
+        dtype = np.dtype(fields)
+
+        # The window looked at grows while runs keep filling it and starts small again after the size changes,
+        # so meshes mixing face sizes pay for the records they have, not for a whole chunk per run.
+        window = min(window * 2, RECORD_CHUNK) if size == previous else 16
+        previous = size
+
+        available = min(element.count - done, (len(raw) - offset) // dtype.itemsize, window)
+        records = raw[offset:offset + available * dtype.itemsize].view(dtype)
+
+        changed = np.flatnonzero(records["size"] != size)
+        run = int(changed[0]) if len(changed) else available
+        if run == 0:
+            raise MeshFormatError(f"PLY file truncated in element {element.name}: {path}")
+
+        records = records[:run]
+        for name, column in kept.items():
+            column.append(np.array(records[name]))
+        item_runs.append(records["items"].astype(np.int64).reshape(-1) if size else np.zeros(0, dtype=np.int64))
+        size_runs.append(np.full(run, size, dtype=np.int64))
+
+        offset += run * dtype.itemsize
+        done += run
+
+    kept = {name: np.concatenate(column) if column else np.zeros(0) for name, column in kept.items()}
+    return (kept, _concatenate(item_runs, (0,), np.int64), _concatenate(size_runs, (0,), np.int64)), offset
+
+def _read_ply_ascii(file, elements: list[_PlyElement], block_size: int, path: str) -> dict:
+    """
+    Streams the body of an ASCII PLY file, one record per line, assigning lines to elements in header order.
+    """
+    pending = [element for element in elements if element.count > 0]
+    parts = {element.name: ({name: [] for name in element.names if name in _PLY_KEPT}, [], []) for element in pending}
+    lines_left = pending[0].count if pending else 0
+
+    for block in _blocks(file, block_size):
+        data, starts, ends = _lines(block)
+        first = _first_token(data, starts, ends)
+        used = first < ends
+        starts, ends = first[used], ends[used]
+
+        while len(starts) and pending:
+            element = pending[0]
+            take = min(lines_left, len(starts))
+            _ply_ascii_records(data, starts[:take], ends[:take], element, parts[element.name], path)
+
+            starts, ends = starts[take:], ends[take:]
+            lines_left -= take
+            if lines_left == 0:
+                pending.pop(0)
+                lines_left = pending[0].count if pending else 0
+
+    if pending:
+        raise MeshFormatError(f"PLY file truncated in element {pending[0].name}: {path}")
+
+    columns = dict()
+    for name, (kept, item_runs, size_runs) in parts.items():
+        kept = {key: np.concatenate(column) for key, column in kept.items()}
+        if item_runs:
+            columns[name] = (kept, _concatenate(item_runs, (0,), np.int64), _concatenate(size_runs, (0,), np.int64))
+        else:
+            columns[name] = (kept, None, None)
+
+    return columns
+
+def _ply_ascii_records(data, starts, ends, element: _PlyElement, part: tuple, path: str):
+    kept, item_runs, size_runs = part
+    values, counts = _tokens(data, starts, ends, path)
+    line_starts = np.cumsum(counts) - counts
+
+    before, after = len(element.before), len(element.after)
+    if element.list is None:
+        if np.any(counts != before):
+            raise MeshFormatError(f"PLY {element.name} record with the wrong number of values: {path}")
+        sizes = np.zeros(len(counts), dtype=np.int64)
+    else:
+        sizes = values[line_starts + before].astype(np.int64)
+        if np.any(counts != before + 1 + sizes + after):
+            raise MeshFormatError(f"PLY {element.name} record with the wrong number of values: {path}")
+
+        item_starts = np.cumsum(sizes) - sizes
+        items = np.repeat(line_starts + before + 1 - item_starts, sizes) + np.arange(sizes.sum())
+        item_runs.append(values[items].astype(np.int64))
+        size_runs.append(sizes)
+
+    for position, (name, kind) in enumerate(element.before + element.after):
+        if name in kept:
+            column = line_starts + position + (position >= before) * (1 + sizes)
+            kept[name].append(values[column].astype(kind))
+
+_STL_RECORD = np.dtype([("normal", "<f4", (3,)), ("corners", "<f4", (3, 3)), ("attribute", "<u2")])
+
+def read_stl(path: str, weld: bool = True, block_size: int = BLOCK_SIZE) -> Mesh:
+    """
+    Reads a binary (memory-mapped) or ASCII STL file into a triangle Mesh. STL stores every triangle's corners
+    separately, with weld the exactly coincident ones are merged so the mesh has shared vertices and edge adjacency.
+    """
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as file:
+        header = file.read(84)
+
+    count = int(np.frombuffer(header[80:84], dtype="<u4")[0]) if len(header) == 84 else -1
+    if size == 84 + count * _STL_RECORD.itemsize:
+        corners = _read_stl_binary(path, count)
+    elif header.lstrip().startswith(b"solid"):
+        corners = _read_stl_ascii(path, block_size)
+    else:
+        raise MeshFormatError(f"Not an STL file, or a truncated one: {path}")
+
+    if weld:
+        vertices, indices = _weld_exact(corners)
+    else:
+        vertices, indices = corners.astype(np.float64), np.arange(len(corners), dtype=np.int64)
+
+    return _finish(vertices, indices, np.full(len(corners) // 3, 3, dtype=np.int64), None, path)
+
+def _read_stl_binary(path: str, count: int) -> np.ndarray:
+    records = np.memmap(path, dtype=_STL_RECORD, mode="r", offset=84, shape=(count,)) if count else np.zeros(0, dtype=_STL_RECORD)
+    corners = np.empty((count * 3, 3), dtype=np.float32)
+
+    for start in range(0, count, RECORD_CHUNK):
+        chunk = records[start:start + RECORD_CHUNK]
+        corners[start * 3:(start + len(chunk)) * 3] = chunk["corners"].reshape(-1, 3)
+
+    return corners
+
+def _read_stl_ascii(path: str, block_size: int) -> np.ndarray:
+    corner_blocks = []
+
+    with open(path, "rb") as file:
+        for block in _blocks(file, block_size):
+            data, starts, ends = _lines(block)
+            first = _first_token(data, starts, ends)
+
+            is_vertex = _keyword(data, first, ends, b"vertex")
+            values, counts = _tokens(data, first[is_vertex] + len(b"vertex"), ends[is_vertex], path)
+            if np.any(counts != 3):
+                raise MeshFormatError(f"STL vertex without exactly 3 coordinates: {path}")
+
+            corner_blocks.append(values.reshape(-1, 3).astype(np.float32))
+
+    corners = _concatenate(corner_blocks, (0, 3), np.float32)
+    if len(corners) % 3:
+        raise MeshFormatError(f"STL facet without exactly 3 vertices: {path}")
+
+    return corners
+
+def _weld_exact(corners: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merges bitwise identical float32 corners (treating -0 as 0). Each corner is compared as one opaque 12 byte key,
+    which sorts far faster than comparing rows of floats.
+    """
+    keys = np.ascontiguousarray(corners + np.float32(0)).view(np.dtype((np.void, corners.itemsize * 3))).reshape(-1)
+    unique, inverse = np.unique(keys, return_inverse=True)
+
+    return unique.view(np.float32).reshape(-1, 3).astype(np.float64), inverse.reshape(-1).astype(np.int64)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+from utils.Transform import Transform
+import numpy as np
+
+class InstancedShape:
+    """
+    One Mesh drawn many times, each instance with its own Transform and optionally its own colour.
+
+    The geometry is defined once and never copied per instance. Render draws every instance in one batch:
+    InstancedShape.batch applies all instance transforms in a single matrix product into a reused vertex buffer,
+    and the batch's index buffers are only rebuilt when the number of instances changes.
+    """
+
+    def __init__(self, mesh: Mesh):
+        self.mesh = mesh
+        self.matrices = np.zeros((0, 4, 4))
+        self.colors = np.zeros((0, 3), dtype=np.uint8)
+        self.tinted = np.zeros(0, dtype=bool)
+
+        self._batch = None
+        self._colors_dirty = True
+
+    def __len__(self) -> int:
+        return len(self.matrices)
+
+    def add(self, transform: Transform | None = None, color: tuple[int] | None = None) -> int:
+        """
+        Adds an instance and returns its index. Without a colour, the instance uses the mesh's face colours.
+        """
+        self.matrices = np.concatenate([self.matrices, np.identity(4)[None]])
+        self.colors = np.concatenate([self.colors, np.zeros((1, 3), dtype=np.uint8)])
+        self.tinted = np.append(self.tinted, False)
+
+        instance = len(self) - 1
+        if transform is not None:
+            self.set_transform(instance, transform)
+        if color is not None:
+            self.set_color(instance, color)
+
+        return instance
+
+    def remove(self, instance: int):
+        """
+        Removes an instance. Later instances move down one index.
+        """
+        self.matrices = np.delete(self.matrices, instance, axis=0)
+        self.colors = np.delete(self.colors, instance, axis=0)
+        self.tinted = np.delete(self.tinted, instance)
+
+        self._colors_dirty = True
+
+    def set_transform(self, instance: int, transform: Transform):
+        self.matrices[instance] = transform.matrix
+
+    def set_transforms(self, matrices: np.ndarray):
+        """
+        Replaces every instance transform at once with an (M, 4, 4) array, resizing the instance list to match.
+        """
+        matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+        if len(matrices) != len(self):
+            self.colors = np.resize(self.colors, (len(matrices), 3))
+            self.tinted = np.resize(self.tinted, len(matrices))
+            self.tinted[len(self):] = False
+
+        self.matrices = matrices.copy()
+
+    def set_color(self, instance: int, color: tuple[int] | None):
+        self.tinted[instance] = color is not None
+        if color is not None:
+            self.colors[instance] = color
+
+        self._colors_dirty = True
+
+    def batch(self) -> Mesh:
+        """
+        Every instance merged into one Mesh in world space. The returned mesh is reused between calls.
+        """
+        count = len(self)
+        vertex_count = self.mesh.vertex_count
+
+        if self._batch is None or self._batch.face_count != count * self.mesh.face_count:
+            # Instance k's vertices occupy rows [k * N, (k + 1) * N) of the batch, colours are filled in below.
+            batch = Mesh.from_buffers(
+                np.empty((count * vertex_count, 3)),
+                (self.mesh.indices[None] + vertex_count * np.arange(count)[:, None]).reshape(-1),
+                np.concatenate([[0], (self.mesh.offsets[1:][None] + len(self.mesh.indices) * np.arange(count)[:, None]).reshape(-1)]),
+                None
+            )
+
+            self._batch = batch
+            self._colors_dirty = True
+
+        if self._colors_dirty:
+            colors = np.tile(self.mesh.colors, (count, 1)).reshape(count, -1, 3)
+            colors[self.tinted] = self.colors[self.tinted][:, None]
+            self._batch.colors = colors.reshape(-1, 3)
+            self._colors_dirty = False
+
+        vertices = self._batch.vertices.reshape(count, vertex_count, 3)
+        np.matmul(self.mesh.vertices, self.matrices[:, :3, :3].transpose(0, 2, 1), out=vertices)
+        vertices += self.matrices[:, None, :3, 3]
+        self._batch.touch()
+
+        return self._batch
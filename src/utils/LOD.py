@@ -0,0 +1,94 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+from utils.Polygon import Polygon3D, Face
+from utils.Point import Point, Plane
+from utils.Simplify import simplify
+from utils.Transform import Transform
+import numpy as np
+import math
+
+class LODShape(Polygon3D):
+    """
+    A Polygon3D with several levels of detail: levels[0] is the full mesh and every following level is coarser.
+    LODShape.mesh is the level currently selected, so everything that works with a Polygon3D draws the
+    selected level. Render selects levels every frame from the projected screen size, see LODShape.select.
+
+    screen_sizes[i] is the projected size (in pixels, the larger side of the screen bounding box) from which
+    level i is used, decreasing, the coarsest level's being 0. By default level i is kept until the next level's
+    faces would cover more than face_pixels pixels each.
+
+    Transforms apply to every level (lazily, so unused levels cost nothing until they are drawn).
+    """
+
+    def __init__(self, levels: list[Mesh], screen_sizes: list[float] | None = None, hysteresis: float = 0.2, face_pixels: float = 32):
+        if len(levels) == 0:
+            raise ValueError("LODShape needs at least one level.")
+
+        if screen_sizes is None:
+            # A closed object shows about half its faces over an area of about size^2 pixels.
+            screen_sizes = [math.sqrt(face_pixels * level.face_count / 2) for level in levels[1:]] + [0]
+
+        self.levels = levels
+        self.screen_sizes = np.array(screen_sizes, dtype=np.float64)
+        self.hysteresis = hysteresis
+        self.level = 0
+        self._faces = None
+        self._faces_level = None
+
+    @classmethod
+    def build(cls, mesh: Mesh, count: int = 4, ratio: float = 0.25, min_faces: int = 12, **options) -> LODShape:
+        """
+        Builds count levels from mesh by repeated simplification, each with about ratio times the faces of the
+        previous one. Stops early once a level would have fewer than min_faces faces.
+        """
+        levels = [mesh]
+        while len(levels) < count:
+            target = int(levels[-1].face_count * ratio)
+            if target < min_faces:
+                break
+
+            levels.append(simplify(levels[-1], target))
+
+        return cls(levels, **options)
+
+    @property
+    def mesh(self) -> Mesh:
+        return self.levels[self.level]
+
+    @property
+    def faces(self) -> list[Face]:
+        if self._faces_level != self.level:
+            self._faces = None
+            self._faces_level = self.level
+
+        return super().faces
+
+    def select(self, screen_size: float) -> int:
+        """
+        Picks the level for an object screen_size pixels large. Moving to a finer level needs screen_size to pass
+        the level's threshold by the hysteresis fraction, and moving to a coarser one to drop below it by as much,
+        so objects hovering around a threshold keep their level instead of flickering.
+        """
+        finest = self._level_for(screen_size / (1 - self.hysteresis))
+        coarsest = self._level_for(screen_size / (1 + self.hysteresis))
+
+        self.level = min(max(self.level, finest), coarsest)
+        return self.level
+
+    def _level_for(self, screen_size: float) -> int:
+        return int(np.argmax(screen_size >= self.screen_sizes))
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Bounding box corners, taken from the coarsest level since it is the cheapest to scan.
+        """
+        vertices = self.levels[-1].vertices
+        return vertices.min(axis=0), vertices.max(axis=0)
+
+    def rotate(self, about: Point, angle: int | float, plane: Plane):
+        for level in self.levels:
+            level.rotate(about, angle, plane)
+
+    def transform(self, transform: Transform):
+        for level in self.levels:
+            level.transform(transform)
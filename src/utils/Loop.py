@@ -0,0 +1,197 @@
+from __future__ import annotations
+from utils.Render import Render
+from typing import Callable
+import pygame as pg
+import time
+
+# (antialias, resolution_scale) pairs for QualityController, from best looking to cheapest.
+QUALITY_LEVELS = ((True, 1.0), (False, 1.0), (False, 0.75), (False, 0.5))
+
+class QualityController:
+    """
+    Holds a frame time budget by stepping Render quality down when frames take too long and back up when there is
+    room again, through levels of (antialias, resolution_scale) settings (see Render).
+
+    Frame times are the work of a frame (updates and drawing), not the time spent waiting for the next one, and are
+    smoothed with an exponential moving average. Quality drops as soon as the average exceeds budget and rises once
+    it has stayed under headroom * budget for patience frames, so a level that only just fits is not toggled back
+    and forth. The average starts over after every change, the new level has to be measured on its own.
+    """
+
+    def __init__(self, budget: float, levels: tuple[tuple] = QUALITY_LEVELS, headroom: float = 0.6, patience: int = 30, smoothing: float = 0.2):
+        self.budget = budget
+        self.levels = levels
+        self.headroom = headroom
+        self.patience = patience
+        self.smoothing = smoothing
+
+        self.level = 0
+        self.average = None
+        self._samples = 0
+        self._calm = 0
+
+    def record(self, frame_time: float) -> bool:
+        """
+        Adds a measured frame time. Returns whether the level changed.
+        """
+        self._samples += 1
+        if self.average is None:
+            self.average = frame_time
+        else:
+            self.average += self.smoothing * (frame_time - self.average)
+
+        # A few frames before trusting the average, the first ones after a change pay for rebuilt buffers.
+        if self._samples < 3:
+            return False
+
+        if self.average > self.budget and self.level < len(self.levels) - 1:
+            return self._set_level(self.level + 1)
+
+        self._calm = self._calm + 1 if self.average < self.headroom * self.budget else 0
+        if self._calm >= self.patience and self.level > 0:
+            return self._set_level(self.level - 1)
+
+        return False
+
+    def apply(self, render: Render):
+        render.antialias, render.resolution_scale = self.levels[self.level]
+
+    def _set_level(self, level: int) -> bool:
+        self.level = level
+        self.average = None
+        self._samples = 0
+        self._calm = 0
+
+        return True
+
+class GameLoop:
+    """
+    Runs a render loop at a steady pace, decoupling simulation speed from frame rate.
+
+    update(dt) advances the scene by exactly timestep seconds, and is called as many times as the time since the
+    last frame calls for (at most max_updates per frame, the backlog is dropped after a stall), so animations run at
+    the same speed whatever the frame rate. It returns whether anything changed, None counts as a change.
+    draw(render) draws the scene between Render.begin_frame and Render.end_frame, then the frame is presented.
+    handle(event) receives every pygame event, QUIT stops the loop.
+
+    Frames are only drawn when an update changed something, an event arrived or invalidate was called, and are
+    paced to target_fps with pg.time.Clock, which sleeps instead of spinning. While the scene is idle the loop
+    blocks in pg.event.wait until the next update is due or input arrives, so an unchanging scene costs next to
+    no CPU. alpha is how far real time is into the next update, for draw to interpolate with.
+
+    With a QualityController, every drawn frame's time is recorded and Render quality adjusted to hold its budget.
+    """
+
+    def __init__(self, render: Render, update: Callable[[float], bool | None], draw: Callable[[Render], None], handle: Callable[[pg.event.Event], None] | None = None,
+                 timestep: float = 1 / 60, target_fps: int = 60, max_updates: int = 5, quality: QualityController | None = None, present: bool = True):
+        self.render = render
+        self.update = update
+        self.draw = draw
+        self.handle = handle
+        self.timestep = timestep
+        self.target_fps = target_fps
+        self.max_updates = max_updates
+        self.quality = quality
+        self.present = present
+
+        self.clock = pg.time.Clock()
+        self.running = True
+        self.frames = 0
+        self.updates = 0
+        self.idle = 0
+
+        self._lag = 0.0
+        self._last = None
+        self._dirty = True
+
+        if quality is not None:
+            quality.apply(render)
+
+    @property
+    def alpha(self) -> float:
+        return self._lag / self.timestep
+
+    def invalidate(self):
+        """
+        Asks for a frame to be drawn even if no update reports a change.
+        """
+        self._dirty = True
+
+    def stop(self):
+        self.running = False
+
+    def run(self, frames: int = 0) -> int:
+        """
+        Loops until stopped, a QUIT event or (if frames is not 0) that many frames were drawn.
+        Returns the number of frames drawn.
+        """
+        self.running = True
+        self._last = time.perf_counter()
+        stop_at = self.frames + frames
+
+        while self.running and (not frames or self.frames < stop_at):
+            self.step()
+
+        return self.frames
+
+    def step(self) -> bool:
+        """
+        One pass of the loop: events, due updates, then a frame if anything changed or a nap until the next update.
+        Returns whether a frame was drawn.
+        """
+        start = time.perf_counter()
+        if self._last is None:
+            self._last = start
+        self._lag += min(start - self._last, self.max_updates * self.timestep)
+        self._last = start
+
+        for event in pg.event.get():
+            self._dispatch(event)
+
+        steps = 0
+        while self._lag >= self.timestep and steps < self.max_updates:
+            if self.update(self.timestep) is not False:
+                self._dirty = True
+            self._lag -= self.timestep
+            self.updates += 1
+            steps += 1
+        if steps == self.max_updates:
+            # Too far behind to catch up, drop the backlog rather than spiral.
+            self._lag %= self.timestep
+
+        if not self.running:
+            return False
+
+        if not self._dirty:
+            self.idle += 1
+            # Sleep until the next update is due, waking early for input.
+            wait = max(1, int((self.timestep - self._lag) * 1000))
+            event = pg.event.wait(wait)
+            if event.type != pg.NOEVENT:
+                self._dispatch(event)
+            return False
+
+        self.render.begin_frame()
+        self.draw(self.render)
+        self.render.end_frame()
+        if self.present:
+            self.render.present()
+
+        self.frames += 1
+        self._dirty = False
+
+        if self.quality is not None and self.quality.record(time.perf_counter() - start):
+            self.quality.apply(self.render)
+
+        self.clock.tick(self.target_fps)
+
+        return True
+
+    def _dispatch(self, event: pg.event.Event):
+        if event.type == pg.QUIT:
+            self.running = False
+            return
+
+        if self.handle is not None:
+            self.handle(event)
+        self._dirty = True
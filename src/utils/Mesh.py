@@ -0,0 +1,420 @@
+from __future__ import annotations
+from exceptions.GraphicsExceptions import MeshError
+from utils.Point import Point, Point3D, Plane
+from utils.Transform import Transform
+from utils.Welding import weld_vertices, edge_adjacency
+import numpy as np
+import math
+
+DEFAULT_FACE_COLOR = (0, 0, 255)
+
+# How many partial vertex changes Mesh remembers for changed_rows before treating older ones as whole-mesh changes.
+CHANGE_LOG_SIZE = 16
+
+class Mesh:
+    """
+    An indexed mesh. All vertices live in one contiguous float array of shape (N, 3) and every face is a run of
+    integer indices into that array, so a corner shared by several faces is stored (and moved) exactly once.
+
+    Faces may have any number of vertices >= 3. They are stored flattened:
+    indices[offsets[i]:offsets[i+1]] are the vertex indices of face i, in drawing order.
+    colors holds one RGB row per face.
+
+    Whole-mesh transforms are lazy: Mesh.transform only composes the transform into a pending matrix, which is
+    applied to the vertex buffer (one matrix product) the next time anything reads Mesh.vertices.
+
+    Mesh.version changes whenever the vertices do, so caches built from the geometry can tell when they are stale,
+    and Mesh.changed_rows tells them which vertices moved when only some did.
+    Code writing into the vertex array directly should call Mesh.touch afterwards.
+    """
+
+    def __init__(self, vertices, faces, colors: tuple[int] | np.ndarray | None = None):
+        self.vertices = np.array(vertices, dtype=np.float64).reshape(-1, 3)
+
+        if isinstance(faces, np.ndarray) and faces.ndim == 2:
+            # Uniform faces (all triangles, all quads...) can skip the per-face loop entirely.
+            face_count, face_size = faces.shape
+            self.indices = np.ascontiguousarray(faces, dtype=np.int64).reshape(-1)
+            self.offsets = np.arange(face_count + 1, dtype=np.int64) * face_size
+        else:
+            faces = [np.asarray(face, dtype=np.int64).reshape(-1) for face in faces]
+            sizes = np.fromiter((len(face) for face in faces), dtype=np.int64, count=len(faces))
+
+            self.indices = np.concatenate(faces) if faces else np.zeros(0, dtype=np.int64)
+            self.offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=self.offsets[1:])
+
+        if np.any(np.diff(self.offsets) < 3):
+            raise MeshError("Mesh face with fewer than 3 vertices (line, point or empty) cannot be constructed.")
+        if len(self.indices) and (self.indices.min() < 0 or self.indices.max() >= len(self.vertices)):
+            raise MeshError(f"Mesh face index out of range for {len(self.vertices)} vertices.")
+
+        if colors is None:
+            colors = DEFAULT_FACE_COLOR
+        self.colors = np.empty((self.face_count, 3), dtype=np.uint8)
+        self.colors[:] = colors
+
+        self._triangles = None
+        self._edges = None
+        self._normals = None
+        self._normals_version = None
+
+    @classmethod
+    def from_buffers(cls, vertices: np.ndarray, indices: np.ndarray, offsets: np.ndarray, colors: np.ndarray) -> Mesh:
+        """
+        Wraps already flattened buffers (see the class docstring) without copying or validating them.
+        """
+        mesh = cls.__new__(cls)
+        mesh.vertices = vertices
+        mesh.indices = indices
+        mesh.offsets = offsets
+        mesh.colors = colors
+        mesh._triangles = None
+        mesh._edges = None
+        mesh._normals = None
+        mesh._normals_version = None
+
+        return mesh
+
+    @classmethod
+    def from_faces(cls, faces: list, tolerance: float = 0.0) -> Mesh:
+        """
+        Builds a Mesh out of Point-owning Faces. Vertices closer than tolerance (by default only identical ones)
+        are merged into one, see weld_vertices.
+        """
+        sizes = [len(face.vertices) for face in faces]
+        points = np.array([point.coords for face in faces for point in face.vertices], dtype=np.float64)
+        vertices, inverse = weld_vertices(points, tolerance)
+
+        return cls(vertices, np.split(inverse, np.cumsum(sizes)[:-1]), [face.color for face in faces])
+
+    @staticmethod
+    def concatenate(meshes: list[Mesh]) -> Mesh:
+        """
+        Returns a new Mesh holding copies of every given mesh, with indices rebased onto the merged vertex buffer.
+        """
+        vertex_starts = np.cumsum([0] + [len(mesh.vertices) for mesh in meshes])
+        index_starts = np.cumsum([0] + [len(mesh.indices) for mesh in meshes])
+
+        merged = Mesh.from_buffers(
+            np.concatenate([mesh.vertices for mesh in meshes]),
+            np.concatenate([mesh.indices + start for mesh, start in zip(meshes, vertex_starts)]),
+            np.concatenate([[0]] + [mesh.offsets[1:] + start for mesh, start in zip(meshes, index_starts)]),
+            np.concatenate([mesh.colors for mesh in meshes])
+        )
+
+        if all(mesh._has_normals() for mesh in meshes):
+            merged._set_normals(np.concatenate([mesh._normals for mesh in meshes]))
+
+        return merged
+
+    @property
+    def vertices(self) -> np.ndarray:
+        if self._pending is not None:
+            self._vertices[:] = self._pending.apply(self._vertices)
+
+            normals = transform_normals(self._normals, self._pending) if self._has_normals() else None
+            self._pending = None
+            self._version += 1
+            self._log_change(None)
+
+            if normals is not None:
+                self._set_normals(normals)
+
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices: np.ndarray):
+        self._vertices = vertices
+        self._pending = None
+        self._version = getattr(self, "_version", -1) + 1
+        self._log_change(None)
+
+    @property
+    def version(self) -> int:
+        # A pending transform already counts as a change, flushing it keeps the same number.
+        return self._version + (self._pending is not None)
+
+    def touch(self, rows: np.ndarray | None = None):
+        """
+        Marks the vertices as changed after they were written to directly.
+        rows, when known, are the only vertices that changed.
+        """
+        self.vertices # Flushes any pending transform first
+        self._version += 1
+        self._log_change(rows)
+
+    def changed_rows(self, since: int) -> np.ndarray | None:
+        """
+        The vertices that changed after version since, or None when that is unknown (or all of them), which happens
+        after whole-mesh transforms, replaced buffers or more than CHANGE_LOG_SIZE partial changes.
+        """
+        self.vertices # A pending transform is a whole-mesh change
+        if since < self._full_change:
+            return None
+
+        changes = [rows for version, rows in self._changes if version > since]
+        if not changes:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.unique(np.concatenate(changes))
+
+    def _log_change(self, rows: np.ndarray | None):
+        if rows is None:
+            self._full_change = self._version
+            self._changes = []
+            return
+
+        self._changes.append((self._version, np.asarray(rows, dtype=np.int64).reshape(-1)))
+        if len(self._changes) > CHANGE_LOG_SIZE:
+            # Forgetting a change means not knowing which rows changed at that version.
+            self._full_change = self._changes.pop(0)[0]
+
+    @property
+    def pending(self) -> Transform | None:
+        """
+        The transform accumulated since the vertex buffer was last brought up to date, if any.
+        """
+        return self._pending
+
+    @property
+    def face_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def face_sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return self.vertices.nbytes + self.indices.nbytes + self.offsets.nbytes + self.colors.nbytes
+
+    def face(self, index: int) -> np.ndarray:
+        """
+        Returns the vertex indices of a face. This is a view, not a copy.
+        """
+        return self.indices[self.offsets[index]:self.offsets[index + 1]]
+
+    def face_vertices(self, index: int) -> np.ndarray:
+        return self.vertices[self.face(index)]
+
+    def corners(self, faces: np.ndarray) -> np.ndarray:
+        """
+        Flat positions in indices of every corner of the given faces, face after face.
+        """
+        sizes = self.face_sizes[faces]
+        starts = np.cumsum(sizes) - sizes
+
+        return np.repeat(self.offsets[faces] - starts, sizes) + np.arange(sizes.sum())
+
+    def normals(self) -> np.ndarray:
+        """
+        The (F, 3) array of unit face normals, see newell_normals. Zero for degenerate faces.
+
+        Computed once and cached with the geometry: whole-mesh transforms apply the same matrix to the cached
+        normals as to the vertices instead of recomputing them, other vertex changes recompute them.
+        """
+        vertices = self.vertices
+        if not self._has_normals():
+            self._set_normals(unit_normals(newell_normals(vertices, self.indices, self.offsets)))
+
+        return self._normals
+
+    def _has_normals(self) -> bool:
+        return self._normals is not None and self._normals_version == self._version
+
+    def _set_normals(self, normals: np.ndarray):
+        self._normals = normals
+        self._normals_version = self._version
+
+    def transformed(self, transform: Transform) -> Mesh:
+        """
+        A new Mesh with transform applied to a copy of the vertices, sharing topology, colours and cached
+        triangles and edges with this one. Cached normals are carried over like the vertices, see normals.
+        """
+        moved = Mesh.from_buffers(transform.apply(self.vertices), self.indices, self.offsets, self.colors)
+        moved._triangles = self._triangles
+        moved._edges = self._edges
+
+        if self._has_normals():
+            normals = transform_normals(self._normals, transform)
+            if normals is not None:
+                moved._set_normals(normals)
+
+        return moved
+
+    def face_centers(self) -> np.ndarray:
+        """
+        Returns the (F, 3) array of face centers, the average of each face's vertices.
+        """
+        if self.face_count == 0:
+            return np.zeros((0, 3))
+
+        totals = np.add.reduceat(self.vertices[self.indices], self.offsets[:-1], axis=0)
+        return totals / self.face_sizes[:, None]
+
+    def face_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the (F, 3) arrays of per-face minimum and maximum corners (axis aligned bounding boxes).
+        """
+        if self.face_count == 0:
+            return np.zeros((0, 3)), np.zeros((0, 3))
+
+        corners = self.vertices[self.indices]
+        return np.minimum.reduceat(corners, self.offsets[:-1], axis=0), np.maximum.reduceat(corners, self.offsets[:-1], axis=0)
+
+    def triangles(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fan-triangulates every face. Returns a (T, 3) array of vertex indices and a (T,) array mapping each
+        triangle back to the face it came from. Topology never changes after construction, so this is cached.
+        """
+        if self._triangles is None:
+            sizes = self.face_sizes
+            counts = sizes - 2
+            triangle_faces = np.repeat(np.arange(self.face_count), counts)
+
+            # Position of each triangle within its own face's fan: 1, 2, ..., size - 2
+            first = np.cumsum(counts) - counts
+            fan = np.arange(len(triangle_faces)) - np.repeat(first, counts) + 1
+
+            base = self.offsets[:-1][triangle_faces]
+            triangles = np.stack([
+                self.indices[base],
+                self.indices[base + fan],
+                self.indices[base + fan + 1]
+            ], axis=1)
+
+            self._triangles = (triangles, triangle_faces)
+
+        return self._triangles
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Edge adjacency, see edge_adjacency: the (E, 2) undirected edges, how many faces use each one, and the edge of
+        every face side. Cached like triangles.
+        """
+        if self._edges is None:
+            self._edges = edge_adjacency(self.indices, self.offsets)
+
+        return self._edges
+
+    def is_closed(self) -> bool:
+        """
+        A mesh is closed when it has no boundary: every edge is shared by at least two faces.
+        """
+        return not np.any(self.edges()[1] == 1)
+
+    def is_manifold(self) -> bool:
+        """
+        No edge is shared by more than two faces.
+        """
+        return not np.any(self.edges()[1] > 2)
+
+    def weld(self, tolerance: float = 0.0) -> Mesh:
+        """
+        Returns a new Mesh with vertices closer than tolerance merged and the faces re-indexed onto them.
+        """
+        vertices, inverse = weld_vertices(self.vertices, tolerance)
+
+        return Mesh.from_buffers(vertices, inverse[self.indices], self.offsets.copy(), self.colors.copy())
+
+    def submesh(self, faces: np.ndarray | slice) -> Mesh:
+        """
+        Returns a new Mesh made of the given faces, keeping only the vertices they use.
+        """
+        faces = np.arange(self.face_count)[faces] if isinstance(faces, slice) else np.asarray(faces, dtype=np.int64)
+        sizes = self.face_sizes[faces]
+
+        used, indices = np.unique(self.indices[self.corners(faces)], return_inverse=True)
+        offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        return Mesh.from_buffers(self.vertices[used], indices.reshape(-1), offsets, self.colors[faces])
+
+    def transform(self, transform: Transform) -> Mesh:
+        """
+        Lazily applies transform to every vertex. Returns self afterwards.
+        """
+        if self._pending is None:
+            self._pending = transform
+        else:
+            self._pending = transform @ self._pending
+
+        return self
+
+    def rotate(self, about: Point, angle: int | float, plane: Plane, vertex_ids: np.ndarray | None = None) -> Mesh:
+        """
+        Rotation with the same conventions as Point.rotate. Returns self afterwards.
+        By default every vertex is rotated (lazily), vertex_ids restricts the rotation to a subset.
+        """
+
+        # Point.rotate measures the angle from the vertex towards the pivot, which adds half a turn.
+        rotation = Transform.rotation(about, angle + math.pi, plane)
+
+        if vertex_ids is None:
+            return self.transform(rotation)
+
+        rows = np.unique(vertex_ids)
+        self.vertices[rows] = rotation.apply(self.vertices[rows])
+        self._version += 1
+        self._log_change(rows)
+
+        return self
+
+    def translate(self, offset: Point3D) -> Mesh:
+        return self.transform(Transform.translation(offset))
+
+    def copy(self) -> Mesh:
+        copied = Mesh.from_buffers(self.vertices.copy(), self.indices.copy(), self.offsets.copy(), self.colors.copy())
+        copied._triangles = self._triangles
+        copied._edges = self._edges
+
+        return copied
+
+def newell_normals(vertices: np.ndarray, indices: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Returns the (F, 3) array of (unnormalised) face normals of flattened faces (see Mesh), using Newell's method so
+    faces with more than 3 vertices and slightly non-planar faces are handled. Counter-clockwise winding
+    (right hand rule) points the normal outwards.
+    """
+    if len(offsets) < 2:
+        return np.zeros((0, 3))
+
+    current = vertices[indices]
+
+    # The next vertex around each face, wrapping the last one back to the first.
+    following = np.arange(1, len(indices) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]
+    following = current[following]
+
+    terms = np.empty_like(current)
+    terms[:, 0] = (current[:, 1] - following[:, 1]) * (current[:, 2] + following[:, 2])
+    terms[:, 1] = (current[:, 2] - following[:, 2]) * (current[:, 0] + following[:, 0])
+    terms[:, 2] = (current[:, 0] - following[:, 0]) * (current[:, 1] + following[:, 1])
+
+    return np.add.reduceat(terms, offsets[:-1], axis=0)
+
+def unit_normals(normals: np.ndarray) -> np.ndarray:
+    """
+    normals scaled to unit length, zero rows stay zero.
+    """
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+def transform_normals(normals: np.ndarray, transform: Transform) -> np.ndarray | None:
+    """
+    Unit normals of faces after transform is applied to their vertices, or None when transform flattens space.
+    Normals go through the inverse transpose of the linear part, so non-uniform scales keep them perpendicular, and a
+    mirroring transform flips them along with the winding it reverses, matching newell_normals of the moved faces.
+    """
+    linear = transform.linear
+    determinant = np.linalg.det(linear)
+    if abs(determinant) < 1e-12:
+        return None
+
+    # Row vectors: n @ inv(L) is inv(L).T @ n.
+    return unit_normals(normals @ np.linalg.inv(linear) * np.sign(determinant))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+from utils.Camera import Camera
+from utils.Mesh import Mesh
+from utils.Polygon import Polygon3D, CompositeShape, Face
+from utils.BVH import BVH
+import numpy as np
+
+class Hit:
+    """
+    What a screen point sees: face number face of component (whose geometry is mesh), at point in world space,
+    distance away from the viewer as measured by the camera's projection (see Projection.distances).
+    """
+
+    def __init__(self, component: Polygon3D | Mesh, mesh: Mesh, face: int, point: np.ndarray, distance: float):
+        self.component = component
+        self.mesh = mesh
+        self.face = face
+        self.point = point
+        self.distance = distance
+
+    def __repr__(self) -> str:
+        return f'Hit(face={self.face}, point={self.point.tolist()}, distance={self.distance})'
+
+    def as_face(self) -> Face:
+        """
+        A Face view of the face that was hit.
+        """
+        return Face.view(self.mesh, self.face)
+
+class Picker:
+    """
+    Finds what is drawn under screen points, for mouse selection and hit testing.
+
+    The ray of a screen point is unprojected into screen-depth space, (screen x, screen y, camera depth), where it is
+    a straight line along the depth axis for every projection, and is tested there against triangles whose corners
+    are projected the same way. That is Möller-Trumbore with the ray direction fixed to the depth axis: the hit is
+    inside a triangle when the point's barycentric coordinates in the projected triangle are, and the same
+    coordinates give the depth of the hit, which Camera.unproject turns back into a world point. Hits therefore match
+    what Render draws, whatever the projection.
+
+    Candidate triangles come from a BVH over the shape (the shape's own if it has one, see CompositeShape.build_bvh),
+    refitted when components move: only faces whose projected boxes surround a point are tested, so a query costs
+    a few tree levels and a handful of triangles rather than a pass over every face. Many points are queried at
+    once with pick_many.
+    """
+
+    def __init__(self, shape: Polygon3D | CompositeShape | Mesh | list[Mesh], leaf_size: int = 8):
+        self.shape = shape
+        self.components = _components(shape)
+        self.meshes = [component if isinstance(component, Mesh) else component.mesh for component in self.components]
+
+        bvh = shape.bvh if isinstance(shape, CompositeShape) else None
+        self.bvh = bvh if bvh is not None and bvh.meshes == self.meshes else BVH(self.meshes, leaf_size)
+
+    def pick(self, camera: Camera, x: float, y: float) -> Hit | None:
+        """
+        The nearest hit under screen point (x, y), None when nothing is drawn there.
+        """
+        return self.pick_many(camera, [(x, y)])[0]
+
+    def pick_many(self, camera: Camera, points: np.ndarray) -> list[Hit | None]:
+        """
+        The nearest hit under each of the (N, 2) screen points.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        hits = [None] * len(points)
+
+        # LODShapes may have changed level since the last pick, the BVH swaps their subtrees to match.
+        self.meshes = [component if isinstance(component, Mesh) else component.mesh for component in self.components]
+        self.bvh.update(self.meshes)
+        rays, faces = self.bvh.pick(points, camera.project, (camera, camera.version))
+        if not len(rays):
+            return hits
+
+        components = np.searchsorted(self.bvh.face_starts, faces, side="right") - 1
+        found = [self._hits(camera, points, component, rays[components == component], faces[components == component] - self.bvh.face_starts[component])
+                 for component in np.unique(components).tolist()]
+
+        rays, components, faces, depths = (np.concatenate(parts) for parts in zip(*found))
+        if not len(rays):
+            return hits
+
+        distances = camera.projection.distances(camera.projection.unproject(points[rays], depths))
+
+        # Nearest hit of every point: sort by point, then distance, and keep the first of each point.
+        order = np.lexsort((distances, rays))
+        _, first = np.unique(rays[order], return_index=True)
+        nearest = order[first]
+        world = camera.unproject(points[rays[nearest]], depths[nearest])
+
+        for hit, point in zip(nearest.tolist(), world):
+            component = components[hit]
+            hits[rays[hit]] = Hit(self.components[component], self.meshes[component], int(faces[hit]), point, float(distances[hit]))
+
+        return hits
+
+    def _hits(self, camera: Camera, points: np.ndarray, component: int, rays: np.ndarray, faces: np.ndarray) -> tuple[np.ndarray]:
+        """
+        Every (point, triangle) intersection among the candidate faces of one component, with the depth of the hit.
+        """
+        mesh = self.meshes[component]
+        triangles, _ = mesh.triangles()
+
+        # The fan of face f is triangles offsets[f] - 2f onwards, one per corner beyond the second.
+        counts = mesh.offsets[faces + 1] - mesh.offsets[faces] - 2
+        firsts = mesh.offsets[faces] - 2 * faces
+        candidates = np.repeat(firsts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        rays = np.repeat(rays, counts)
+        faces = np.repeat(faces, counts)
+
+        flat = mesh.vertices[triangles[candidates]].reshape(-1, 3)
+        screen = camera.project(flat).reshape(-1, 3, 2)
+        view = camera.to_view(flat).reshape(-1, 3, 3)
+
+        a = screen[:, 0]
+        edge1 = screen[:, 1] - a
+        edge2 = screen[:, 2] - a
+        offset = points[rays] - a
+
+        determinant = edge1[:, 0] * edge2[:, 1] - edge1[:, 1] * edge2[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = (offset[:, 0] * edge2[:, 1] - offset[:, 1] * edge2[:, 0]) / determinant
+            v = (edge1[:, 0] * offset[:, 1] - edge1[:, 1] * offset[:, 0]) / determinant
+
+        inside = (determinant != 0) & (u >= 0) & (v >= 0) & (u + v <= 1)
+        u, v, depth = u[inside], v[inside], view[inside, :, 2]
+
+        # Depth is interpolated across the screen like the rasterizer does, pick_many unprojects it back along the ray.
+        depth = depth[:, 0] + u * (depth[:, 1] - depth[:, 0]) + v * (depth[:, 2] - depth[:, 0])
+
+        return rays[inside], np.full(len(depth), component), faces[inside], depth
+
+def _components(shape: Polygon3D | CompositeShape | Mesh | list[Mesh]) -> list[Polygon3D | Mesh]:
+    if isinstance(shape, CompositeShape):
+        components = []
+        for component in shape.components:
+            # Nested composites contribute all of their components, like CompositeShape.meshes.
+            components.extend(_components(component) if isinstance(component, CompositeShape) else [component])
+        return components
+
+    if isinstance(shape, (Polygon3D, Mesh)):
+        return [shape]
+
+    return list(shape)
@@ -1,13 +1,28 @@
 from __future__ import annotations
 from exceptions.GraphicsExceptions import PointDimensionException, PointImplementationError
-from utils.functions import depth_attenuation
+from utils.functions import attenuation_curve
 from constants import VIEWPORT_RESOLUTION
+import numpy as np
 import math
 
 class Point:
+    """
+    Points are immutable-looking tuples of coordinates with arithmetic. coords is the single source of truth,
+    named accessors (x, y, z) in subclasses read from it, and instances carry no __dict__.
+    """
+    __slots__ = ("coords",)
+
     def __init__(self, x: int | float, y: int | float, *higher: int | float):
         self.coords = (x, y, *higher)
 
+    def _new(self, *coords: int | float) -> Point:
+        """
+        Builds the result of an arithmetic operation. Views onto shared buffers override this to return plain points.
+        """
+        try:
+            return type(self)(*coords)
+        except TypeError:
+            raise PointImplementationError
 
     def dist(self, other: Point) -> float:
         """
@@ -15,43 +30,31 @@ class Point:
         """
         if isinstance(other, Point):
             p1, p2 = self.coords, other.coords
-            p1_dim, p2_dim = len(p1), len(p2)
 
-            if p1_dim != p2_dim: raise PointDimensionException(f"Point dimension mismatch in distance operation: {p1} and {p2}")
+            if len(p1) != len(p2): raise PointDimensionException(f"Point dimension mismatch in distance operation: {p1} and {p2}")
 
-            return math.sqrt(sum( (p1[pos] - p2[pos])**2 for pos in range(p1_dim) ))
+            return math.sqrt(sum((a - b)**2 for a, b in zip(p1, p2)))
         else:
             raise ValueError(f"Distance calculation between Point and non-Point: dist({self}, {other})")
 
     def __add__(self, other: Point) -> Point:
         if isinstance(other, Point):
             p1, p2 = self.coords, other.coords
-            p1_dim, p2_dim = len(p1), len(p2)
-            cls = type(self) # We record the class here so that any subclass of Point can add with itself so long as it is defined in the expected format.
-            
-            if p1_dim != p2_dim: raise PointDimensionException(f"Point dimension mismatch in addition operation: {p1} and {p2}")
-
-            try:
-                new = cls(*tuple(p1[pos] + p2[pos] for pos in range(p1_dim)))
-                return new 
-            except TypeError:
-                raise PointImplementationError
+
+            if len(p1) != len(p2): raise PointDimensionException(f"Point dimension mismatch in addition operation: {p1} and {p2}")
+
+            # Any subclass of Point can add with itself so long as its constructor is defined in the expected format.
+            return self._new(*[a + b for a, b in zip(p1, p2)])
         else:
             raise ValueError(f"Addition for Point objects only supported between other Point objects: attempted {self} + {other}")
 
     def __sub__(self, other: Point) -> Point:
         if isinstance(other, Point):
             p1, p2 = self.coords, other.coords
-            p1_dim, p2_dim = len(p1), len(p2)
-            cls = type(self) # We record the class here so that any subclass of Point can add with itself so long as it is defined in the expected format.
-            
-            if p1_dim != p2_dim: raise PointDimensionException(f"Point dimension mismatch in subtraction operation: {p1} and {p2}")
-    
-            try:
-                new = cls(*tuple(p1[pos] - p2[pos] for pos in range(p1_dim)))
-                return new 
-            except TypeError:
-                raise PointImplementationError
+
+            if len(p1) != len(p2): raise PointDimensionException(f"Point dimension mismatch in subtraction operation: {p1} and {p2}")
+
+            return self._new(*[a - b for a, b in zip(p1, p2)])
         else:
             raise ValueError(f"Subtraction for Point objects only supported between other Point objects: attempted {self} - {other}")
     
@@ -65,12 +68,7 @@ class Point:
         if isinstance(other, Point):
             raise ValueError(f"Multiplication and division not supported between two Point objects. Did you mean to use a scalar? Attempted: {self} * {other}")
         elif isinstance(other, (int, float)):
-            cls = type(self)
-            try:
-                new = cls(*tuple(other * component for component in self.coords))
-                return new
-            except TypeError:
-                return PointImplementationError
+            return self._new(*[other * component for component in self.coords])
         else:
             # NotImplemented is raised to support Point() * ClientType behavior (so long as ClientType implements __rmul__)
             raise NotImplemented
@@ -94,27 +92,23 @@ class Point:
         raise ValueError(f"Exponentiation not supported for Point objects: {self}**{other}")
 
     def __neg__(self) -> Point:
-        cls = type(self)
-        try:
-            new = cls(*tuple(-component for component in self.coords))
-            return new 
-        except TypeError:
-            raise PointImplementationError
+        return self._new(*[-component for component in self.coords])
     
     def __getitem__(self, key: int | slice):
-        if isinstance(key, int):
+        if isinstance(key, (int, slice)):
             return self.coords[key]
-        elif isinstance(key, slice):
-            return self.coords[key.start:key.stop:key.step]
         else:
             raise TypeError(f"Point indices can only be int or slice, got {type(key)} instead.")
     
     def __iter__(self):
         return iter(self.coords)
 
+    def __len__(self) -> int:
+        return len(self.coords)
+
     def __str__(self) -> str:
         classname = type(self).__name__ 
-        return f'{classname}{self.coords}'
+        return f'{classname}{tuple(self.coords)}'
     
     def setx(self, val):
         """
@@ -122,13 +116,7 @@ class Point:
         Point subclasses that contain coordinates of external types (Decimal for example), or types that dont exist yet
         can't be tested here. I prefer to allow that functionality without overriding, at the cost of allowing bad values.
         """
-
-        self.x = val 
-        
-        coords = list(self.coords)
-        coords[0] = val 
-
-        self.coords = tuple(coords)
+        self.setcoord(0, val)
     
     def sety(self, val):
         """
@@ -136,13 +124,7 @@ class Point:
         Point subclasses that contain coordinates of external types (Decimal for example), or types that dont exist yet
         can't be tested here. I prefer to allow that functionality without overriding, at the cost of allowing bad values.
         """
-
-        self.y = val 
-        
-        coords = list(self.coords)
-        coords[1] = val 
-
-        self.coords = tuple(coords)
+        self.setcoord(1, val)
     
     def setcoord(self, dim: int, val: int | float):
         """
@@ -150,11 +132,10 @@ class Point:
         Point subclasses that contain coordinates of external types (Decimal for example), or types that dont exist yet
         can't be tested here. I prefer to allow that functionality without overriding, at the cost of allowing bad values.
         """
-
-        coords = list(self.coords)
-        coords[dim] = val 
-
-        self.coords = coords
+        # Always a new tuple, never edited in place: caches holding on to the old one (see ProjectionCache) can tell
+        # the point moved, and every other mutator (setx, sety, setz, rotate) goes through here.
+        coords = self.coords
+        self.coords = (*coords[:dim], val, *coords[dim + 1:])
 
     def rotate(self, about: Point, angle: int | float, plane: Plane) -> Point:
         """
@@ -228,10 +209,18 @@ class Plane:
 
 
 class Point2D(Point):
+    __slots__ = ()
+
     def __init__(self, x: int | float, y: int | float) -> Point2D:
-        super().__init__(x, y)
-        self.x = x
-        self.y = y
+        self.coords = (x, y)
+
+    @property
+    def x(self) -> int | float:
+        return self.coords[0]
+
+    @property
+    def y(self) -> int | float:
+        return self.coords[1]
 
     def direction(self, other: Point2D):
         """
@@ -266,41 +255,40 @@ class Point2D(Point):
         return Point3D(self.x, self.y, 0)
     
 class Point3D(Point):
+    __slots__ = ()
+
     def __init__(self, x: int | float, y: int | float, z: int | float):
-        super().__init__(x, y, z)
-        self.x = x
-        self.y = y 
-        self.z = z
+        self.coords = (x, y, z)
 
-    def __update_coords(self):
-        self.x = self.coords[0]
-        self.y = self.coords[1]
-        self.z = self.coords[2]
+    @property
+    def x(self) -> int | float:
+        return self.coords[0]
 
-    def setcoord(self, dim: int, val: int | float):
-        coords = list(self.coords)
-        coords[dim] = val 
+    @property
+    def y(self) -> int | float:
+        return self.coords[1]
 
-        self.coords = coords
-        self.__update_coords()
+    @property
+    def z(self) -> int | float:
+        return self.coords[2]
 
     def setz(self, val):
-        self.z = val 
-        
-        coords = list(self.coords)
-        coords[2] = val 
+        self.setcoord(2, val)
 
-        self.coords = tuple(coords)
-
-    def to_2D(self: Point3D) -> Point2D:
-        flattened = Point2D(self.x, self.y)
+    def to_2D(self: Point3D, attenuation = None) -> Point2D:
+        """
+        attenuation selects the depth attenuation curve, see VanishingPointProjection. By default the default curve.
+        """
+        x, y, z = self.coords
+        curve = attenuation_curve(attenuation)
+        flattened = Point2D(x, y)
 
         viewport_width, viewport_height = VIEWPORT_RESOLUTION
         center_x, center_y = viewport_width/2, viewport_height/2
         vanishing_point = Point2D(center_x, center_y)
 
-        dx = vanishing_point.x - flattened.x
-        dy = vanishing_point.y - flattened.y 
+        dx = center_x - x
+        dy = center_y - y
 
         if dx != 0:
             sign = dx / abs(dx)
@@ -309,10 +297,201 @@ class Point3D(Point):
         else:
             sign = 0
 
-        return flattened + depth_attenuation(self.z) * flattened.dist(vanishing_point) * (flattened.direction(vanishing_point) * sign)
+        # Registered curves have a scalar form, plain functions only take arrays. Either may return numpy scalars,
+        # which would turn the Point2D arithmetic below into array arithmetic.
+        pull = float(curve.scalar(z)) if hasattr(curve, "scalar") else float(curve(np.array([z], dtype=np.float64))[0])
+        return flattened + pull * flattened.dist(vanishing_point) * (flattened.direction(vanishing_point) * sign)
     
     def __str__(self) -> str: 
-        return f'Point3D{self.coords}'
+        return f'Point3D{tuple(self.coords)}'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+class _PointView:
+    """
+    Mixin turning a Point class into a view of one row of a PointArray. Coordinates are read from and written to the
+    shared buffer, arithmetic results are ordinary (owning) points.
+    """
+    __slots__ = ()
+
+    @property
+    def coords(self) -> tuple:
+        return tuple(self._array.buffer[self._row].tolist())
+
+    def setcoord(self, dim: int, val: int | float):
+        self._array.buffer[self._row, dim] = val
+        self._array.touch([self._row])
+
+    def _new(self, *coords: int | float) -> Point:
+        return self._array.point_type(*coords)
+
+class PointView(_PointView, Point):
+    __slots__ = ("_array", "_row")
+
+class Point2DView(_PointView, Point2D):
+    __slots__ = ("_array", "_row")
+
+class Point3DView(_PointView, Point3D):
+    __slots__ = ("_array", "_row")
+
+class PointArray:
+    """
+    A batch of points stored as rows of one float array, optionally a selection of rows of a larger buffer.
+
+    Indexing returns point-like views (Point2D / Point3D subclasses) that read and write the shared buffer without copying,
+    so existing Point code keeps working on them. Bulk operations on the whole array are vectorized.
+
+    owner, when given, is an object whose .vertices is the buffer (a Mesh for example). The buffer is looked up through it
+    on every access and owner.touch(rows) is called after writes, so the owner notices changes made through the views.
+    """
+
+    def __init__(self, data: np.ndarray | None = None, rows: np.ndarray | None = None, owner = None):
+        if owner is None:
+            data = np.asarray(data, dtype=np.float64)
+            if data.ndim != 2 or data.shape[1] < 2:
+                raise PointDimensionException(f"PointArray buffer must have shape (N, dimension >= 2), got {data.shape}")
+
+        self._data = data
+        self._owner = owner
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+
+    @classmethod
+    def from_points(cls, points: list[Point]) -> PointArray:
+        return cls(np.array([point.coords for point in points], dtype=np.float64))
+
+    @property
+    def buffer(self) -> np.ndarray:
+        return self._owner.vertices if self._owner is not None else self._data
+
+    @property
+    def dimension(self) -> int:
+        return self.buffer.shape[1]
+
+    @property
+    def point_type(self) -> type:
+        return {2: Point2D, 3: Point3D}.get(self.dimension, Point)
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        The points as an (N, dimension) array. A view when possible, a copy for row selections.
+        """
+        return self.buffer if self.rows is None else self.buffer[self.rows]
+
+    def touch(self, rows: np.ndarray | None = None):
+        """
+        Tells the owner that rows of the buffer (by default the rows of this array) were written to.
+        """
+        if self._owner is not None:
+            self._owner.touch(self.rows if rows is None else rows)
+
+    def __len__(self) -> int:
+        return len(self.buffer) if self.rows is None else len(self.rows)
+
+    def __getitem__(self, key: int | slice) -> Point | PointArray:
+        if isinstance(key, slice):
+            rows = np.arange(len(self))[key] if self.rows is None else self.rows[key]
+            return PointArray(self._data, rows, self._owner)
+        elif not isinstance(key, (int, np.integer)):
+            raise TypeError(f"PointArray indices can only be int or slice, got {type(key)} instead.")
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(f"PointArray index {key} out of range for {len(self)} points.")
+
+        view_type = {2: Point2DView, 3: Point3DView}.get(self.dimension, PointView)
+        view = view_type.__new__(view_type)
+        view._array = self
+        view._row = key if self.rows is None else int(self.rows[key])
+
+        return view
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def __str__(self) -> str:
+        return f'PointArray({self.array.tolist()})'
 
     def __repr__(self) -> str:
-        return str(self)
\ No newline at end of file
+        return str(self)
+
+    def _operand(self, other) -> np.ndarray:
+        if isinstance(other, PointArray):
+            other = other.array
+        elif isinstance(other, Point):
+            other = np.array(other.coords, dtype=np.float64)
+        else:
+            other = np.asarray(other, dtype=np.float64)
+
+        if other.shape[-1] != self.dimension:
+            raise PointDimensionException(f"Point dimension mismatch between PointArray of dimension {self.dimension} and {other.shape[-1]}")
+
+        return other
+
+    def __add__(self, other: PointArray | Point | np.ndarray) -> PointArray:
+        return PointArray(self.array + self._operand(other))
+
+    def __sub__(self, other: PointArray | Point | np.ndarray) -> PointArray:
+        return PointArray(self.array - self._operand(other))
+
+    def __mul__(self, other: int | float | np.ndarray) -> PointArray:
+        if isinstance(other, (Point, PointArray)):
+            raise ValueError(f"Multiplication and division not supported between two Point objects. Did you mean to use a scalar? Attempted: {self} * {other}")
+
+        other = np.asarray(other, dtype=np.float64)
+        return PointArray(self.array * (other[:, None] if other.ndim == 1 else other))
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> PointArray:
+        return PointArray(-self.array)
+
+    def dist(self, other: PointArray | Point | np.ndarray) -> np.ndarray:
+        """
+        Euclidean distance from every point to other (a single point, or one point per row).
+        """
+        return np.linalg.norm(self.array - self._operand(other), axis=-1)
+
+    def center(self) -> Point:
+        return self.point_type(*self.array.mean(axis=0).tolist())
+
+    def rotate(self, about: Point, angle: int | float, plane: Plane) -> PointArray:
+        """
+        Vectorized in-place version of Point.rotate over every point. Returns self afterwards.
+        """
+        if not isinstance(about, Point):
+            raise TypeError(f"Expected Point, got {type(about)} instead.")
+        elif not isinstance(angle, (int, float)):
+            raise TypeError(f"Expected int or float, got {type(angle)} instead.")
+        elif not isinstance(plane, Plane):
+            raise TypeError(f"Expected Plane, got {type(plane)} instead.")
+
+        dim1, dim2 = plane.basis
+        axis1, axis2 = about.coords[dim1], about.coords[dim2]
+        points = self.array
+
+        # Point.rotate measures the angle from the point towards the pivot, so the rotated offset is flipped.
+        offset1, offset2 = points[:, dim1] - axis1, points[:, dim2] - axis2
+        cos, sin = math.cos(angle), math.sin(angle)
+
+        points[:, dim1] = axis1 - (cos * offset1 - sin * offset2)
+        points[:, dim2] = axis2 - (sin * offset1 + cos * offset2)
+
+        if self.rows is not None:
+            self.buffer[self.rows] = points
+        self.touch()
+
+        return self
+
+    def to_2D(self, attenuation = None) -> PointArray:
+        """
+        Vectorized Point3D.to_2D over every point.
+        """
+        from utils.Projection import project
+
+        if self.dimension != 3:
+            raise PointDimensionException(f"to_2D needs 3D points, got dimension {self.dimension}")
+
+        return PointArray(project(self.array, attenuation=attenuation))
@@ -1,5 +1,12 @@
-from utils.Point import Point, Point2D, Point3D, Plane
+from __future__ import annotations
+from utils.Point import Point, Point2D, Point3D, PointArray, Plane
+from utils.Mesh import Mesh
+from utils.Transform import Transform
+from utils.BVH import BVH
+from utils.Generators import uv_sphere, torus
 from exceptions.GraphicsExceptions import PolygonVertexError, PolygonFaceError
+import numpy as np
+import math
 
 class Polygon:
     def __init__(self, vertices: list[Point], color: tuple[int]):
@@ -13,7 +20,7 @@ class Polygon:
         T = type(vertices[0])
 
         for vertex in vertices:
-            if type(vertex) is not T:
+            if not isinstance(vertex, T):
                 raise PolygonVertexError
             
         self.vertices = vertices
@@ -32,7 +39,7 @@ class Polygon2D(Polygon):
             PolygonVertexError("2D Polygon with fewer than 3 vertices (line, point or empty) cannot be constructed.")
 
         for vertex in vertices:
-            if type(vertex) is not Point2D:
+            if not isinstance(vertex, Point2D):
                 raise PolygonVertexError
         
         self.vertices = vertices
@@ -42,19 +49,74 @@ class Face(Polygon):
     """
     A face is essentially a 2D Polygon positioned in 3D space. Useful and needed for 3D polygons.
     This is also a reason why Polygon3D is not a Polygon subclass, it essentially acts as a manager for Faces instead.
+
+    A Face either owns its own list of Point3D vertices, or is a lightweight view onto one face of a Mesh (see Face.view).
+    Views hold no geometry of their own: vertices are read from the mesh, and rotating a view moves the mesh vertices.
     """
     def __init__(self, vertices: list[Point3D], color: tuple[int] = (0, 0, 255)):
         if len(vertices) < 3:
             PolygonVertexError("Face with fewer than 3 vertices (line, point or empty) cannot be constructed.")
 
         for vertex in vertices:
-            if type(vertex) is not Point3D:
+            if not isinstance(vertex, Point3D):
                 raise PolygonVertexError
         
-        self.vertices = vertices
-        self.color = color
+        self.mesh = None
+        self.index = None
+        self._vertices = vertices
+        self._color = color
+
+    @classmethod
+    def view(cls, mesh: Mesh, index: int) -> Face:
+        face = cls.__new__(cls)
+        face.mesh = mesh
+        face.index = index
+
+        return face
+
+    @property
+    def vertices(self) -> list[Point3D] | PointArray:
+        """
+        For mesh views this is a PointArray over the face's rows of the mesh vertex buffer. Its points are views,
+        so setx/setcoord/rotate on them write back to the mesh (and move every face sharing that corner).
+        """
+        if self.mesh is None:
+            return self._vertices
+
+        return PointArray(rows=self.mesh.face(self.index), owner=self.mesh)
+
+    @vertices.setter
+    def vertices(self, vertices: list[Point3D]):
+        if self.mesh is not None:
+            raise PolygonVertexError("Vertices of a Face viewing a Mesh cannot be replaced, modify the Mesh instead.")
+
+        self._vertices = vertices
+
+    @property
+    def color(self) -> tuple[int]:
+        if self.mesh is None:
+            return self._color
+
+        return tuple(self.mesh.colors[self.index].tolist())
+
+    @color.setter
+    def color(self, color: tuple[int]):
+        if self.mesh is None:
+            self._color = color
+        else:
+            self.mesh.colors[self.index] = color
+
+    def rotate(self, about: Point, angle: int | float, plane: Plane):
+        if self.mesh is None:
+            return super().rotate(about, angle, plane)
+
+        # Vertices are shared, so neighbouring faces holding the same corners move along with this one.
+        self.mesh.rotate(about, angle, plane, self.mesh.face(self.index))
     
     def center(self):
+        if self.mesh is not None:
+            return Point3D(*self.mesh.face_vertices(self.index).mean(axis=0).tolist())
+
         tx = 0
         ty = 0
         tz = 0
@@ -75,9 +137,16 @@ class Polygon3D:
     Note that this class is deliberately not a subclass of Polygon (as counterintuitive as that unfortunately is.)
     It is most effective to consider a 3D Polygon as a collection of 2D Polygons as faces in a sort of tree-like structure, which does not
     fit the mold Polygon wants to enforce.
+
+    Geometry is stored in an indexed Mesh, self.faces are Face views onto it. Faces passed to the constructor are
+    copied into the mesh, with corners shared between faces merged into single vertices.
     """
 
-    def __init__(self, faces: list[Face]):
+    def __init__(self, faces: list[Face], validate: bool = True, tolerance: float = 0.0):
+        """
+        Corners closer than tolerance are welded into one vertex (by default only identical corners).
+        validate=False skips the closure check, for trusted bulk loads or to run it later with Polygon3D.validate.
+        """
 
         if len(faces) < 4:
             raise PolygonFaceError("Polygon3D with fewer than 4 faces cannot be constructed.")
@@ -86,86 +155,93 @@ class Polygon3D:
             if type(face) is not Face:
                 raise PolygonFaceError
 
-        self.faces = faces 
+        self._bind(Mesh.from_faces(faces, tolerance), validate)
 
-        histogram = dict()
-        for face in faces:
-            for point in face.vertices:
-                histogram[str(point)] = histogram.setdefault(str(point), 0) + 1
-        
-        for key in histogram:
-            if histogram[key] < 2:
-                raise PolygonFaceError("Unclosed Polygon3D, one or more faces has at least one free-hanging vertex.")
+    @classmethod
+    def from_mesh(cls, mesh: Mesh, validate: bool = True) -> Polygon3D:
+        """
+        Wraps an existing Mesh without copying it.
+        """
+        if mesh.face_count < 4:
+            raise PolygonFaceError("Polygon3D with fewer than 4 faces cannot be constructed.")
+
+        poly = cls.__new__(cls)
+        poly._bind(mesh, validate)
+
+        return poly
+
+    def _bind(self, mesh: Mesh, validate: bool = True):
+        self.mesh = mesh
+        self._faces = None
+
+        if validate:
+            self.validate()
+
+    def validate(self, manifold: bool = False):
+        """
+        Raises PolygonFaceError unless every edge is shared by at least two faces (and, with manifold, at most two).
+        """
+        if not self.mesh.is_closed():
+            raise PolygonFaceError("Unclosed Polygon3D, one or more faces has at least one free-hanging edge.")
+        if manifold and not self.mesh.is_manifold():
+            raise PolygonFaceError("Non-manifold Polygon3D, one or more edges is shared by more than two faces.")
+
+    @property
+    def faces(self) -> list[Face]:
+        # Face views are only built when someone asks for them, large meshes are usually handled as arrays.
+        if self._faces is None:
+            self._faces = [Face.view(self.mesh, index) for index in range(self.mesh.face_count)]
+
+        return self._faces
     
     def rotate(self, about: Point, angle: int | float, plane: Plane):
-        for face in self.faces:
-            face.rotate(about, angle, plane)
-
-    def center(self) -> Point3D:
-        centers = []
-        for face in self.faces:
-            centers.append(face.center())
+        self.mesh.rotate(about, angle, plane)
 
-        # This is not a "real" Face, but it is quite convenient to consider
-        # the list of center-points for each Face, as a Face itself, 
-        # because we can use this temporary Face to calculate the center of the centers easily.
-        abstract = Face(centers) 
+    def transform(self, transform: Transform):
+        """
+        Accumulates transform onto the mesh, it is only applied to the vertices when they are next needed (usually when rendered).
+        """
+        self.mesh.transform(transform)
 
-        return abstract.center()
+    def center(self) -> Point3D:
+        # The center of the face centers, not of the unique vertices.
+        return Point3D(*self.mesh.face_centers().mean(axis=0).tolist())
 
 class Prism(Polygon3D):
     def __init__(self, origin: Point3D, xedge: float, yedge: float, zedge: float):
         left, top, front = origin.coords
 
-        front_face = Face([
-            Point3D(left, top, front),
-            Point3D(left, top+yedge, front),
-            Point3D(left+xedge, top+yedge, front),
-            Point3D(left+xedge, top, front)
-        ])
-
-        back_face = Face([
-            Point3D(left, top, front+zedge),
-            Point3D(left, top+yedge, front+zedge),
-            Point3D(left+xedge, top+yedge, front+zedge),
-            Point3D(left+xedge, top, front+zedge)
-        ], (192, 18, 255))
-
-        left_face = Face([
-            Point3D(left, top, front+zedge),
-            Point3D(left, top+yedge, front+zedge),
-            Point3D(left, top+yedge, front),
-            Point3D(left, top, front)
-        ], (255, 255, 0))
-
-        right_face = Face([
-            Point3D(left+xedge, top, front+zedge),
-            Point3D(left+xedge, top+yedge, front+zedge),
-            Point3D(left+xedge, top+yedge, front),
-            Point3D(left+xedge, top, front)
-        ], (0, 255, 80))
-
-        top_face = Face([
-            Point3D(left, top, front+zedge),
-            Point3D(left, top, front),
-            Point3D(left+xedge, top, front),
-            Point3D(left+xedge, top, front+zedge)
-        ], (255, 180, 12))
-
-        bottom_face = Face([
-            Point3D(left, top+yedge, front+yedge),
-            Point3D(left, top+yedge, front),
-            Point3D(left+yedge, top+yedge, front),
-            Point3D(left+yedge, top+yedge, front+yedge)
-        ], (255, 0, 0))
-
-        faces = [back_face, left_face, front_face, right_face, top_face, bottom_face]
-        super().__init__(faces)
+        # Corner i sits at (left, top, front) + (i & 1, (i >> 1) & 1, (i >> 2) & 1) * edges
+        corners = [
+            (left + xedge * (i & 1), top + yedge * ((i >> 1) & 1), front + zedge * ((i >> 2) & 1))
+            for i in range(8)
+        ]
+
+        # Every face is wound counter-clockwise seen from outside (normals point outwards), which back-face culling relies on.
+        front_face = [0, 2, 3, 1]
+        back_face = [5, 7, 6, 4]
+        left_face = [4, 6, 2, 0]
+        right_face = [1, 3, 7, 5]
+        top_face = [4, 0, 1, 5]
+        bottom_face = [7, 3, 2, 6]
+
+        faces = np.array([back_face, left_face, front_face, right_face, top_face, bottom_face])
+        colors = [(192, 18, 255), (255, 255, 0), (0, 0, 255), (0, 255, 80), (255, 180, 12), (255, 0, 0)]
+
+        self._bind(Mesh(corners, faces, colors))
 
 class Cube(Prism):
     def __init__(self, origin: Point3D, edge: float):
         super().__init__(origin, edge, edge, edge)
 
+class Sphere(Polygon3D):
+    def __init__(self, center: Point3D, radius: float, segments: int = 24, rings: int = 12, color: tuple[int] = (0, 0, 255)):
+        self._bind(uv_sphere(center.coords, radius, segments, rings, color), validate=False)
+
+class Torus(Polygon3D):
+    def __init__(self, center: Point3D, major_radius: float, minor_radius: float, segments: int = 32, sides: int = 16, color: tuple[int] = (0, 0, 255)):
+        self._bind(torus(center.coords, major_radius, minor_radius, segments, sides, color), validate=False)
+
 class CompositeShape:
     """
     This class acts in a similar way to Polygon3D. 
@@ -173,14 +249,42 @@ class CompositeShape:
     """
     def __init__(self, components: list[Polygon3D]):
         self.components = components
-        self.all_faces: list[Face] = []
+        self._all_faces = None
+        self.bvh = None
 
-        for component in components:
-            self.all_faces.extend(component.faces)
+    def build_bvh(self, leaf_size: int = 8) -> BVH:
+        """
+        Builds a bounding volume hierarchy over the components and their faces, which Render then uses to skip
+        whole groups of off-screen faces. It refits itself when components move, see BVH.update.
+        """
+        self.bvh = BVH(self.meshes, leaf_size)
+        return self.bvh
+
+    @property
+    def meshes(self) -> list[Mesh]:
+        meshes = []
+        for component in self.components:
+            # Nested composites contribute all of their meshes.
+            meshes.extend(component.meshes if isinstance(component, CompositeShape) else [component.mesh])
+
+        return meshes
+
+    @property
+    def all_faces(self) -> list[Face]:
+        if self._all_faces is None:
+            self._all_faces = []
+            for component in self.components:
+                self._all_faces.extend(component.all_faces if isinstance(component, CompositeShape) else component.faces)
+
+        return self._all_faces
     
     def rotate(self, about: Point, angle: int | float, plane: Plane):
+        # Same half-turn convention as Point.rotate, see Transform.rotation.
+        self.transform(Transform.rotation(about, angle + math.pi, plane))
+
+    def transform(self, transform: Transform):
         for poly in self.components:
-            poly.rotate(about, angle, plane)
+            poly.transform(transform)
     
     def center(self) -> Point3D:
         centers = []
@@ -190,4 +294,3 @@ class CompositeShape:
         abstract = Face(centers)
 
         return abstract.center()
-
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from collections import defaultdict, deque
+import pygame as pg
+import numpy as np
+import time
+
+class _Stage:
+    """
+    Context manager timing one pass through a pipeline stage. Kept minimal, it is entered several times per frame.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+class NullProfiler:
+    """
+    The profiler Render uses when instrumentation is off. Every hook is a no-op, so the instrumented code paths
+    cost one attribute lookup and call per stage per mesh, and nothing per face or vertex.
+    """
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name: str) -> _NullStage:
+        return self._stage
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def begin_frame(self):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def draw_overlay(self, surface: pg.Surface) -> pg.Rect | None:
+        return None
+
+NULL_PROFILER = NullProfiler()
+
+class Profiler:
+    """
+    Records how long each Render pipeline stage takes, and per-frame counters (faces, vertices...).
+
+    Cumulative totals live in Profiler.totals (seconds) and Profiler.calls. Per-frame values are kept for the last
+    window frames, see Profiler.summary. With overlay on, the summary is drawn onto the surface at the end of every frame.
+
+    Usage:
+        render = Render(camera, surface, profiler=Profiler())
+        ...
+        render.profiler.summary()
+    """
+    enabled = True
+
+    def __init__(self, window: int = 120, overlay: bool = False):
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.frames = deque(maxlen=window)
+        self.overlay = overlay
+
+        self._stages = dict()
+        self._frame = defaultdict(float)
+        self._frame_start = None
+        self._font = None
+
+    def stage(self, name: str) -> _Stage:
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(self, name)
+
+        return stage
+
+    def record(self, name: str, seconds: float):
+        self.totals[name] += seconds
+        self.calls[name] += 1
+        self._frame[name] += seconds
+
+    def count(self, name: str, amount: int = 1):
+        self._frame[name] += amount
+
+    def begin_frame(self):
+        self._frame = defaultdict(float)
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self._frame_start is None:
+            return
+
+        self.record("frame", time.perf_counter() - self._frame_start)
+        self.frames.append(dict(self._frame))
+        self._frame_start = None
+
+    def reset(self):
+        self.totals.clear()
+        self.calls.clear()
+        self.frames.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Statistics over the rolling window, for every stage timing (in milliseconds) and counter:
+        {name: {"mean": ..., "p50": ..., "p95": ..., "max": ...}}
+        """
+        names = set()
+        for frame in self.frames:
+            names.update(frame)
+
+        summary = dict()
+        for name in sorted(names):
+            values = np.array([frame.get(name, 0) for frame in self.frames])
+            if name in self.calls:
+                values = values * 1000
+
+            summary[name] = {
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max())
+            }
+
+        return summary
+
+    def draw_overlay(self, surface: pg.Surface) -> pg.Rect | None:
+        """
+        Draws the summary onto surface when overlay is on. Returns the area drawn over, if any.
+        """
+        if not self.overlay or not self.frames:
+            return None
+
+        if self._font is None:
+            pg.font.init()
+            self._font = pg.font.SysFont("monospace", 16)
+
+        area = pg.Rect(4, 4, 0, 0)
+        y = 4
+        for name, stats in self.summary().items():
+            unit = "ms" if name in self.calls else ""
+            text = self._font.render(f'{name:>10} {stats["mean"]:10.2f}{unit} (p95 {stats["p95"]:.2f})', True, (0, 0, 0), (255, 255, 255))
+            area.union_ip(surface.blit(text, (4, y)))
+            y += text.get_height()
+
+        return area
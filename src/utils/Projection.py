@@ -0,0 +1,241 @@
+from __future__ import annotations
+from utils.functions import attenuation_curve
+from constants import VIEWPORT_RESOLUTION
+from abc import ABC, abstractmethod
+import numpy as np
+
+def project(vertices: np.ndarray, vanishing_point: tuple[float] | None = None, attenuation = None) -> np.ndarray:
+    """
+    Batch version of Point3D.to_2D. Takes an (N, 3) array of vertices and returns the (N, 2) array of screen coordinates,
+    matching to_2D vertex for vertex, without building any Point objects.
+
+    By default the vanishing point is the center of the viewport, like to_2D.
+    attenuation is a curve name or anything mapping arrays of depths, see attenuation_curve. By default the default curve.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    attenuation = attenuation_curve(attenuation)
+
+    if vanishing_point is None:
+        vanishing_point = (VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2)
+
+    center_x, center_y = vanishing_point
+    x, y, z = vertices[:, 0], vertices[:, 1], vertices[:, 2]
+
+    dx = center_x - x
+    dy = center_y - y
+
+    # to_2D takes the sign from dx, falling back to the negated sign of dy for points straight above or below
+    # the vanishing point (and 0 on the vanishing point itself).
+    sign = np.where(dx != 0, np.sign(dx), -np.sign(dy))
+
+    # Point2D.direction nudges dx off zero, then returns (cos, sin) of atan(dy/dx),
+    # which is (1, slope) / sqrt(1 + slope^2) without the trigonometry.
+    slope = dy / np.where(dx == 0, 1e-7, dx)
+    scale = attenuation(z) * np.hypot(dx, dy) * sign / np.sqrt(1 + slope * slope)
+
+    screen = np.empty((len(vertices), 2))
+    screen[:, 0] = x + scale
+    screen[:, 1] = y + scale * slope
+
+    return screen
+
+class Projection(ABC):
+    """
+    Maps camera-space vertices (see Camera) to the screen. Subclasses implement project, unproject for picking, and
+    for back-face culling and the painter's algorithm, view_directions and distances.
+
+    Projections whose work is a 4x4 matrix expose it as matrix, so Camera can fold the view transform into it and
+    project every vertex with a single matrix product. matrix is None for the others.
+
+    Projections are treated as immutable: assign a new one to Camera.projection instead of editing one in use.
+
+    Points at depths at or below min_depth (behind a pinhole camera's eye, for example) cannot be projected, Culler
+    drops faces that reach them.
+    """
+    matrix = None
+    min_depth = -np.inf
+
+    def __init__(self, center: tuple[float] | None = None):
+        # Like to_2D, the viewport center defaults to the one of VIEWPORT_RESOLUTION whatever the surface size.
+        self.center = center or (VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2)
+
+    @abstractmethod
+    def project(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        (N, 3) camera-space vertices to (N, 2) screen coordinates.
+        """
+
+    @abstractmethod
+    def unproject(self, screen: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        """
+        The (N, 3) camera-space points at the given depths that project to the (N, 2) screen coordinates. Over all
+        depths they trace the ray (a curve, for some projections) a screen point sees.
+        """
+
+    @abstractmethod
+    def view_directions(self, points: np.ndarray) -> np.ndarray:
+        """
+        The (N, 3) directions the projection looks along at the given points, a face is seen from the front when its
+        normal points against it.
+        """
+
+    @abstractmethod
+    def distances(self, points: np.ndarray) -> np.ndarray:
+        """
+        How far the given points are from the viewer, only the order matters. Used to sort faces back to front.
+        """
+
+class VanishingPointProjection(Projection):
+    """
+    The original projection of Point3D.to_2D and project: every point is pulled towards the vanishing point by
+    attenuation(z). Swapping the attenuation curve gives the "wacky viewports" of utils.functions: attenuation is a
+    registered curve name (see ATTENUATION_CURVES), a curve or its lookup table (AttenuationCurve.table), or any
+    function of arrays of depths. By default it is the default curve at the time the projection is made.
+
+    Faces are sorted by their distance from an eye eye_depth in front of the vanishing point.
+    """
+
+    def __init__(self, center: tuple[float] | None = None, attenuation = None, eye_depth: float = -5000):
+        super().__init__(center)
+        self.attenuation = attenuation_curve(attenuation)
+        self.eye_depth = eye_depth
+        self.min_depth = getattr(self.attenuation, "min_depth", -np.inf)
+
+    def with_attenuation(self, attenuation) -> VanishingPointProjection:
+        """
+        A copy of this projection using another attenuation curve.
+        """
+        return VanishingPointProjection(self.center, attenuation, self.eye_depth)
+
+    def project(self, vertices: np.ndarray) -> np.ndarray:
+        return project(vertices, self.center, self.attenuation)
+
+    def unproject(self, screen: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        # project moves a point to center + (1 - a(z)) * (point - center), undone here.
+        screen = np.asarray(screen, dtype=np.float64).reshape(-1, 2)
+        depths = np.broadcast_to(np.asarray(depths, dtype=np.float64), len(screen))
+
+        points = np.empty((len(screen), 3))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            points[:, :2] = self.center + (screen - self.center) / (1 - self.attenuation(depths))[:, None]
+        points[:, 2] = depths
+
+        return points
+
+    def view_depth(self, z: np.ndarray) -> np.ndarray:
+        """
+        (1 - a(z)) / a'(z), with a' estimated by central differences so any attenuation curve works.
+        """
+        step = 1e-3
+        slope = (self.attenuation(z + step) - self.attenuation(z - step)) / (2 * step)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (1 - self.attenuation(z)) / slope
+
+    def view_directions(self, points: np.ndarray) -> np.ndarray:
+        # A point at depth z is pulled towards the vanishing point by a(z), so a tiny face there is seen along
+        # (x - vx, y - vy, (1 - a(z)) / a'(z)).
+        directions = np.empty_like(points)
+        directions[:, 0] = points[:, 0] - self.center[0]
+        directions[:, 1] = points[:, 1] - self.center[1]
+        directions[:, 2] = self.view_depth(points[:, 2])
+
+        return directions
+
+    def distances(self, points: np.ndarray) -> np.ndarray:
+        return np.linalg.norm(points - (*self.center, self.eye_depth), axis=1)
+
+class MatrixProjection(Projection):
+    """
+    A projection given by a 4x4 matrix acting on (x, y, z, 1): rows 0 and 1 give the screen coordinates and row 3
+    the homogeneous divisor. Row 2 is unused by projection and kept for depth.
+
+    The eye is read off the matrix: it is the point where rows 0, 1 and 3 all vanish, the one every line of sight
+    passes through. Faces are seen along the direction from the eye and sorted by their distance from it. When the
+    eye is at infinity (row 3 is (0, 0, 0, w), a parallel projection) every line of sight has the same direction,
+    taken to look towards +z like the camera, and faces are sorted by how far along it they are.
+    """
+
+    def __init__(self, matrix: np.ndarray, center: tuple[float] | None = None):
+        super().__init__(center)
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+
+        # The null space of rows 0, 1 and 3, in homogeneous coordinates.
+        eye = np.linalg.svd(self.matrix[[0, 1, 3]])[2][-1]
+        if abs(eye[3]) > 1e-12:
+            self.eye, self.direction = eye[:3] / eye[3], None
+        else:
+            self.eye, self.direction = None, eye[:3] * (-1 if eye[2] < 0 else 1) / np.linalg.norm(eye[:3])
+
+    def project(self, vertices: np.ndarray) -> np.ndarray:
+        return project_homogeneous(vertices, self.matrix)
+
+    def unproject(self, screen: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        # With z known, x' = (r0 . p) / (r3 . p) and y' = (r1 . p) / (r3 . p) are two linear equations in x and y.
+        screen = np.asarray(screen, dtype=np.float64).reshape(-1, 2)
+        depths = np.broadcast_to(np.asarray(depths, dtype=np.float64), len(screen))
+
+        rows = self.matrix[:2][None] - screen[:, :, None] * self.matrix[3][None, None]
+        constant = rows[:, :, 2] * depths[:, None] + rows[:, :, 3]
+
+        points = np.empty((len(screen), 3))
+        points[:, :2] = np.linalg.solve(rows[:, :, :2], -constant[:, :, None])[:, :, 0]
+        points[:, 2] = depths
+
+        return points
+
+    def view_directions(self, points: np.ndarray) -> np.ndarray:
+        if self.eye is None:
+            return np.broadcast_to(self.direction, points.shape)
+
+        return points - self.eye
+
+    def distances(self, points: np.ndarray) -> np.ndarray:
+        if self.eye is None:
+            return points @ self.direction
+
+        return np.linalg.norm(points - self.eye, axis=1)
+
+class PerspectiveProjection(MatrixProjection):
+    """
+    A pinhole camera: the eye sits focal_length in front of the viewport center (at depth -focal_length) and looks
+    along +z, points at depth 0 keep their screen position. Points at or behind the eye are past min_depth.
+    """
+
+    def __init__(self, focal_length: float = 1000, center: tuple[float] | None = None):
+        center_x, center_y = center or (VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2)
+        self.focal_length = focal_length
+        self.min_depth = -focal_length
+
+        # x' = (f (x - cx) + cx (z + f)) / (z + f), same for y.
+        super().__init__([
+            [focal_length, 0, center_x, 0],
+            [0, focal_length, center_y, 0],
+            [0, 0, 1, 0],
+            [0, 0, 1, focal_length]
+        ], center)
+
+class OrthographicProjection(MatrixProjection):
+    """
+    Parallel projection along z, scaled by scale around the viewport center.
+    """
+
+    def __init__(self, scale: float = 1, center: tuple[float] | None = None):
+        center_x, center_y = center or (VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2)
+        self.scale = scale
+
+        super().__init__([
+            [scale, 0, 0, center_x * (1 - scale)],
+            [0, scale, 0, center_y * (1 - scale)],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1]
+        ], center)
+
+def project_homogeneous(vertices: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Applies a 4x4 projection matrix (see MatrixProjection) to (N, 3) vertices and returns (N, 2) screen coordinates.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    rows = matrix[[0, 1, 3]]
+    projected = vertices @ rows[:, :3].T + rows[:, 3]
+
+    return projected[:, :2] / projected[:, 2:]
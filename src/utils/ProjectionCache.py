@@ -0,0 +1,127 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+from utils.Point import Point3D
+from utils.Projection import project
+from collections import OrderedDict
+import numpy as np
+import weakref
+
+# At most this many standalone points are kept, for callers that never call begin_frame.
+POINT_CACHE_SIZE = 1 << 16
+
+class _MeshEntry:
+    __slots__ = ("version", "screen")
+
+    def __init__(self, version: int, screen: np.ndarray):
+        self.version = version
+        self.screen = screen
+
+class ProjectionCache:
+    """
+    Screen coordinates of vertices, kept from frame to frame and only recomputed for vertices that moved.
+
+    Meshes are keyed by identity and checked with Mesh.version: an unchanged mesh costs nothing, a partially changed
+    one (Mesh.rotate on a subset, writes through Point views) reprojects only Mesh.changed_rows, and anything else
+    reprojects the whole mesh in one pass. Entries go away with their meshes.
+
+    Standalone Point3Ds are keyed by identity too, and are dirty once their coords differ from the ones they were
+    projected from. Every mutator (setx, sety, setz, setcoord, rotate) swaps in a new coords tuple, see
+    Point.setcoord, so that check is one tuple comparison. Entries hold on to their points, so an id is never
+    reused while its entry exists. Points not looked up during a frame are dropped at the next begin_frame, and
+    beyond POINT_CACHE_SIZE entries the least recently used are dropped straight away.
+
+    Everything is thrown away when the view key (viewport size, camera...) given to begin_frame changes.
+    Vertices go through the projection function given to begin_frame, by default project.
+    projected and reused count the vertices of the current frame that were projected and that came from the cache.
+    """
+
+    def __init__(self):
+        self._meshes = weakref.WeakKeyDictionary()
+        self._points = OrderedDict()
+        self._view = None
+        self._frame = 0
+        self._project = project
+        self.projected = 0
+        self.reused = 0
+
+    def begin_frame(self, view, projection = project):
+        self._project = projection
+        if view != self._view:
+            self.clear()
+            self._view = view
+
+        # Points from two frames ago were not drawn last frame.
+        self._frame += 1
+        stale = [key for key, entry in self._points.items() if entry[3] < self._frame - 1]
+        for key in stale:
+            del self._points[key]
+
+        self.projected = 0
+        self.reused = 0
+
+    def clear(self):
+        self._meshes.clear()
+        self._points.clear()
+
+    def project_mesh(self, mesh: Mesh) -> np.ndarray:
+        """
+        The (N, 2) screen coordinates of mesh's vertices, same as projecting mesh.vertices directly.
+        The returned array is the cache's own and must not be written to.
+        """
+        vertices = mesh.vertices
+        entry = self._meshes.get(mesh)
+
+        if entry is None or len(entry.screen) != len(vertices):
+            entry = self._meshes[mesh] = _MeshEntry(mesh.version, self._project(vertices))
+            self.projected += len(vertices)
+            return entry.screen
+
+        changed = 0
+        if entry.version != mesh.version:
+            rows = mesh.changed_rows(entry.version)
+            if rows is None:
+                entry.screen = self._project(vertices)
+                changed = len(vertices)
+            else:
+                entry.screen[rows] = self._project(vertices[rows])
+                changed = len(rows)
+
+            entry.version = mesh.version
+
+        self.projected += changed
+        self.reused += len(vertices) - changed
+        return entry.screen
+
+    def project_points(self, points: list[Point3D]) -> list[tuple[float]]:
+        """
+        Screen coordinates of the given points as (x, y) tuples, same as projecting their coords directly.
+        Points shared between faces are projected once, and only when they moved.
+        """
+        screens = [None] * len(points)
+        missing = []
+
+        for index, point in enumerate(points):
+            entry = self._points.get(id(point))
+            if entry is not None and entry[1] == point.coords:
+                entry[3] = self._frame
+                self._points.move_to_end(id(point))
+                screens[index] = entry[2]
+            else:
+                missing.append(index)
+
+        self.reused += len(points) - len(missing)
+        if missing:
+            coords = [points[index].coords for index in missing]
+            projected = self._project(np.array(coords, dtype=np.float64)).tolist()
+            self.projected += len(missing)
+
+            for index, point_coords, screen in zip(missing, coords, projected):
+                point = points[index]
+                # The point itself is kept so its id cannot be reused by another object while the entry exists.
+                self._points[id(point)] = [point, point_coords, tuple(screen), self._frame]
+                screens[index] = tuple(screen)
+
+            while len(self._points) > POINT_CACHE_SIZE:
+                self._points.popitem(last=False)
+
+        return screens
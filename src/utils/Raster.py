@@ -0,0 +1,184 @@
+from __future__ import annotations
+from constants import VIEWPORT_RESOLUTION
+import pygame as pg
+import numpy as np
+
+class Rasterizer:
+    """
+    A software z-buffer. Triangles are scan-converted into NumPy colour and depth buffers, and the finished frame is
+    copied onto a pygame Surface in one go with Rasterizer.blit.
+
+    Buffers are indexed [x, y] like pygame.surfarray, but laid out row by row in memory like an RGB image (see
+    frame_buffers), so the colour buffer is blitted as an ordinary 24-bit image and clearing copies whole rows.
+    Smaller depth values are closer to the viewer, so depth here is simply the z coordinate of the geometry (the
+    same axis depth_attenuation shrinks along), kept in single precision.
+
+    Scan conversion is vectorized across triangles: every candidate pixel of every triangle's bounding box is
+    evaluated at once, in chunks of at most chunk_pixels candidates to bound memory use.
+    """
+
+    def __init__(self, resolution: tuple[int] = VIEWPORT_RESOLUTION, background: tuple[int] = (255, 255, 255), chunk_pixels: int = 1 << 20,
+                 color: np.ndarray | None = None, depth: np.ndarray | None = None):
+        """
+        color and depth optionally supply the buffers to draw into (shared memory for example), laid out like the
+        ones frame_buffers returns. They are not cleared.
+        """
+        self.width, self.height = resolution
+        self.background = background
+        self.chunk_pixels = chunk_pixels
+
+        if color is None or depth is None:
+            self.color, self.depth = frame_buffers(resolution)
+            self.depth.fill(np.inf)
+        else:
+            self.color = color
+            self.depth = depth
+
+        # The same buffers row by row, as they are in memory.
+        self.color_rows = self.color.transpose(1, 0, 2)
+        self.depth_rows = self.depth.T
+        if not (self.color_rows.flags.c_contiguous and self.depth_rows.flags.c_contiguous):
+            raise ValueError("Rasterizer buffers must be laid out row by row, see frame_buffers.")
+
+        # One row of background, copied over every row of a cleared region.
+        self._background_row = np.empty((self.width, 3), dtype=np.uint8)
+        self._background_row[:] = background
+        self._image = pg.image.frombuffer(self.color_rows, resolution, "RGB")
+
+        if color is None or depth is None:
+            self.clear()
+
+    def clear(self, rects: list[pg.Rect] | None = None):
+        """
+        Resets the buffers, only inside the given rectangles when there are any.
+        """
+        if rects is None:
+            np.copyto(self.color_rows, self._background_row)
+            self.depth_rows.fill(np.inf)
+            return
+
+        for rect in rects:
+            self.color_rows[rect.top:rect.bottom, rect.left:rect.right] = self._background_row[rect.left:rect.right]
+            self.depth_rows[rect.top:rect.bottom, rect.left:rect.right] = np.inf
+
+    def blit(self, surface: pg.Surface, rects: list[pg.Rect] | None = None):
+        """
+        Copies the colour buffer onto surface, only inside the given rectangles when there are any.
+        """
+        # The image shares the colour buffer's memory, pygame converts its pixels straight onto surface.
+        if rects is None:
+            surface.blit(self._image, (0, 0))
+            return
+
+        for rect in rects:
+            surface.blit(self._image, rect, rect)
+
+    def release(self):
+        """
+        Drops the image sharing the colour buffer, so memory the buffers were given (shared memory) can be closed.
+        """
+        self._image = None
+
+    def draw_triangles(self, screen: np.ndarray, depth: np.ndarray, triangles: np.ndarray, colors: np.ndarray, bounds: tuple[int] | None = None):
+        """
+        screen is an (N, 2) array of projected vertices and depth the matching (N,) array of depths.
+        triangles is a (T, 3) array of vertex indices, colors a (T, 3) array of RGB values.
+        bounds optionally restricts drawing to the pixels (left, top, right, bottom) with right and bottom excluded.
+        """
+        left, top, right, bottom = bounds if bounds is not None else (0, 0, self.width, self.height)
+
+        if len(triangles) == 0:
+            return
+
+        corners = screen[triangles]
+        x0, y0 = corners[:, 0, 0], corners[:, 0, 1]
+        x1, y1 = corners[:, 1, 0], corners[:, 1, 1]
+        x2, y2 = corners[:, 2, 0], corners[:, 2, 1]
+
+        # Pixels are sampled at their centers, so pixel p covers [p, p+1).
+        xmin = np.maximum(np.ceil(corners[:, :, 0].min(axis=1) - 0.5), left)
+        xmax = np.minimum(np.floor(corners[:, :, 0].max(axis=1) - 0.5), right - 1)
+        ymin = np.maximum(np.ceil(corners[:, :, 1].min(axis=1) - 0.5), top)
+        ymax = np.minimum(np.floor(corners[:, :, 1].max(axis=1) - 0.5), bottom - 1)
+
+        area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+        keep = (xmax >= xmin) & (ymax >= ymin) & (area != 0) & np.isfinite(area)
+        if not np.any(keep):
+            return
+
+        # Barycentric coordinates (and so depth) are affine in screen space: value = a*x + b*y + c per triangle.
+        area = area[keep]
+        x0, y0, x1, y1, x2, y2 = (v[keep] for v in (x0, y0, x1, y1, x2, y2))
+        z = depth[triangles[keep]]
+
+        l1 = np.stack([(y2 - y0), -(x2 - x0), (x2 - x0) * y0 - (y2 - y0) * x0], axis=1) / area[:, None]
+        l2 = np.stack([-(y1 - y0), (x1 - x0), (y1 - y0) * x0 - (x1 - x0) * y0], axis=1) / area[:, None]
+        zplane = z[:, 0:1] * (np.array([0, 0, 1]) - l1 - l2) + z[:, 1:2] * l1 + z[:, 2:3] * l2
+
+        xmin, ymin = xmin[keep].astype(np.int64), ymin[keep].astype(np.int64)
+        widths = xmax[keep].astype(np.int64) - xmin + 1
+        heights = ymax[keep].astype(np.int64) - ymin + 1
+        colors = np.asarray(colors, dtype=np.uint8)[keep]
+
+        candidates = widths * heights
+        cumulative = np.cumsum(candidates)
+        start = 0
+        while start < len(candidates):
+            # Take as many triangles as fit in the chunk budget, and always at least one.
+            budget = (cumulative[start - 1] if start else 0) + self.chunk_pixels
+            stop = max(int(np.searchsorted(cumulative, budget, side="right")), start + 1)
+
+            chunk = slice(start, stop)
+            self._fill(xmin[chunk], ymin[chunk], widths[chunk], candidates[chunk], l1[chunk], l2[chunk], zplane[chunk], colors[chunk])
+            start = stop
+
+    def _fill(self, xmin, ymin, widths, candidates, l1, l2, zplane, colors):
+        owner = np.repeat(np.arange(len(candidates)), candidates)
+        local = np.arange(len(owner)) - np.repeat(np.cumsum(candidates) - candidates, candidates)
+
+        px = xmin[owner] + local % widths[owner]
+        py = ymin[owner] + local // widths[owner]
+        sx, sy = px + 0.5, py + 0.5
+
+        b1 = l1[owner, 0] * sx + l1[owner, 1] * sy + l1[owner, 2]
+        b2 = l2[owner, 0] * sx + l2[owner, 1] * sy + l2[owner, 2]
+        inside = (b1 >= 0) & (b2 >= 0) & (b1 + b2 <= 1)
+
+        owner, px, py, sx, sy = owner[inside], px[inside], py[inside], sx[inside], sy[inside]
+        z = zplane[owner, 0] * sx + zplane[owner, 1] * sy + zplane[owner, 2]
+
+        # Resolve overlaps inside the chunk first (nearest candidate per pixel), then test against the depth buffer.
+        pixel = py * self.width + px
+        order = np.lexsort((z, pixel))
+        pixel, z, owner = pixel[order], z[order], owner[order]
+        first = np.ones(len(pixel), dtype=bool)
+        first[1:] = pixel[1:] != pixel[:-1]
+        pixel, z, owner = pixel[first], z[first], owner[first]
+
+        # Compared at the buffer's precision, so a face exactly as deep as what is already drawn never wins.
+        z = z.astype(np.float32)
+        depth = self.depth_rows.reshape(-1)
+        closer = z < depth[pixel]
+        pixel = pixel[closer]
+
+        depth[pixel] = z[closer]
+        self.color_rows.reshape(-1, 3)[pixel] = colors[owner[closer]]
+
+def frame_buffers(resolution: tuple[int], color_memory = None, depth_memory = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The (width, height, 3) uint8 colour and (width, height) float32 depth buffers of a Rasterizer, indexed [x, y]
+    and stored row by row. They are allocated, or laid over color_memory and depth_memory (anything exposing the
+    buffer protocol, of at least frame_bytes bytes each) when given.
+    """
+    width, height = resolution
+    color = np.ndarray((height, width, 3), dtype=np.uint8, buffer=color_memory).transpose(1, 0, 2)
+    depth = np.ndarray((height, width), dtype=np.float32, buffer=depth_memory).T
+
+    return color, depth
+
+def frame_bytes(resolution: tuple[int]) -> tuple[int, int]:
+    """
+    The sizes in bytes of the colour and depth buffers of frame_buffers.
+    """
+    width, height = resolution
+    return width * height * 3, width * height * np.dtype(np.float32).itemsize
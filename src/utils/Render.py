@@ -1,17 +1,250 @@
-from utils.Camera import Camera 
+from utils.Camera import Camera
 from utils.Polygon import Polygon, Polygon2D, Polygon3D, Face, CompositeShape
+from utils.Mesh import Mesh
+from utils.Instancing import InstancedShape
+from utils.LOD import LODShape
+from utils.SceneGraph import SceneNode
+from utils.Terrain import ChunkedTerrain
+from utils.ProjectionCache import ProjectionCache
+from utils.DirtyRects import DirtyRects
+from utils.Capture import FrameCapture
+from utils.Shading import Shader
+from utils.Raster import Rasterizer
+from utils.TiledRaster import TiledRasterizer
+from utils.Culling import Culler, CullStats, clip_polygon
+from utils.Profiler import Profiler, NULL_PROFILER
 from constants import VIEWPORT_RESOLUTION
 from utils.Point import Point3D
-import pygame as pg 
+from collections import OrderedDict
+import weakref
+import pygame as pg
 from pygame import gfxdraw
+import numpy as np
 import math
 
+# How many merged batches draw_meshes keeps, one per distinct list of meshes drawn.
+BATCH_CACHE_SIZE = 8
+
 class Render:
+    # The eye faces are sorted from by dist_from_vp, and by draw_order with the default camera projection.
     vanishing_point = Point3D(VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2, -5000)
 
-    def __init__(self, camera: Camera, surface: pg.Surface):
-        self.camera = camera
-        self.surface = surface 
+    def __init__(self, camera: Camera, surface: pg.Surface, backend: str = "painter", background: tuple[int] = (255, 255, 255), culling: bool = True, profiler: Profiler | None = None,
+                 workers: int | None = None, dirty_rects: bool = False, capture: FrameCapture | None = None, shading: Shader | None = None,
+                 attenuation = None):
+        """
+        backend selects how faces are drawn:
+        "painter" sorts faces back to front and draws each one with gfxdraw directly onto surface.
+        "zbuffer" rasterizes into a Rasterizer's depth-tested buffers, which are copied onto surface by end_frame.
+        "tiled" is zbuffer split into screen tiles rasterized by a pool of worker processes (one per core unless
+        workers says otherwise) into shared memory, see TiledRasterizer. Call close when done with it.
+
+        With culling on, back faces and faces outside the viewport are dropped before drawing and partially visible
+        faces are clipped to the viewport, see cull_stats for the counts of the current frame.
+
+        Passing a Profiler turns on per-stage timing and per-frame counters, see Profiler.summary.
+        Without one, Render uses a no-op profiler.
+
+        With dirty_rects on, Render owns clearing and presenting the surface: begin_frame clears only the regions
+        drawn on the previous frame and present updates the display with the regions drawn on this frame and the
+        previous one, falling back to full clears and updates when those cover most of the screen, see DirtyRects.
+        Everything drawn on surface then has to go through Render.
+
+        Passing a Shader lights mesh faces (flat, ambient or Lambert), computed per batch from cached face normals.
+        Single Faces and Polygon2Ds keep their own colours.
+
+        Passing a FrameCapture records every finished frame (after end_frame) in the background, see FrameCapture.
+        close finishes writing the queued frames.
+
+        Screen coordinates are cached across frames, see ProjectionCache: static geometry is projected once, and
+        after that only vertices that moved are. The cache is reset when the viewport size or the camera changes.
+
+        Everything is drawn as seen from camera, see Camera. Without one (None) the camera is at rest.
+        attenuation, when given, selects the depth attenuation curve of the camera's projection, see Camera.attenuation.
+
+        antialias and resolution_scale trade quality for speed, see QualityController: without antialiasing the painter
+        draws faces with a single filled polygon each, and a resolution_scale below 1 draws the frame that much smaller
+        and scales it up onto surface in end_frame (every frame is then presented whole).
+        """
+        if backend not in ("painter", "zbuffer", "tiled"):
+            raise ValueError(f"Unknown render backend {backend}, expected painter, zbuffer or tiled.")
+
+        self.camera = camera if camera is not None else Camera(0, 0, 0, 0, 0)
+        if attenuation is not None:
+            self.camera.attenuation = attenuation
+        self.surface = surface
+        self.backend = backend
+        self.rasterizer = None
+        if backend == "zbuffer":
+            self.rasterizer = Rasterizer(surface.get_size(), background)
+        elif backend == "tiled":
+            self.rasterizer = TiledRasterizer(surface.get_size(), background, workers=workers)
+        self.culler = Culler(surface.get_size(), projection=self.camera.projection) if culling else None
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.projections = ProjectionCache()
+        self.background = background
+        self.dirty = DirtyRects(surface.get_size()) if dirty_rects else None
+        self.capture = capture
+        self.shading = shading
+
+        self.antialias = True
+        self._scale = 1.0
+        self.target = surface
+
+        self._batches = OrderedDict()
+        self._terrains = weakref.WeakSet()
+
+    @property
+    def resolution_scale(self) -> float:
+        return self._scale
+
+    @resolution_scale.setter
+    def resolution_scale(self, scale: float):
+        if scale == self._scale:
+            return
+
+        self._scale = scale
+        width, height = self.surface.get_size()
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        self.target = self.surface if scale == 1 else pg.Surface(size, 0, self.surface)
+
+        if self.backend == "zbuffer":
+            self.rasterizer = Rasterizer(size, self.background)
+        elif self.backend == "tiled":
+            workers = self.rasterizer.workers
+            self.rasterizer.close()
+            self.rasterizer = TiledRasterizer(size, self.background, workers=workers)
+        if self.culler is not None:
+            self.culler.width, self.culler.height = size
+        if self.dirty is not None:
+            self.dirty.invalidate()
+
+    @property
+    def cull_stats(self) -> CullStats | None:
+        return self.culler.stats if self.culler is not None else None
+
+    @property
+    def needs_normals(self) -> bool:
+        return (self.culler is not None and self.culler.backface) or (self.shading is not None and self.shading.mode != "flat")
+
+    def view_key(self) -> tuple:
+        """
+        Everything projection depends on besides the vertices. Cached screen coordinates are dropped when it changes.
+        """
+        return self.surface.get_size(), id(self.camera), self.camera.version
+
+    def begin_frame(self):
+        self.profiler.begin_frame()
+        self.projections.begin_frame(self.view_key(), self.camera.project)
+        if self.culler is not None:
+            self.culler.projection = self.camera.projection
+            self.culler.stats.reset()
+
+        if self.target is not self.surface:
+            # Scaled frames cover the whole surface, and so does the first full size frame after them.
+            if self.dirty is not None:
+                self.dirty.begin_frame()
+                self.dirty.invalidate()
+            if self.rasterizer is not None:
+                self.rasterizer.clear()
+            else:
+                self.target.fill(self.background)
+            return
+
+        if self.dirty is None:
+            if self.rasterizer is not None:
+                self.rasterizer.clear()
+            return
+
+        # None when everything needs clearing.
+        regions = self.dirty.begin_frame()
+        if self.rasterizer is not None:
+            self.rasterizer.clear(regions)
+        elif regions is None:
+            self.surface.fill(self.background)
+        else:
+            for rect in regions:
+                self.surface.fill(self.background, rect)
+
+    def end_frame(self):
+        if self.rasterizer is not None:
+            with self.profiler.stage("present"):
+                regions = None
+                if self.dirty is not None and not self.dirty.full:
+                    # Last frame's regions too, they were cleared and have to show the background now.
+                    regions = self.dirty.previous + self.dirty.current
+                self.rasterizer.blit(self.target, regions)
+        if self.target is not self.surface:
+            with self.profiler.stage("upscale"):
+                pg.transform.scale(self.target, self.surface.get_size(), self.surface)
+
+        self.profiler.count("projected", self.projections.projected)
+        self.profiler.count("reused", self.projections.reused)
+        self.profiler.end_frame()
+
+        overlay = self.profiler.draw_overlay(self.surface)
+        if self.dirty is not None:
+            self.dirty.add_rect(overlay)
+
+        if self.capture is not None:
+            with self.profiler.stage("capture"):
+                self.capture.capture(self.surface)
+
+    def present(self) -> list[pg.Rect] | None:
+        """
+        Updates the display after end_frame. Returns the rectangles that were updated, None for the whole display.
+        Without dirty_rects this is a plain full pg.display.update.
+        """
+        regions = self.dirty.rects() if self.dirty is not None else None
+
+        with self.profiler.stage("display"):
+            if regions is None:
+                pg.display.update()
+            elif regions:
+                pg.display.update(regions)
+
+        return regions
+
+    def mark_drawn(self, screen: np.ndarray, mesh: Mesh | None = None, faces: np.ndarray | None = None, vertex_starts: np.ndarray | None = None):
+        """
+        Records the screen bounds of what was just drawn for dirty_rects. With a mesh, only the corners of the
+        given faces count, and vertex_starts splits the vertices into groups (the meshes of a batch) that get a
+        rectangle each, so distant objects do not dirty everything between them.
+        """
+        if self.dirty is None:
+            return
+
+        screen = np.asarray(screen, dtype=np.float64).reshape(-1, 2)
+        if mesh is None:
+            if len(screen):
+                self.dirty.add(*screen.min(axis=0), *screen.max(axis=0))
+            return
+
+        if len(faces) == 0:
+            return
+
+        used = np.zeros(len(screen), dtype=bool)
+        used[mesh.indices[mesh.corners(faces)]] = True
+
+        if vertex_starts is None:
+            vertex_starts = np.zeros(1, dtype=np.int64)
+        lows = np.minimum.reduceat(np.where(used[:, None], screen, np.inf), vertex_starts)
+        highs = np.maximum.reduceat(np.where(used[:, None], screen, -np.inf), vertex_starts)
+
+        self.dirty.add_bounds(lows, highs)
+
+    def close(self):
+        """
+        Releases the tiled backend's worker processes and shared memory, stops the build workers of every
+        ChunkedTerrain drawn, and finishes the capture if there is one.
+        """
+        if isinstance(self.rasterizer, TiledRasterizer):
+            self.rasterizer.close()
+        for terrain in list(self._terrains):
+            terrain.close()
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
 
     def dist_from_vp(self, polys: list[Face]) -> list[Face]:
         """
@@ -21,20 +254,297 @@ class Render:
 
         return sorted(polys, key = lambda poly: poly.center().dist(Render.vanishing_point), reverse=True)
 
+    def draw_order(self, centers: np.ndarray) -> np.ndarray:
+        """
+        Array version of dist_from_vp, taking an (F, 3) array of face centers in camera space.
+        Returns face numbers from furthest to nearest, ties keep their original order just like sorted() does.
+        With the default projection the distance is measured from Render.vanishing_point like dist_from_vp.
+        """
+        distances = self.camera.projection.distances(centers)
+
+        return np.argsort(-distances, kind="stable")
+
+    def visible_faces(self, mesh: Mesh, screen: np.ndarray, faces: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Faces of mesh (or of the given subset) left after culling, and which of them need clipping to the viewport.
+        """
+        if self.culler is not None:
+            return self.culler.cull(mesh, screen, faces)
+
+        if faces is None:
+            faces = np.arange(mesh.face_count)
+        return faces, np.zeros(len(faces), dtype=bool)
+
+    def select_levels(self, shapes: list[LODShape]):
+        """
+        Selects the level of detail of every shape from its projected screen size: the larger side of the screen
+        bounding box of its 8 projected bounding box corners. All the corners are projected in one pass.
+        """
+        if not shapes:
+            return
+
+        with self.profiler.stage("lod"):
+            bounds = np.array([shape.bounds() for shape in shapes])
+            corner_bits = (np.arange(8)[:, None] >> np.arange(3)) & 1
+
+            # (shapes, 8, 3) corners picked from (shapes, 2, 3) bounds.
+            corners = np.where(corner_bits, bounds[:, 1:2], bounds[:, 0:1])
+            screen = self.camera.project(corners.reshape(-1, 3)).reshape(len(shapes), 8, 2)
+            sizes = (screen.max(axis=1) - screen.min(axis=1)).max(axis=1)
+
+            for shape, size in zip(shapes, sizes.tolist()):
+                shape.select(size)
+
+            # The counter names are built per shape, only worth it when someone is counting.
+            if self.profiler.enabled:
+                for shape in shapes:
+                    self.profiler.count(f"lod {shape.level}")
+
+    def draw_meshes(self, meshes: list[Mesh], candidates: list[np.ndarray] | None = None):
+        """
+        Draws every face of the given meshes. The meshes are merged into one batch, so the whole draw costs one
+        projection, one culling pass and one sort (or raster call) no matter how many meshes there are.
+        Batches are kept between frames, see _batch.
+        candidates optionally restricts each mesh to a subset of its faces, meshes with no candidates are skipped entirely.
+        """
+        if candidates is None:
+            candidates = [None] * len(meshes)
+
+        pairs = [(mesh, faces) for mesh, faces in zip(meshes, candidates) if mesh.face_count and (faces is None or len(faces))]
+        if not pairs:
+            return
+
+        if len(pairs) == 1:
+            self.draw_batch(*pairs[0])
+            return
+
+        # Projected per source mesh, the merged batch is new every frame and would never hit the cache.
+        with self.profiler.stage("project"):
+            screen = np.concatenate([self.projections.project_mesh(mesh) for mesh, _ in pairs])
+
+        # Same for normals, cached on the sources they carry over into the batch.
+        if self.needs_normals:
+            with self.profiler.stage("normals"):
+                for mesh, _ in pairs:
+                    mesh.normals()
+
+        with self.profiler.stage("batch"):
+            batch = self._batch([mesh for mesh, _ in pairs])
+
+            faces = None
+            if any(faces is not None for _, faces in pairs):
+                starts = np.cumsum([0] + [mesh.face_count for mesh, _ in pairs])
+                faces = np.concatenate([
+                    (np.arange(mesh.face_count) if faces is None else faces) + start
+                    for (mesh, faces), start in zip(pairs, starts)
+                ])
+
+        vertex_starts = np.cumsum([0] + [mesh.vertex_count for mesh, _ in pairs[:-1]])
+        self.draw_batch(batch, faces, screen, vertex_starts)
+
+    def _batch(self, meshes: list[Mesh]) -> Mesh:
+        """
+        The merged batch of meshes, built once per list of meshes and kept up to date in place: only the vertices
+        (and cached normals) of meshes whose version changed are copied over, the topology and the batch's cached
+        triangles are reused. Colours are copied every time, they can be edited without a version change.
+        """
+        key = tuple(id(mesh) for mesh in meshes)
+        entry = self._batches.get(key)
+        if entry is None:
+            batch = Mesh.concatenate(meshes)
+            entry = self._batches[key] = ([], [mesh.version for mesh in meshes], batch)
+
+            # Meshes are only referenced weakly and a batch goes as soon as one of its meshes does (an evicted
+            # terrain chunk for example), so the cache never keeps geometry alive and ids are not reused as keys.
+            def forget(_, key=key, entry=entry):
+                if self._batches.get(key) is entry:
+                    del self._batches[key]
+
+            entry[0].extend(weakref.ref(mesh, forget) for mesh in meshes)
+            if len(self._batches) > BATCH_CACHE_SIZE:
+                self._batches.popitem(last=False)
+            return batch
+
+        self._batches.move_to_end(key)
+        _, versions, batch = entry
+        np.concatenate([mesh.colors for mesh in meshes], out=batch.colors)
+
+        stale = [index for index, mesh in enumerate(meshes) if mesh.version != versions[index]]
+        if not stale:
+            return batch
+
+        vertex_starts = np.cumsum([0] + [mesh.vertex_count for mesh in meshes])
+        face_starts = np.cumsum([0] + [mesh.face_count for mesh in meshes])
+        had_normals = batch._has_normals()
+
+        vertices = batch.vertices
+        for index in stale:
+            vertices[vertex_starts[index]:vertex_starts[index + 1]] = meshes[index].vertices
+            versions[index] = meshes[index].version
+        batch.touch(np.concatenate([np.arange(vertex_starts[index], vertex_starts[index + 1]) for index in stale]))
+
+        # The other meshes' normals still hold, only the changed meshes' rows need theirs.
+        if had_normals and all(meshes[index]._has_normals() for index in stale):
+            for index in stale:
+                batch._normals[face_starts[index]:face_starts[index + 1]] = meshes[index]._normals
+            batch._set_normals(batch._normals)
+
+        return batch
+
+    def draw_batch(self, mesh: Mesh, faces: np.ndarray | None = None, screen: np.ndarray | None = None, vertex_starts: np.ndarray | None = None):
+        """
+        Draws the faces of a single mesh (all of them by default): one projection pass, then culling,
+        then either the painter's algorithm or the rasterizer.
+        screen optionally gives the already projected vertices, vertex_starts the meshes a batch was merged from.
+        """
+        profiler = self.profiler
+        profiler.count("faces", mesh.face_count if faces is None else len(faces))
+        profiler.count("vertices", mesh.vertex_count)
+
+        if self.needs_normals:
+            with profiler.stage("normals"):
+                mesh.normals()
+        with profiler.stage("transform"):
+            # Culling, depth, sorting and lighting work in camera space, the source mesh keeps the cached topology.
+            view = self.camera.view_mesh(mesh)
+            vertices = view.vertices
+        if screen is None:
+            with profiler.stage("project"):
+                screen = self.projections.project_mesh(mesh)
+        if self._scale != 1:
+            screen = screen * self._scale
+        with profiler.stage("cull"):
+            faces, partial = self.visible_faces(view, screen, faces)
+
+        if self.dirty is not None:
+            with profiler.stage("dirty"):
+                self.mark_drawn(screen, mesh, faces, vertex_starts)
+
+        if self.rasterizer is not None:
+            with profiler.stage("raster"):
+                triangles, triangle_faces = mesh.triangles()
+                visible = np.zeros(mesh.face_count, dtype=bool)
+                visible[faces] = True
+                visible = visible[triangle_faces]
+
+                face_colors = mesh.colors
+                if self.shading is not None:
+                    with profiler.stage("shade"):
+                        face_colors = np.empty_like(mesh.colors)
+                        face_colors[faces] = self.shading.shade(view, faces)
+
+                self.rasterizer.draw_triangles(screen, vertices[:, 2], triangles[visible], face_colors[triangle_faces[visible]])
+
+            profiler.count("drawn", len(faces))
+            return
+
+        with profiler.stage("polygons"):
+            width, height = self.target.get_size()
+
+            # Per-face screen polygons as plain lists, which is what gfxdraw consumes fastest.
+            corners = screen[mesh.indices].tolist()
+            offsets = mesh.offsets.tolist()
+
+            polygons = []
+            for face, clip in zip(faces.tolist(), partial.tolist()):
+                polygon = corners[offsets[face]:offsets[face + 1]]
+                polygons.append(clip_polygon(polygon, width, height) if clip else polygon)
+
+        with profiler.stage("shade"):
+            colors = (mesh.colors[faces] if self.shading is None else self.shading.shade(view, faces)).tolist()
+
+        with profiler.stage("sort"):
+            order = self.draw_order(view.face_centers()[faces]).tolist()
+
+        with profiler.stage("draw"):
+            for face in order:
+                # Clipping can leave nothing behind when only the bounding box touched the viewport.
+                if len(polygons[face]) < 3:
+                    continue
+
+                if self.antialias:
+                    gfxdraw.aapolygon(self.target, polygons[face], colors[face])
+                gfxdraw.filled_polygon(self.target, polygons[face], colors[face])
+
+        profiler.count("drawn", len(order))
+
+    def draw_polygon(self, poly: Polygon | Polygon3D | CompositeShape | InstancedShape | SceneNode | ChunkedTerrain):
+        if self.rasterizer is not None and isinstance(poly, (Polygon2D, Face)):
+            self.rasterize_polygon(poly)
+            return
 
-    def draw_polygon(self, poly: Polygon | Polygon3D | CompositeShape):
         if isinstance(poly, Polygon2D):
             vertices_tuple = poly.vertices_to_tuple()
+        elif isinstance(poly, Face) and poly.mesh is not None:
+            # The whole mesh is projected (once per frame at most) and every face of it drawn this way shares that.
+            vertices_tuple = self.projections.project_mesh(poly.mesh)[poly.mesh.face(poly.index)].tolist()
         elif isinstance(poly, Face):
-            vertices_tuple = tuple(map(lambda p: p.to_2D().coords, poly.vertices))
+            self.profiler.count("points", len(poly.vertices))
+            with self.profiler.stage("project"):
+                vertices_tuple = self.projections.project_points(poly.vertices)
         elif isinstance(poly, Polygon3D):
-            for face in self.dist_from_vp(poly.faces):
-                self.draw_polygon(face)
+            if isinstance(poly, LODShape):
+                self.select_levels([poly])
+            self.draw_meshes([poly.mesh])
+            return
+        elif isinstance(poly, CompositeShape) and poly.bvh is not None:
+            self.select_levels([component for component in poly.components if isinstance(component, LODShape)])
+            with self.profiler.stage("bvh"):
+                poly.bvh.update(poly.meshes)
+                candidates = poly.bvh.query(self.surface.get_size(), projection=self.camera.project)
+            self.draw_meshes(poly.bvh.meshes, candidates)
             return
         elif isinstance(poly, CompositeShape):
-            for face in self.dist_from_vp(poly.all_faces):
-                self.draw_polygon(face)
+            self.select_levels([component for component in poly.components if isinstance(component, LODShape)])
+            self.draw_meshes(poly.meshes)
+            return
+        elif isinstance(poly, SceneNode):
+            with self.profiler.stage("scene"):
+                meshes = poly.meshes
+            self.draw_meshes(meshes)
+            return
+        elif isinstance(poly, ChunkedTerrain):
+            self._terrains.add(poly)
+            with self.profiler.stage("terrain"):
+                poly.update(self.camera.position)
+                meshes = poly.meshes
+            self.profiler.count("chunks", len(meshes))
+            self.draw_meshes(meshes)
+            return
+        elif isinstance(poly, InstancedShape):
+            if len(poly):
+                with self.profiler.stage("instancing"):
+                    batch = poly.batch()
+                self.draw_batch(batch)
             return
-        
-        gfxdraw.aapolygon(self.surface, vertices_tuple, poly.color)
-        gfxdraw.filled_polygon(self.surface, vertices_tuple, poly.color)
\ No newline at end of file
+
+        if self._scale != 1:
+            vertices_tuple = [(x * self._scale, y * self._scale) for x, y in vertices_tuple]
+
+        self.mark_drawn(vertices_tuple)
+        with self.profiler.stage("draw"):
+            if self.antialias:
+                gfxdraw.aapolygon(self.target, vertices_tuple, poly.color)
+            gfxdraw.filled_polygon(self.target, vertices_tuple, poly.color)
+
+    def rasterize_polygon(self, poly: Polygon2D | Face):
+        """
+        Single polygons for the zbuffer backend. Polygon2Ds have no depth and are drawn on top of everything.
+        """
+        if isinstance(poly, Face) and poly.mesh is not None:
+            rows = poly.mesh.face(poly.index)
+            screen = self.projections.project_mesh(poly.mesh)[rows]
+            depth = self.camera.to_view(poly.mesh.vertices[rows])[:, 2]
+        elif isinstance(poly, Face):
+            screen = np.array(self.projections.project_points(poly.vertices), dtype=np.float64)
+            depth = self.camera.to_view(np.array([point.coords for point in poly.vertices], dtype=np.float64))[:, 2]
+        else:
+            screen = np.array(poly.vertices_to_tuple(), dtype=np.float64)
+            # Finite stand-in for minus infinity, which would turn the depth plane into NaNs.
+            depth = np.full(len(screen), np.finfo(np.float32).min, dtype=np.float64)
+
+        screen = screen * self._scale
+        self.mark_drawn(screen)
+        fan = np.arange(1, len(screen) - 1)
+        triangles = np.stack([np.zeros_like(fan), fan, fan + 1], axis=1)
+        self.rasterizer.draw_triangles(screen, depth, triangles, np.tile(poly.color, (len(triangles), 1)))
@@ -0,0 +1,229 @@
+from __future__ import annotations
+from exceptions.GraphicsExceptions import MeshFormatError
+from utils.Mesh import Mesh
+from utils.Polygon import Polygon3D, CompositeShape
+import numpy as np
+import os
+
+MAGIC = b"3DGSCENE"
+FORMAT_VERSION = 1
+
+# Every array starts on a multiple of this, so the memory-mapped views are aligned for any dtype.
+ALIGNMENT = 64
+
+_HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("arrays", "<u4"), ("key_size", "<u4"), ("reserved", "<u4")])
+_ENTRY = np.dtype([("name", "S16"), ("dtype", "S8"), ("rows", "<u8"), ("columns", "<u8"), ("offset", "<u8")])
+
+# Node kinds of the component hierarchy.
+_POLYGON = 0
+_COMPOSITE = 1
+
+def save_scene(path: str, scene: Polygon3D | CompositeShape, key: str = ""):
+    """
+    Writes scene to a binary scene file. The hierarchy (nested CompositeShapes down to Polygon3Ds) is flattened
+    in pre-order into node arrays, and every mesh buffer is written once, back to back, with the per-mesh ranges
+    stored alongside. key is an arbitrary string (a hash or timestamp of the source assets for example) that
+    cached_scene compares to decide whether the file is still current.
+
+    The file is written next to path and moved into place once complete, so readers never see a partial file.
+    """
+    kinds, parents, meshes = [], [], []
+    _flatten(scene, -1, kinds, parents, meshes)
+
+    mesh_ids = np.full(len(kinds), -1, dtype=np.int64)
+    mesh_ids[np.array(kinds) == _POLYGON] = np.arange(len(meshes))
+
+    arrays = {
+        "kinds": np.array(kinds, dtype=np.int64),
+        "parents": np.array(parents, dtype=np.int64),
+        "mesh_ids": mesh_ids,
+        "vertex_starts": _starts([mesh.vertex_count for mesh in meshes]),
+        "index_starts": _starts([len(mesh.indices) for mesh in meshes]),
+        "face_starts": _starts([mesh.face_count for mesh in meshes]),
+        # The big buffers are streamed from the meshes one at a time instead of being concatenated first.
+        "vertices": ([mesh.vertices for mesh in meshes], np.dtype("<f8"), 3),
+        "indices": ([mesh.indices for mesh in meshes], np.dtype("<i8"), 0),
+        "offsets": ([mesh.offsets for mesh in meshes], np.dtype("<i8"), 0),
+        "colors": ([mesh.colors for mesh in meshes], np.dtype("u1"), 3)
+    }
+
+    encoded_key = key.encode("utf-8")
+    table = np.zeros(len(arrays), dtype=_ENTRY)
+    position = _align(_HEADER.itemsize + len(encoded_key) + _ENTRY.itemsize * len(arrays))
+
+    for entry, (name, array) in zip(table, arrays.items()):
+        if isinstance(array, tuple):
+            parts, dtype, columns = array
+            rows = sum(len(part) for part in parts)
+        else:
+            dtype, columns, rows = array.dtype.newbyteorder("<"), 0, len(array)
+
+        entry["name"] = name.encode("ascii")
+        entry["dtype"] = dtype.str.encode("ascii")
+        entry["rows"] = rows
+        entry["columns"] = columns
+        entry["offset"] = position
+        position = _align(position + rows * max(columns, 1) * dtype.itemsize)
+
+    header = np.zeros(1, dtype=_HEADER)
+    header["magic"] = MAGIC
+    header["version"] = FORMAT_VERSION
+    header["arrays"] = len(arrays)
+    header["key_size"] = len(encoded_key)
+
+    partial = path + ".partial"
+    with open(partial, "wb") as file:
+        file.write(header.tobytes())
+        file.write(encoded_key)
+        file.write(table.tobytes())
+
+        for entry, array in zip(table, arrays.values()):
+            file.write(b"\0" * (int(entry["offset"]) - file.tell()))
+
+            parts = array[0] if isinstance(array, tuple) else [array]
+            for part in parts:
+                np.ascontiguousarray(part, dtype=np.dtype(entry["dtype"].decode())).tofile(file)
+
+        file.write(b"\0" * (position - file.tell()))
+
+    os.replace(partial, path)
+
+def load_scene(path: str) -> Polygon3D | CompositeShape:
+    """
+    Loads a scene written by save_scene. The file is memory-mapped copy-on-write and every mesh buffer is a view
+    into it: nothing is parsed, copied or validated, and pages are only read from disk when first touched.
+    Transforming the loaded scene modifies private copies of the touched pages, never the file.
+    """
+    # A plain ndarray view of the mapping, slicing memmap objects is several times slower and this runs per mesh.
+    data = np.memmap(path, dtype=np.uint8, mode="c").view(np.ndarray)
+    arrays = _read_table(data, path)
+
+    vertex_starts = arrays["vertex_starts"].tolist()
+    index_starts = arrays["index_starts"].tolist()
+    face_starts = arrays["face_starts"].tolist()
+    vertices, indices, offsets, colors = arrays["vertices"], arrays["indices"], arrays["offsets"], arrays["colors"]
+
+    meshes = []
+    for mesh in range(len(vertex_starts) - 1):
+        index_start, index_stop = index_starts[mesh], index_starts[mesh + 1]
+        face_start, face_stop = face_starts[mesh], face_starts[mesh + 1]
+
+        # Every mesh stores face_count + 1 offsets, so mesh k's run is shifted k entries along.
+        meshes.append(Mesh.from_buffers(
+            vertices[vertex_starts[mesh]:vertex_starts[mesh + 1]],
+            indices[index_start:index_stop],
+            offsets[face_start + mesh:face_stop + mesh + 1],
+            colors[face_start:face_stop]
+        ))
+
+    return _rebuild(arrays["kinds"], arrays["parents"], arrays["mesh_ids"], meshes, path)
+
+def read_key(path: str) -> str | None:
+    """
+    The key a scene file was saved with, or None when path is missing or not a scene file of this format version.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read(_HEADER.itemsize)
+            if len(data) != _HEADER.itemsize:
+                return None
+
+            header = np.frombuffer(data, dtype=_HEADER)
+            if header["magic"][0] != MAGIC or header["version"][0] != FORMAT_VERSION:
+                return None
+
+            return file.read(int(header["key_size"][0])).decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def cached_scene(path: str, build, key: str = "") -> Polygon3D | CompositeShape:
+    """
+    Loads the scene cached at path when it was saved with the same key by this format version. Otherwise calls
+    build() to construct the scene the slow way, caches it at path and returns it.
+    """
+    if read_key(path) == key:
+        return load_scene(path)
+
+    scene = build()
+    save_scene(path, scene, key)
+
+    return scene
+
+def source_key(*paths: str) -> str:
+    """
+    A key for cached_scene that changes whenever one of the given source files is modified.
+    """
+    stats = [os.stat(path) for path in paths]
+    return ";".join(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}" for path, stat in zip(paths, stats))
+
+def _flatten(shape, parent: int, kinds: list, parents: list, meshes: list):
+    node = len(kinds)
+    parents.append(parent)
+
+    if isinstance(shape, CompositeShape):
+        kinds.append(_COMPOSITE)
+        for component in shape.components:
+            _flatten(component, node, kinds, parents, meshes)
+    elif isinstance(shape, Polygon3D):
+        kinds.append(_POLYGON)
+        meshes.append(shape.mesh)
+    else:
+        raise TypeError(f"Expected Polygon3D or CompositeShape, got {type(shape)} instead.")
+
+def _rebuild(kinds: np.ndarray, parents: np.ndarray, mesh_ids: np.ndarray, meshes: list[Mesh], path: str):
+    if len(kinds) == 0:
+        raise MeshFormatError(f"Empty scene file: {path}")
+
+    nodes = [None] * len(kinds)
+    children = [[] for _ in kinds]
+    for node, parent in enumerate(parents.tolist()[1:], start=1):
+        children[parent].append(node)
+
+    # Children always come after their parent in pre-order, so building back to front sees them first.
+    for node in reversed(range(len(kinds))):
+        if kinds[node] == _POLYGON:
+            nodes[node] = Polygon3D.from_mesh(meshes[mesh_ids[node]], validate=False)
+        else:
+            nodes[node] = CompositeShape([nodes[child] for child in children[node]])
+
+    return nodes[0]
+
+def _read_table(data: np.ndarray, path: str) -> dict[str, np.ndarray]:
+    if len(data) < _HEADER.itemsize:
+        raise MeshFormatError(f"Not a scene file: {path}")
+
+    header = data[:_HEADER.itemsize].view(_HEADER)[0]
+    if header["magic"] != MAGIC:
+        raise MeshFormatError(f"Not a scene file: {path}")
+    if header["version"] != FORMAT_VERSION:
+        raise MeshFormatError(f"Scene file format version {header['version']} is not supported (expected {FORMAT_VERSION}): {path}")
+
+    start = _HEADER.itemsize + int(header["key_size"])
+    stop = start + _ENTRY.itemsize * int(header["arrays"])
+    if stop > len(data):
+        raise MeshFormatError(f"Scene file truncated: {path}")
+
+    table = data[start:stop].view(_ENTRY)
+
+    arrays = dict()
+    for entry in table:
+        dtype = np.dtype(entry["dtype"].decode("ascii"))
+        rows, columns, offset = int(entry["rows"]), int(entry["columns"]), int(entry["offset"])
+        size = rows * max(columns, 1) * dtype.itemsize
+
+        if offset + size > len(data):
+            raise MeshFormatError(f"Scene file truncated: {path}")
+
+        array = data[offset:offset + size].view(dtype)
+        arrays[entry["name"].decode("ascii")] = array.reshape(rows, columns) if columns else array
+
+    return arrays
+
+def _starts(sizes: list[int]) -> np.ndarray:
+    starts = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=starts[1:])
+
+    return starts
+
+def _align(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
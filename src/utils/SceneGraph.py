@@ -0,0 +1,188 @@
+from __future__ import annotations
+from utils.Mesh import Mesh, transform_normals
+from utils.Polygon import Polygon3D
+from utils.Point import Point, Point3D, Plane
+from utils.Transform import Transform
+import numpy as np
+import math
+
+class SceneNode:
+    """
+    A node of a scene graph. Every node has a local transform relative to its parent, optional geometry (a Mesh,
+    or a Polygon3D whose mesh is used) given in the node's own space, and any number of child nodes.
+
+    World transforms and world-space geometry are cached. Changing a node's local transform only marks that node's
+    subtree dirty, and dirty nodes recompute their world transform and geometry the next time they are read, so a
+    frame costs time proportional to what moved: static subtrees keep returning the same world meshes (which also
+    keeps their projections cached, see ProjectionCache), and nodes whose world transform is the identity use their
+    source mesh directly. Editing a source mesh (through Mesh.transform, touch...) is noticed through Mesh.version.
+
+    Unlike CompositeShape, moving a node never rewrites the vertices of the source meshes.
+    """
+
+    def __init__(self, shape: Mesh | Polygon3D | None = None, transform: Transform | None = None, children: list[SceneNode] = (), name: str = ""):
+        self.name = name
+        self.shape = shape
+        self.parent = None
+        self.children = []
+
+        self._local = transform if transform is not None else Transform.identity()
+        self._world = None
+        self._dirty = True
+
+        self._world_mesh = None
+        self._mesh_world = None
+        self._source = None
+        self._source_version = None
+
+        self._drawables = None
+
+        for child in children:
+            self.add(child)
+
+    def __repr__(self) -> str:
+        return f'SceneNode({self.name!r}, {len(self.children)} children)'
+
+    @property
+    def mesh(self) -> Mesh | None:
+        """
+        The node's geometry in its own space.
+        """
+        return self.shape.mesh if isinstance(self.shape, Polygon3D) else self.shape
+
+    def add(self, child: SceneNode) -> SceneNode:
+        """
+        Attaches child (detaching it from its current parent first) and returns it.
+        """
+        if child.parent is not None:
+            child.parent.remove(child)
+
+        child.parent = self
+        self.children.append(child)
+        child._mark_dirty()
+        self._structure_changed()
+
+        return child
+
+    def remove(self, child: SceneNode):
+        self.children.remove(child)
+        child.parent = None
+        child._mark_dirty()
+        self._structure_changed()
+
+    def walk(self):
+        """
+        Every node of the subtree, parents before children.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    @property
+    def local(self) -> Transform:
+        return self._local
+
+    @local.setter
+    def local(self, transform: Transform):
+        self._local = transform
+        self._mark_dirty()
+
+    def transform(self, transform: Transform):
+        """
+        Applies transform on top of the local transform, in the parent's space.
+        """
+        self.local = transform @ self._local
+
+    def rotate(self, about: Point, angle: int | float, plane: Plane):
+        # Same half-turn convention as Point.rotate, see Transform.rotation.
+        self.transform(Transform.rotation(about, angle + math.pi, plane))
+
+    def translate(self, offset: Point3D | tuple[float]):
+        self.transform(Transform.translation(offset))
+
+    @property
+    def world(self) -> Transform:
+        """
+        The transform from this node's space to world space, recomputed only after the subtree was marked dirty.
+        """
+        if self._dirty:
+            self._world = self._local if self.parent is None else self.parent.world @ self._local
+            self._dirty = False
+
+        return self._world
+
+    @property
+    def world_mesh(self) -> Mesh | None:
+        """
+        The node's geometry in world space. The same Mesh object is returned and updated in place for as long as
+        the source mesh keeps its size, so anything cached against it stays valid while the node does not move.
+        """
+        source = self.mesh
+        if source is None:
+            return None
+
+        # Read before checking, it flushes any pending transform of the source into its version.
+        vertices = source.vertices
+        world = self.world
+
+        # A recomputed world transform is a new object, whoever triggered the recomputation.
+        if world is self._mesh_world and source is self._source and source.version == self._source_version:
+            return self._world_mesh
+
+        if world.is_identity():
+            self._world_mesh = source
+        else:
+            # Once normals were asked for, they come from the source's, turned like the vertices (see Mesh.transformed),
+            # instead of being recomputed from the world vertices after every move.
+            reused = self._world_mesh is not None and self._world_mesh is not source and source is self._source
+            if source._has_normals() or (reused and self._world_mesh._has_normals()):
+                source.normals()
+
+            if not reused or self._world_mesh.vertex_count != len(vertices):
+                self._world_mesh = source.transformed(world)
+            else:
+                self._world_mesh.vertices[:] = world.apply(vertices)
+                self._world_mesh.touch()
+
+                normals = transform_normals(source._normals, world) if source._has_normals() else None
+                if normals is not None:
+                    self._world_mesh._set_normals(normals)
+
+        self._mesh_world = world
+        self._source = source
+        self._source_version = source.version
+
+        return self._world_mesh
+
+    @property
+    def meshes(self) -> list[Mesh]:
+        """
+        World meshes of every node with geometry in the subtree, for Render.draw_meshes.
+        """
+        if self._drawables is None:
+            self._drawables = [node for node in self.walk() if node.shape is not None]
+
+        return [node.world_mesh for node in self._drawables]
+
+    def center(self) -> Point3D:
+        meshes = [mesh for mesh in self.meshes if mesh.face_count]
+        return Point3D(*np.concatenate([mesh.face_centers() for mesh in meshes]).mean(axis=0).tolist())
+
+    def _mark_dirty(self):
+        # A dirty node's subtree is always dirty already, so the walk stops there.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._dirty and node is not self:
+                continue
+
+            node._dirty = True
+            stack.extend(node.children)
+
+    def _structure_changed(self):
+        node = self
+        while node is not None:
+            node._drawables = None
+            node = node.parent
@@ -0,0 +1,48 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+import numpy as np
+
+SHADING_MODES = ("flat", "ambient", "lambert")
+
+class Shader:
+    """
+    Per-face lighting, computed for a whole batch of faces at once from Mesh.normals (cached with the geometry).
+
+    mode "flat" keeps the face colours as they are, "ambient" scales them by ambient, and "lambert" adds a diffuse
+    term from a directional light: ambient + diffuse * max(0, -normal . direction). direction is the way the light
+    travels, in camera space, so the light moves with the viewer. The default comes from the upper left, over the
+    viewer's shoulder.
+    """
+
+    def __init__(self, mode: str = "lambert", direction: tuple[float] = (0.5, 1, 2), ambient: float = 0.35, diffuse: float = 0.65):
+        if mode not in SHADING_MODES:
+            raise ValueError(f"Unknown shading mode {mode}, expected one of {', '.join(SHADING_MODES)}.")
+
+        self.mode = mode
+        self.direction = np.asarray(direction, dtype=np.float64) / np.linalg.norm(direction)
+        self.ambient = ambient
+        self.diffuse = diffuse
+
+    def intensities(self, normals: np.ndarray) -> np.ndarray:
+        """
+        The (F,) light intensities of faces with the given unit normals.
+        """
+        if self.mode == "flat":
+            return np.ones(len(normals))
+        if self.mode == "ambient":
+            return np.full(len(normals), self.ambient)
+
+        return self.ambient + self.diffuse * np.maximum(-(normals @ self.direction), 0)
+
+    def shade(self, mesh: Mesh, faces: np.ndarray | None = None) -> np.ndarray:
+        """
+        The (F, 3) uint8 lit colours of the faces of mesh (all of them by default).
+        """
+        colors = mesh.colors if faces is None else mesh.colors[faces]
+        if self.mode == "flat":
+            return colors
+
+        normals = mesh.normals() if faces is None else mesh.normals()[faces]
+        lit = colors * self.intensities(normals)[:, None]
+
+        return np.clip(lit, 0, 255).astype(np.uint8)
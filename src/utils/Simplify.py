@@ -0,0 +1,281 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+import numpy as np
+
+# Weight of the planes that pin open boundaries in place, relative to the surface quadrics.
+BOUNDARY_WEIGHT = 1000.0
+
+def simplify(mesh: Mesh, target_faces: int, preserve_boundary: bool = True) -> Mesh:
+    """
+    Reduces mesh to about target_faces triangles by quadric error metric edge collapse (Garland & Heckbert).
+
+    Every vertex carries a quadric, the sum of the squared distances to the planes of the triangles around it.
+    Collapsing an edge merges its two vertices into the point minimising the summed quadric, and the cheapest
+    collapses go first. Collapses are done in passes: each pass ranks every edge at once and collapses a set of
+    cheap edges sharing no vertex, rejecting any that would flip a triangle over. Faces are fan-triangulated first,
+    and every triangle keeps the colour of the face it came from.
+
+    The result is a new Mesh, the input is not modified.
+    """
+    triangles, triangle_faces = mesh.triangles()
+    vertices = mesh.vertices.copy()
+    colors = mesh.colors[triangle_faces]
+
+    quadrics = _vertex_quadrics(vertices, triangles, preserve_boundary)
+
+    while len(triangles) > target_faces:
+        collapses = max((len(triangles) - target_faces) // 2, 1)
+        merged = _collapse_pass(vertices, triangles, quadrics, collapses)
+        if merged is None:
+            break
+
+        remap, vertices, quadrics = merged
+        triangles = remap[triangles]
+
+        keep = (triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])
+        triangles, colors = triangles[keep], colors[keep]
+
+    used, inverse = np.unique(triangles, return_inverse=True)
+    return Mesh(vertices[used], inverse.reshape(-1, 3), colors)
+
+def _planes(vertices: np.ndarray, triangles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Unit normals and plane offsets (n . p + d = 0) of every triangle, and the triangle areas.
+    """
+    corners = vertices[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+
+    normals = normals / np.where(lengths > 0, lengths, 1)[:, None]
+    planes = np.concatenate([normals, -np.einsum("ij,ij->i", normals, corners[:, 0])[:, None]], axis=1)
+
+    return planes, lengths / 2
+
+def _vertex_quadrics(vertices: np.ndarray, triangles: np.ndarray, preserve_boundary: bool) -> np.ndarray:
+    planes, areas = _planes(vertices, triangles)
+
+    # Area weighted, so large triangles matter more than slivers.
+    face_quadrics = areas[:, None, None] * planes[:, :, None] * planes[:, None, :]
+    quadrics = np.zeros((len(vertices), 4, 4))
+    for corner in range(3):
+        np.add.at(quadrics, triangles[:, corner], face_quadrics)
+
+    if preserve_boundary:
+        edges = np.stack([triangles, np.roll(triangles, -1, axis=1)], axis=2).reshape(-1, 2)
+        sides = np.repeat(np.arange(len(triangles)), 3)
+        keys = np.sort(edges, axis=1)
+        _, inverse, counts = np.unique(keys[:, 0] * len(vertices) + keys[:, 1], return_inverse=True, return_counts=True)
+
+        boundary = counts[inverse.reshape(-1)] == 1
+        edges, sides = edges[boundary], sides[boundary]
+
+        # A plane through the boundary edge, perpendicular to its triangle, keeps the boundary from shrinking.
+        start, direction = vertices[edges[:, 0]], vertices[edges[:, 1]] - vertices[edges[:, 0]]
+        normals = np.cross(direction, planes[sides, :3])
+        lengths = np.linalg.norm(normals, axis=1)
+        normals = normals / np.where(lengths > 0, lengths, 1)[:, None]
+
+        constraint = np.concatenate([normals, -np.einsum("ij,ij->i", normals, start)[:, None]], axis=1)
+        weight = BOUNDARY_WEIGHT * np.einsum("ij,ij->i", direction, direction)
+        boundary_quadrics = weight[:, None, None] * constraint[:, :, None] * constraint[:, None, :]
+
+        for corner in range(2):
+            np.add.at(quadrics, edges[:, corner], boundary_quadrics)
+
+    return quadrics
+
+def _collapse_pass(vertices: np.ndarray, triangles: np.ndarray, quadrics: np.ndarray, collapses: int):
+    """
+    One round of independent collapses. Returns the vertex remap and the updated vertex positions and quadrics,
+    or None when no edge could be collapsed.
+    """
+    edges = np.sort(np.stack([triangles, np.roll(triangles, -1, axis=1)], axis=2).reshape(-1, 2), axis=1)
+    keys, sides = np.unique(edges[:, 0] * len(vertices) + edges[:, 1], return_counts=True)
+    edges = np.stack([keys // len(vertices), keys % len(vertices)], axis=1)
+
+    merged = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+    targets = _optimal_points(merged, vertices[edges[:, 0]], vertices[edges[:, 1]])
+    costs = _quadric_error(merged, targets)
+
+    # Collapses that would flip a triangle even on their own never take part.
+    valid = _valid_collapses(vertices, triangles, edges, targets) & _keeps_manifold(keys, sides, len(vertices))
+    edges, merged, targets, costs = edges[valid], merged[valid], targets[valid], costs[valid]
+    if len(edges) == 0:
+        return None
+
+    # Ties (every edge of a flat region costs 0) are broken randomly, ranking them in index order would let
+    # only a handful of edges be the cheapest at both of their ends.
+    tiebreak = np.random.default_rng(len(triangles)).random(len(edges))
+    rank = np.empty(len(edges), dtype=np.int64)
+    rank[np.lexsort((tiebreak, costs))] = np.arange(len(edges))
+
+    # Each vertex allows only its cheapest remaining edge, which makes the chosen edges vertex-disjoint.
+    # A few rounds over the vertices left free grow the set towards a maximal matching.
+    taken = np.zeros(len(vertices), dtype=bool)
+    chosen = []
+    for _ in range(4):
+        free = np.flatnonzero(~(taken[edges[:, 0]] | taken[edges[:, 1]]))
+        if len(free) == 0:
+            break
+
+        cheapest = np.full(len(vertices), len(edges), dtype=np.int64)
+        np.minimum.at(cheapest, edges[free, 0], rank[free])
+        np.minimum.at(cheapest, edges[free, 1], rank[free])
+
+        matched = free[(cheapest[edges[free, 0]] == rank[free]) & (cheapest[edges[free, 1]] == rank[free])]
+        taken[edges[matched].reshape(-1)] = True
+        chosen.append(matched)
+
+    chosen = np.concatenate(chosen)
+    chosen = chosen[np.argsort(rank[chosen])][:collapses]
+
+    # Rejecting collapses around a flipped triangle can flip others back into place, so repeat until none flip.
+    # Every round drops at least one collapse, a flipped triangle always holds a moved vertex.
+    while len(chosen):
+        moved = vertices.copy()
+        moved[edges[chosen, 0]] = targets[chosen]
+        moved[edges[chosen, 1]] = targets[chosen]
+
+        flipped = _flipped(vertices, moved, triangles, edges[chosen])
+        if not np.any(flipped):
+            break
+
+        bad = np.zeros(len(vertices), dtype=bool)
+        bad[triangles[flipped]] = True
+        chosen = chosen[~(bad[edges[chosen, 0]] | bad[edges[chosen, 1]])]
+
+    if len(chosen) == 0:
+        return None
+
+    keep, drop = edges[chosen, 0], edges[chosen, 1]
+
+    remap = np.arange(len(vertices))
+    remap[drop] = keep
+
+    vertices = vertices.copy()
+    vertices[keep] = targets[chosen]
+    quadrics = quadrics.copy()
+    quadrics[keep] = merged[chosen]
+
+    return remap, vertices, quadrics
+
+def _keeps_manifold(keys: np.ndarray, sides: np.ndarray, vertex_count: int) -> np.ndarray:
+    """
+    The link condition: an edge may collapse only if its ends share no neighbours besides the far corners of
+    the triangles on the edge. Otherwise the collapse pinches the surface into non-manifold edges.
+    """
+    first, second = keys // vertex_count, keys % vertex_count
+
+    # Both directions of every edge, grouped by their first vertex.
+    tails = np.concatenate([first, second])
+    heads = np.concatenate([second, first])
+    order = np.argsort(tails, kind="stable")
+    tails, heads = tails[order], heads[order]
+    starts = np.searchsorted(tails, np.arange(vertex_count + 1))
+
+    # For every neighbour c of an edge's first end, check whether c is a neighbour of the second end too.
+    counts = starts[first + 1] - starts[first]
+    owner = np.repeat(np.arange(len(keys)), counts)
+    neighbours = heads[np.repeat(starts[first], counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+
+    low, high = np.minimum(neighbours, second[owner]), np.maximum(neighbours, second[owner])
+    probe = low * vertex_count + high
+    found = np.minimum(np.searchsorted(keys, probe), len(keys) - 1)
+    shared = (keys[found] == probe) & (neighbours != second[owner])
+
+    return np.bincount(owner[shared], minlength=len(keys)) <= sides
+
+def _valid_collapses(vertices: np.ndarray, triangles: np.ndarray, edges: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Which edges can be collapsed to their target without any surrounding triangle turning over, each edge
+    considered alone. Works on every (edge, triangle around either end) pair at once.
+    """
+    corners = triangles.reshape(-1)
+    order = np.argsort(corners, kind="stable")
+    starts = np.zeros(len(vertices) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(corners, minlength=len(vertices)), out=starts[1:])
+
+    pairs_edge, pairs_triangle = [], []
+    for end in range(2):
+        ends = edges[:, end]
+        counts = starts[ends + 1] - starts[ends]
+        owner = np.repeat(np.arange(len(edges)), counts)
+        local = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        pairs_edge.append(owner)
+        pairs_triangle.append(order[starts[ends][owner] + local] // 3)
+
+    owner, around = np.concatenate(pairs_edge), np.concatenate(pairs_triangle)
+    corner_ids = triangles[around]
+    first, second = edges[owner, 0:1], edges[owner, 1:2]
+
+    moving = (corner_ids == first) | (corner_ids == second)
+    # Triangles holding both ends vanish with the edge.
+    surviving = moving.sum(axis=1) == 1
+
+    old = vertices[corner_ids]
+    new = np.where(moving[:, :, None], targets[owner][:, None, :], old)
+
+    old_normals = np.cross(old[:, 1] - old[:, 0], old[:, 2] - old[:, 0])
+    new_normals = np.cross(new[:, 1] - new[:, 0], new[:, 2] - new[:, 0])
+    flips = surviving & (np.einsum("ij,ij->i", old_normals, new_normals) <= 0)
+
+    valid = np.ones(len(edges), dtype=bool)
+    valid[owner[flips]] = False
+
+    return valid
+
+def _optimal_points(quadrics: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    The point minimising each quadric, or the best of the two endpoints and the midpoint when the quadric is
+    too flat to solve reliably (planar regions, straight creases).
+    """
+    candidates = np.stack([first, second, (first + second) / 2], axis=1)
+    errors = np.stack([_quadric_error(quadrics, candidates[:, k]) for k in range(3)], axis=1)
+    points = candidates[np.arange(len(quadrics)), np.argmin(errors, axis=1)]
+
+    linear, offset = quadrics[:, :3, :3], -quadrics[:, :3, 3]
+    solvable = np.abs(np.linalg.det(linear)) > 1e-10 * np.maximum(np.abs(linear).max(axis=(1, 2)), 1e-300) ** 3
+    if np.any(solvable):
+        solved = np.linalg.solve(linear[solvable], offset[solvable][:, :, None])[:, :, 0]
+
+        # Only trust solutions that stay near the edge, far-off minima come from nearly degenerate quadrics.
+        length = np.linalg.norm(second[solvable] - first[solvable], axis=1)
+        near = np.linalg.norm(solved - candidates[solvable, 2], axis=1) <= length
+
+        rows = np.flatnonzero(solvable)[near]
+        better = _quadric_error(quadrics[rows], solved[near]) < _quadric_error(quadrics[rows], points[rows])
+        points[rows[better]] = solved[near][better]
+
+    return points
+
+def _quadric_error(quadrics: np.ndarray, points: np.ndarray) -> np.ndarray:
+    homogeneous = np.concatenate([points, np.ones((len(points), 1))], axis=1)
+    return np.einsum("ni,nij,nj->n", homogeneous, quadrics, homogeneous)
+
+def _flipped(before: np.ndarray, after: np.ndarray, triangles: np.ndarray, collapsed: np.ndarray) -> np.ndarray:
+    """
+    Triangles whose normal turns around (or that become degenerate without being removed) after moving vertices.
+    """
+    ends = np.zeros(len(before), dtype=bool)
+    ends[collapsed.reshape(-1)] = True
+
+    # Triangles holding both ends of a collapsed edge disappear, so they cannot flip.
+    removed = np.zeros(len(triangles), dtype=bool)
+    partner = np.arange(len(before))
+    partner[collapsed[:, 0]] = collapsed[:, 1]
+    partner[collapsed[:, 1]] = collapsed[:, 0]
+    for a, b in ((0, 1), (1, 2), (2, 0)):
+        removed |= (partner[triangles[:, a]] == triangles[:, b]) & (triangles[:, a] != triangles[:, b])
+
+    touched = ends[triangles].any(axis=1) & ~removed
+
+    old = before[triangles[touched]]
+    new = after[triangles[touched]]
+    old_normals = np.cross(old[:, 1] - old[:, 0], old[:, 2] - old[:, 0])
+    new_normals = np.cross(new[:, 1] - new[:, 0], new[:, 2] - new[:, 0])
+
+    flipped = np.zeros(len(triangles), dtype=bool)
+    flipped[touched] = np.einsum("ij,ij->i", old_normals, new_normals) <= 0
+
+    return flipped
@@ -0,0 +1,204 @@
+from __future__ import annotations
+from utils.Mesh import Mesh
+from utils.Generators import heightfield
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from collections import OrderedDict
+from typing import Callable
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HeightfieldChunks:
+    """
+    Builds terrain chunks from a height function of world (x, z) arrays, for ChunkedTerrain.
+
+    Chunk (i, j) covers [i * chunk_size, (i + 1) * chunk_size) in x and the same in z, as resolution x resolution
+    quads. Neighbouring chunks sample the same border points, so they meet without cracks.
+    """
+
+    def __init__(self, height: Callable[[np.ndarray, np.ndarray], np.ndarray], chunk_size: float, resolution: int = 32,
+                 level: float = 0, color: tuple[int] = (40, 160, 60)):
+        self.height = height
+        self.chunk_size = chunk_size
+        self.resolution = resolution
+        self.level = level
+        self.color = color
+
+    def __call__(self, i: int, j: int) -> Mesh:
+        samples = np.linspace(0, self.chunk_size, self.resolution + 1)
+        x = i * self.chunk_size + samples
+        z = j * self.chunk_size + samples
+        heights = self.height(x[None, :], z[:, None])
+
+        spacing = self.chunk_size / self.resolution
+        return heightfield(np.broadcast_to(heights, (len(z), len(x))), (spacing, spacing), (x[0], self.level, z[0]), self.color)
+
+class ChunkedTerrain:
+    """
+    Terrain too large to hold as one shape, split into square chunks of chunk_size in the xz plane that are only
+    built around the viewer. source(i, j) returns the world space Mesh of chunk (i, j), generating or loading it
+    (see HeightfieldChunks).
+
+    update (called by Render every frame) asks for every chunk within radius chunks of the camera. Missing ones are
+    built by a pool of workers background threads, and drawn from the first update after they are ready: the render
+    loop never waits for them. Chunks that leave the radius before their turn are cancelled. Built chunks are kept in
+    a least recently used cache of cache_size chunks, the ones that left the radius longest ago being evicted first,
+    so moving back and forth does not rebuild them and memory stays bounded wherever the camera goes.
+
+    Workers also prepare the caches the renderer needs (normals, triangles), so a new chunk costs the render loop
+    no more than a chunk it has seen before. With workers=0 chunks are built synchronously in update.
+
+    A chunk whose build raises is left out, logged, and kept in errors (chunk to exception) so it is not retried
+    every frame. clear forgets the errors along with the chunks, so they are built again.
+
+    The workers live until close, which Render.close calls for every terrain it drew. Until then queued builds
+    keep the interpreter from exiting, terrains used without a Render have to be closed by their owner.
+    """
+
+    def __init__(self, source: Callable[[int, int], Mesh], chunk_size: float, radius: int = 2, cache_size: int | None = None, workers: int = 2):
+        visible = (2 * radius + 1) ** 2
+        if cache_size is None:
+            cache_size = 2 * visible
+        if cache_size < visible:
+            raise ValueError(f"A chunk cache of {cache_size} cannot hold the {visible} chunks within radius {radius}.")
+
+        self.source = source
+        self.chunk_size = chunk_size
+        self.radius = radius
+        self.cache_size = cache_size
+
+        self.built = 0
+        self.evicted = 0
+        self.errors = {}
+
+        self._chunks = OrderedDict()
+        self._pending = {}
+        self._visible = []
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="terrain") if workers > 0 else None
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def chunk_at(self, x: float, z: float) -> tuple[int]:
+        return int(np.floor(x / self.chunk_size)), int(np.floor(z / self.chunk_size))
+
+    def update(self, position: np.ndarray | tuple[float]):
+        """
+        Makes the chunks around position (a world point, only x and z matter) the visible ones, requesting the
+        missing ones nearest first.
+        """
+        ci, cj = self.chunk_at(position[0], position[2])
+        offsets = range(-self.radius, self.radius + 1)
+        wanted = sorted(((ci + di, cj + dj) for di in offsets for dj in offsets), key=lambda key: (key[0] - ci) ** 2 + (key[1] - cj) ** 2)
+        wanted_set = set(wanted)
+
+        for key, future in list(self._pending.items()):
+            if future.done():
+                del self._pending[key]
+                self._finish(key, future.result)
+            elif key not in wanted_set and future.cancel():
+                del self._pending[key]
+
+        for key in wanted:
+            if key in self._chunks:
+                self._chunks.move_to_end(key)
+            elif key not in self._pending and key not in self.errors:
+                if self._pool is None:
+                    self._finish(key, lambda: _build(self.source, key))
+                else:
+                    self._pending[key] = self._pool.submit(_build, self.source, key)
+
+        # Visible chunks were just moved to the end, so they are never the ones evicted.
+        while len(self._chunks) > self.cache_size:
+            self._chunks.popitem(last=False)
+            self.evicted += 1
+
+        self._visible = [key for key in wanted if key in self._chunks]
+
+    def wait(self, position: np.ndarray | tuple[float] | None = None):
+        """
+        Blocks until every requested chunk is built, then updates (around position, if given) to show them.
+        """
+        if position is not None:
+            self.update(position)
+
+        wait(list(self._pending.values()))
+        if position is not None:
+            self.update(position)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def meshes(self) -> list[Mesh]:
+        """
+        The built chunks around the position of the last update.
+        """
+        return [self._chunks[key] for key in self._visible]
+
+    def clear(self):
+        for future in self._pending.values():
+            future.cancel()
+
+        self._pending = {}
+        self._chunks.clear()
+        self._visible = []
+        self.errors = {}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _finish(self, key: tuple[int], build: Callable[[], Mesh]):
+        try:
+            mesh = build()
+        except Exception as error:
+            logger.error("Building terrain chunk %s failed.", key, exc_info=error)
+            self.errors[key] = error
+            return
+
+        self._chunks[key] = mesh
+        self.built += 1
+
+def _build(source: Callable[[int, int], Mesh], key: tuple[int]) -> Mesh:
+    mesh = source(*key)
+    mesh.normals()
+    mesh.triangles()
+
+    return mesh
+
+def value_noise(x: np.ndarray, z: np.ndarray, scale: float = 256, octaves: int = 4, amplitude: float = 100, seed: int = 0) -> np.ndarray:
+    """
+    Smooth fractal noise over world (x, z), for HeightfieldChunks. Each octave interpolates hashed random values
+    at the corners of a lattice of cell size scale, then halves the cell size and the amplitude.
+    Deterministic, so chunks can be rebuilt after eviction and match their neighbours.
+    """
+    x, z = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(z, dtype=np.float64))
+    total = np.zeros(x.shape)
+
+    for octave in range(octaves):
+        u, v = x / scale, z / scale
+        i, j = np.floor(u), np.floor(v)
+        # Smoothstep keeps the surface free of creases along the lattice lines.
+        fu, fv = u - i, v - j
+        fu, fv = fu * fu * (3 - 2 * fu), fv * fv * (3 - 2 * fv)
+
+        i, j = i.astype(np.int64), j.astype(np.int64)
+        corner = lambda di, dj: _lattice(i + di, j + dj, seed + octave)
+        top = corner(0, 0) + (corner(1, 0) - corner(0, 0)) * fu
+        bottom = corner(0, 1) + (corner(1, 1) - corner(0, 1)) * fu
+        total += amplitude * (top + (bottom - top) * fv)
+
+        scale /= 2
+        amplitude /= 2
+
+    return total
+
+def _lattice(i: np.ndarray, j: np.ndarray, seed: int) -> np.ndarray:
+    # Integer hash of the lattice point to a value in [0, 1).
+    h = (i * 374761393 + j * 668265263 + seed * 144665) & 0xFFFFFFFF
+    h = ((h ^ (h >> 13)) * 1274126177) & 0xFFFFFFFF
+    return (h ^ (h >> 16)) / 2 ** 32
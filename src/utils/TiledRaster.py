@@ -0,0 +1,235 @@
+from __future__ import annotations
+from utils.Raster import Rasterizer, frame_buffers, frame_bytes
+from constants import VIEWPORT_RESOLUTION
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+import pygame as pg
+import numpy as np
+import weakref
+import sys
+import os
+
+# Per-triangle record in the scratch segment: 3 corners of (x, y, depth), then the colour.
+_TRIANGLE = np.dtype([("corners", np.float64, (3, 3)), ("color", np.uint8, (3,))])
+
+class TiledRasterizer:
+    """
+    A Rasterizer whose frame is split into tiles drawn in parallel by a pool of worker processes.
+
+    Colour and depth buffers live in shared memory, so workers write pixels in place and nothing is sent back.
+    For every draw_triangles call the triangles are copied once into a shared scratch segment and binned to the
+    tiles their bounding boxes overlap, then each worker rasterizes whole tiles with the ordinary Rasterizer clipped
+    to the tile. Tiles never overlap, so workers need no locking, and triangles keep their submission order within
+    a tile so the result is pixel for pixel the same as Rasterizer's. Clearing is split the same way, into bands of
+    rows cleared by the workers, and only the blit onto the surface is left to the calling process.
+
+    With workers=0 tiles are drawn in the calling process, which is useful on single core machines and for debugging.
+    The shared segments and the pool are released by close, or when the rasterizer is garbage collected.
+    """
+
+    def __init__(self, resolution: tuple[int] = VIEWPORT_RESOLUTION, background: tuple[int] = (255, 255, 255), chunk_pixels: int = 1 << 20,
+                 tile_size: tuple[int] = (128, 128), workers: int | None = None):
+        self.width, self.height = resolution
+        self.background = background
+        self.chunk_pixels = chunk_pixels
+        self.tile_width, self.tile_height = tile_size
+        self.columns = -(-self.width // self.tile_width)
+        self.rows = -(-self.height // self.tile_height)
+        self.workers = os.cpu_count() if workers is None else workers
+
+        color_size, depth_size = frame_bytes(resolution)
+        self._color_memory = shared_memory.SharedMemory(create=True, size=color_size)
+        self._depth_memory = shared_memory.SharedMemory(create=True, size=depth_size)
+        self.color, self.depth = frame_buffers(resolution, self._color_memory.buf, self._depth_memory.buf)
+
+        # Blits the shared frame, and draws it too when there are no workers.
+        self._local = Rasterizer(resolution, background, chunk_pixels, self.color, self.depth)
+        self._local.clear()
+
+        self._scratch = None
+        self._pool = None
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                initializer=_start_worker,
+                initargs=(self._color_memory.name, self._depth_memory.name, resolution, background, chunk_pixels)
+            )
+
+        self._owned = [self._color_memory, self._depth_memory]
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._owned)
+
+    def close(self):
+        # Views onto the shared buffers have to go before the segments can be closed.
+        if self._local is not None:
+            self._local.release()
+        self.color = self.depth = self._local = None
+        self._finalizer()
+
+    def clear(self, rects: list[pg.Rect] | None = None):
+        """
+        Same as Rasterizer.clear, done by the workers a band of rows at a time. Regions smaller than a tile are not
+        worth a round trip and are cleared in place.
+        """
+        frame = pg.Rect(0, 0, self.width, self.height)
+        regions = [frame] if rects is None else [rect.clip(frame) for rect in rects]
+
+        if self._pool is None or sum(rect.width * rect.height for rect in regions) < self.tile_width * self.tile_height:
+            self._local.clear(rects)
+            return
+
+        # Bands of whole rows are contiguous in memory, a few per worker keeps everyone busy.
+        band = max(1, -(-sum(rect.height for rect in regions) // (self.workers * 4)))
+        tasks = [
+            (rect.left, top, rect.right, min(top + band, rect.bottom))
+            for rect in regions
+            for top in range(rect.top, rect.bottom, band)
+        ]
+        for _ in self._pool.map(_clear_rows, tasks):
+            pass
+
+    def blit(self, surface: pg.Surface, rects: list[pg.Rect] | None = None):
+        self._local.blit(surface, rects)
+
+    def tile_bounds(self, tile: int) -> tuple[int]:
+        """
+        The pixels (left, top, right, bottom) of a tile, right and bottom excluded.
+        """
+        row, column = divmod(tile, self.columns)
+        left, top = column * self.tile_width, row * self.tile_height
+
+        return left, top, min(left + self.tile_width, self.width), min(top + self.tile_height, self.height)
+
+    def bin_triangles(self, screen: np.ndarray, triangles: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Assigns every triangle to the tiles its bounding box overlaps. Returns the (B,) triangle numbers sorted by
+        tile (submission order within a tile) and the (tiles + 1,) offsets of each tile's run in that array.
+        """
+        x = screen[triangles, 0]
+        y = screen[triangles, 1]
+
+        # Same pixel-center convention as Rasterizer, a triangle touches pixel p when it covers p + 0.5.
+        xmin = np.maximum(np.ceil(x.min(axis=1) - 0.5), 0)
+        xmax = np.minimum(np.floor(x.max(axis=1) - 0.5), self.width - 1)
+        ymin = np.maximum(np.ceil(y.min(axis=1) - 0.5), 0)
+        ymax = np.minimum(np.floor(y.max(axis=1) - 0.5), self.height - 1)
+
+        keep = np.flatnonzero((xmax >= xmin) & (ymax >= ymin))
+        first_column = (xmin[keep] // self.tile_width).astype(np.int64)
+        first_row = (ymin[keep] // self.tile_height).astype(np.int64)
+        spans = (xmax[keep] // self.tile_width).astype(np.int64) - first_column + 1
+        heights = (ymax[keep] // self.tile_height).astype(np.int64) - first_row + 1
+
+        counts = spans * heights
+        owner = np.repeat(np.arange(len(keep)), counts)
+        local = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        tiles = (first_row[owner] + local // spans[owner]) * self.columns + first_column[owner] + local % spans[owner]
+        order = np.argsort(tiles, kind="stable")
+
+        offsets = np.zeros(self.columns * self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tiles, minlength=self.columns * self.rows), out=offsets[1:])
+
+        return keep[owner[order]], offsets
+
+    def draw_triangles(self, screen: np.ndarray, depth: np.ndarray, triangles: np.ndarray, colors: np.ndarray):
+        """
+        Same arguments as Rasterizer.draw_triangles. Returns once every tile is drawn.
+        """
+        if len(triangles) == 0:
+            return
+
+        binned, offsets = self.bin_triangles(screen, triangles)
+        if len(binned) == 0:
+            return
+
+        records = self._scratch_records(len(triangles))
+        records["corners"][..., :2] = screen[triangles]
+        records["corners"][..., 2] = depth[triangles]
+        records["color"] = colors
+
+        tasks = [
+            (self._scratch.name, len(triangles), self.tile_bounds(tile), binned[offsets[tile]:offsets[tile + 1]])
+            for tile in np.flatnonzero(np.diff(offsets)).tolist()
+        ]
+
+        if self._pool is None:
+            for _, _, bounds, binned_triangles in tasks:
+                _draw_records(self._local, records[binned_triangles], bounds)
+        else:
+            # A few tasks per worker keeps everyone busy when tiles are unevenly loaded.
+            for _ in self._pool.map(_draw_tile, tasks, chunksize=max(1, len(tasks) // (self.workers * 4))):
+                pass
+
+    def _scratch_records(self, count: int) -> np.ndarray:
+        size = count * _TRIANGLE.itemsize
+        if self._scratch is None or self._scratch.size < size:
+            # Grow geometrically, workers attach to the new segment by name on their next task.
+            if self._scratch is not None:
+                self._owned.remove(self._scratch)
+                _unlink(self._scratch)
+
+            self._scratch = shared_memory.SharedMemory(create=True, size=max(size, 2 * (self._scratch.size if self._scratch else 0), 1 << 16))
+            self._owned.append(self._scratch)
+
+        return np.ndarray((count,), dtype=_TRIANGLE, buffer=self._scratch.buf)
+
+def _draw_records(rasterizer: Rasterizer, records: np.ndarray, bounds: tuple[int]):
+    corners = records["corners"].reshape(-1, 3)
+    rasterizer.draw_triangles(corners[:, :2], corners[:, 2], np.arange(len(corners)).reshape(-1, 3), records["color"], bounds)
+
+class _WorkerState:
+    """
+    What a worker process keeps between tasks: its rasterizer over the shared frame, and the shared memory it attached.
+    """
+    rasterizer = None
+    frame = None
+    scratch = None
+
+_worker = _WorkerState()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # The main process owns the segments and unlinks them, workers must not register them with the resource tracker
+    # (before Python 3.13 attaching always does). Unregistering afterwards is no fix: pool workers share the main
+    # process's tracker, so it would drop the main process's own entry.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+def _start_worker(color_name: str, depth_name: str, resolution: tuple[int], background: tuple[int], chunk_pixels: int):
+    _worker.frame = color, depth = _attach(color_name), _attach(depth_name)
+    _worker.rasterizer = Rasterizer(resolution, background, chunk_pixels, *frame_buffers(resolution, color.buf, depth.buf))
+
+def _clear_rows(bounds: tuple[int]):
+    left, top, right, bottom = bounds
+    _worker.rasterizer.clear([pg.Rect(left, top, right - left, bottom - top)])
+
+def _draw_tile(task: tuple):
+    name, count, bounds, triangles = task
+
+    if _worker.scratch is None or _worker.scratch.name != name:
+        if _worker.scratch is not None:
+            _worker.scratch.close()
+        _worker.scratch = _attach(name)
+
+    records = np.ndarray((count,), dtype=_TRIANGLE, buffer=_worker.scratch.buf)[triangles]
+    _draw_records(_worker.rasterizer, records, bounds)
+
+def _unlink(memory: shared_memory.SharedMemory):
+    memory.close()
+    memory.unlink()
+
+def _release(pool: ProcessPoolExecutor | None, owned: list[shared_memory.SharedMemory]):
+    if pool is not None:
+        pool.shutdown()
+
+    for memory in owned:
+        try:
+            _unlink(memory)
+        except (FileNotFoundError, BufferError):
+            pass
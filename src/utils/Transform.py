@@ -0,0 +1,119 @@
+from __future__ import annotations
+from utils.Point import Point, Point3D, Plane
+import numpy as np
+
+class Transform:
+    """
+    An affine transformation of 3D space, stored as a 4x4 homogeneous matrix.
+
+    Transforms compose by multiplication: (a @ b) is the transform that applies b first and then a, so any chain of
+    rotations, translations and scales collapses into a single matrix before it ever touches a vertex.
+    `a * b` is accepted as an alias of `a @ b`.
+
+    Applying a transform to an (N, 3) array of vertices is one matrix product, see Transform.apply.
+    """
+
+    def __init__(self, matrix: np.ndarray | None = None):
+        if matrix is None:
+            self.matrix = np.identity(4)
+        else:
+            self.matrix = np.array(matrix, dtype=np.float64).reshape(4, 4)
+
+    @classmethod
+    def identity(cls) -> Transform:
+        return cls()
+
+    @classmethod
+    def translation(cls, offset: Point | tuple[float]) -> Transform:
+        transform = cls()
+        transform.matrix[:3, 3] = tuple(offset)[:3]
+
+        return transform
+
+    @classmethod
+    def scaling(cls, factors: int | float | tuple[float], about: Point | None = None) -> Transform:
+        """
+        Scales by one factor along every axis, or by an (sx, sy, sz) tuple. About defaults to the origin.
+        """
+        transform = cls()
+        transform.matrix[[0, 1, 2], [0, 1, 2]] = factors
+
+        return transform._about(about)
+
+    @classmethod
+    def rotation(cls, about: Point, angle: int | float, plane: Plane) -> Transform:
+        """
+        Rotates by angle (radians) in the given plane around about, turning the first basis axis towards the second.
+
+        Note that Point.rotate measures its angle from the vertex towards the pivot, which makes it equivalent
+        to Transform.rotation(about, angle + math.pi, plane).
+        """
+        if not isinstance(about, Point):
+            raise TypeError(f"Expected Point, got {type(about)} instead.")
+        elif not isinstance(angle, (int, float)):
+            raise TypeError(f"Expected int or float, got {type(angle)} instead.")
+        elif not isinstance(plane, Plane):
+            raise TypeError(f"Expected Plane, got {type(plane)} instead.")
+
+        dim1, dim2 = plane.basis
+        cos, sin = np.cos(angle), np.sin(angle)
+
+        transform = cls()
+        transform.matrix[dim1, dim1] = cos
+        transform.matrix[dim1, dim2] = -sin
+        transform.matrix[dim2, dim1] = sin
+        transform.matrix[dim2, dim2] = cos
+
+        return transform._about(about)
+
+    def _about(self, about: Point | None) -> Transform:
+        """
+        Moves the fixed point of a linear transform from the origin to about.
+        """
+        if about is None:
+            return self
+
+        pivot = np.array(about.coords[:3], dtype=np.float64)
+        self.matrix[:3, 3] = pivot - self.matrix[:3, :3] @ pivot
+
+        return self
+
+    @property
+    def linear(self) -> np.ndarray:
+        """
+        The 3x3 rotation/scale part of the matrix.
+        """
+        return self.matrix[:3, :3]
+
+    @property
+    def offset(self) -> np.ndarray:
+        return self.matrix[:3, 3]
+
+    def is_identity(self) -> bool:
+        return np.array_equal(self.matrix, np.identity(4))
+
+    def inverse(self) -> Transform:
+        return Transform(np.linalg.inv(self.matrix))
+
+    def __matmul__(self, other: Transform) -> Transform:
+        if isinstance(other, Transform):
+            return Transform(self.matrix @ other.matrix)
+
+        return NotImplemented
+
+    __mul__ = __matmul__
+
+    def apply(self, vertices: np.ndarray) -> np.ndarray:
+        """
+        Returns a new (N, 3) array with the transform applied to every row of vertices.
+        """
+        return np.asarray(vertices, dtype=np.float64) @ self.linear.T + self.offset
+
+    def apply_point(self, point: Point3D) -> Point3D:
+        return Point3D(*self.apply([point.coords])[0].tolist())
+
+    def __str__(self) -> str:
+        return f'Transform({self.matrix.tolist()})'
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import numpy as np
+
+# Large odd multipliers for hashing integer cell coordinates into one int64 key.
+_HASH = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64).view(np.int64)
+
+# The cell itself plus the 13 neighbours in one half of the surrounding 3x3x3 block, every neighbouring pair
+# of cells is visited exactly once.
+_NEIGHBOURS = np.array([
+    (dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) >= (0, 0, 0)
+], dtype=np.int64)
+
+def weld_vertices(points: np.ndarray, tolerance: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merges points closer than tolerance to each other. Returns the (U, 3) welded points and an (N,) array mapping
+    every input point to its welded index, so welded[inverse] approximates points.
+
+    With a tolerance of 0 only exactly equal points are merged. Otherwise points are bucketed into a spatial hash of
+    tolerance-sized cells and only points in neighbouring cells are compared. Merging is transitive: a chain of points
+    each within tolerance of the next becomes one vertex. Each welded vertex keeps the coordinates of the first input
+    point of its group.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+    if len(points) == 0:
+        return points.copy(), np.zeros(0, dtype=np.int64)
+
+    if tolerance <= 0:
+        _, first, inverse = np.unique(points, axis=0, return_index=True, return_inverse=True)
+        return _first_of_groups(points, first[inverse.reshape(-1)])
+
+    cells = np.floor(points / tolerance).astype(np.int64)
+    keys = _hash_cells(cells)
+
+    # Points sorted by cell, and the run of sorted points belonging to every distinct cell key.
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    cell_keys, cell_starts, cell_counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+    cell_coords = cells[order[cell_starts]]
+
+    labels = np.arange(len(points))
+    for offset in _NEIGHBOURS:
+        neighbour_keys = _hash_cells(cell_coords + offset)
+        found = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        hit = np.flatnonzero(cell_keys[found] == neighbour_keys)
+
+        first, second = _cell_pairs(cell_starts[hit], cell_counts[hit], cell_starts[found[hit]], cell_counts[found[hit]], same=not offset.any())
+        first, second = order[first], order[second]
+
+        close = np.einsum("ij,ij->i", points[first] - points[second], points[first] - points[second]) <= tolerance * tolerance
+        _union(labels, first[close], second[close])
+
+    return _first_of_groups(points, labels)
+
+def _hash_cells(cells: np.ndarray) -> np.ndarray:
+    # Colliding cells only add candidate pairs, which the distance test then rejects.
+    with np.errstate(over="ignore"):
+        return (cells * _HASH).sum(axis=1)
+
+def _cell_pairs(a_starts, a_counts, b_starts, b_counts, same: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Every (point in cell a, point in cell b) pair for each matched pair of cells, as positions in the sorted order.
+    """
+    sizes = a_counts * b_counts
+    owner = np.repeat(np.arange(len(sizes)), sizes)
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+    first = a_starts[owner] + local // b_counts[owner]
+    second = b_starts[owner] + local % b_counts[owner]
+
+    if same:
+        keep = first < second
+        first, second = first[keep], second[keep]
+
+    return first, second
+
+def _union(labels: np.ndarray, first: np.ndarray, second: np.ndarray):
+    """
+    Merges the groups of every (first, second) pair in place, labelling each group by its smallest point index.
+    """
+    while len(first):
+        lowest = np.minimum(labels[first], labels[second])
+        np.minimum.at(labels, labels[first], lowest)
+        np.minimum.at(labels, labels[second], lowest)
+
+        # Pointer jumping until every label points at a root.
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels[:] = jumped
+
+        pending = labels[first] != labels[second]
+        first, second = first[pending], second[pending]
+
+def _first_of_groups(points: np.ndarray, labels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    roots, inverse = np.unique(labels, return_inverse=True)
+    return points[roots], inverse.reshape(-1)
+
+def edge_adjacency(indices: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Undirected edges of a flattened face list (see Mesh). Returns the (E, 2) unique edges with the smaller vertex first,
+    how many face sides use each edge, and for every face side (aligned with indices) the edge it belongs to.
+    """
+    following = np.arange(1, len(indices) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]
+
+    low = np.minimum(indices, indices[following])
+    high = np.maximum(indices, indices[following])
+
+    # One integer key per edge, unique over plain integers is far faster than over rows.
+    stride = int(high.max()) + 1 if len(high) else 1
+    keys, side_edges, counts = np.unique(low * stride + high, return_inverse=True, return_counts=True)
+
+    edges = np.stack([keys // stride, keys % stride], axis=1)
+    return edges, counts, side_edges.reshape(-1)
@@ -1,8 +1,133 @@
+from __future__ import annotations
+from typing import Callable
 import math
+import numpy as np
 
-def exp_complement_curve(z: float): 
-    exponential_constant = 0.00075
-    return 1 - math.exp(-exponential_constant * z)
+EXPONENTIAL_CONSTANT = 0.00075
+PERSPECTIVE_DISTANCE = 1000
+
+def exp_complement_curve(z: float):
+    return 1 - math.exp(-EXPONENTIAL_CONSTANT * z)
+
+def exp_complement_curve_array(z: np.ndarray) -> np.ndarray:
+    """
+    Same curve as exp_complement_curve, evaluated over a whole array of depths at once.
+    """
+    return 1 - np.exp(-EXPONENTIAL_CONSTANT * z)
+
+class AttenuationCurve:
+    """
+    A depth attenuation curve: how far a point at depth z is pulled towards the vanishing point, from 0 (not at all)
+    to 1 (onto it), see VanishingPointProjection. scalar evaluates one depth (for Point3D.to_2D), calling the curve
+    evaluates a whole array of depths at once.
+
+    min_depth is where the curve stops making sense (a pole, for "perspective"): depths at or below it cannot be
+    projected, and faces reaching it are culled, see Culler.
+    """
+
+    def __init__(self, name: str, scalar: Callable[[float], float], vectorized: Callable[[np.ndarray], np.ndarray], min_depth: float = -np.inf):
+        self.name = name
+        self.scalar = scalar
+        self.vectorized = vectorized
+        self.min_depth = min_depth
+        self._tables = {}
+
+    def __repr__(self) -> str:
+        return f'AttenuationCurve({self.name!r})'
+
+    def __call__(self, z: np.ndarray) -> np.ndarray:
+        return self.vectorized(z)
+
+    def table(self, near: float = -5000, far: float = 20000, size: int = 4096) -> AttenuationTable:
+        """
+        The curve sampled into a lookup table over [near, far], built once per range and size.
+        """
+        key = (near, far, size)
+        if key not in self._tables:
+            self._tables[key] = AttenuationTable(self, near, far, size)
+
+        return self._tables[key]
+
+class AttenuationTable:
+    """
+    A lookup table form of an AttenuationCurve: size samples evenly spread over [near, far], linearly interpolated
+    in between. Depths outside the range fall back to the exact curve.
+
+    A lookup costs a handful of array operations whatever the curve, so it pays off for curves that are expensive to
+    evaluate. numpy's exp is cheaper than a lookup, the default exponential curve is best used as it is.
+    """
+
+    def __init__(self, curve: AttenuationCurve, near: float, far: float, size: int = 4096):
+        if not far > near or size < 2:
+            raise ValueError("An attenuation table needs far > near and at least 2 samples.")
+
+        self.curve = curve
+        self.name = f'{curve.name} table'
+        self.min_depth = curve.min_depth
+        self.near = near
+        self.far = far
+        self.size = size
+
+        self.step = (far - near) / (size - 1)
+        # One extra sample so the last interval can read its right end without a bounds check.
+        self.samples = np.append(curve(np.linspace(near, far, size)), curve(np.array([far])))
+
+    def __repr__(self) -> str:
+        return f'AttenuationTable({self.curve.name!r}, {self.near}, {self.far}, {self.size})'
+
+    def scalar(self, z: float) -> float:
+        return float(self(np.array([z], dtype=np.float64))[0])
+
+    def __call__(self, z: np.ndarray) -> np.ndarray:
+        z = np.asarray(z, dtype=np.float64)
+        position = (z - self.near) / self.step
+        inside = (position >= 0) & (position <= self.size - 1)
+
+        position = np.where(inside, position, 0)
+        index = position.astype(np.intp)
+        fraction = position - index
+        lower = self.samples[index]
+        values = lower + (self.samples[index + 1] - lower) * fraction
+
+        if not inside.all():
+            outside = ~inside
+            values[outside] = self.curve(z[outside])
+
+        return values
+
+ATTENUATION_CURVES: dict[str, AttenuationCurve] = {}
+
+def register_attenuation(name: str, scalar: Callable[[float], float], vectorized: Callable[[np.ndarray], np.ndarray], min_depth: float = -np.inf) -> AttenuationCurve:
+    """
+    Adds a curve to ATTENUATION_CURVES, replacing any curve of the same name, so projections can select it by name.
+    """
+    curve = ATTENUATION_CURVES[name] = AttenuationCurve(name, scalar, vectorized, min_depth)
+    return curve
+
+def attenuation_curve(curve: str | Callable | None = None) -> Callable:
+    """
+    Resolves what projections accept as an attenuation curve: a registered name, None for DEFAULT_ATTENUATION as it
+    is when called, or anything that maps arrays of depths (an AttenuationCurve, an AttenuationTable, a plain
+    function), returned as is.
+    """
+    if curve is None:
+        curve = DEFAULT_ATTENUATION
+    if isinstance(curve, str):
+        if curve not in ATTENUATION_CURVES:
+            raise ValueError(f"Unknown attenuation curve {curve}, expected one of {', '.join(ATTENUATION_CURVES)}.")
+        return ATTENUATION_CURVES[curve]
+
+    return curve
+
+# The original curve: points approach the vanishing point exponentially with depth.
+register_attenuation("exponential", exp_complement_curve, exp_complement_curve_array)
+# z / (z + d) makes the vanishing-point projection a pinhole camera d in front of the viewport, like PerspectiveProjection(d).
+# Nothing at or behind the eye, at depth -d, can be projected.
+register_attenuation("perspective", lambda z: z / (z + PERSPECTIVE_DISTANCE), lambda z: z / (z + PERSPECTIVE_DISTANCE), -PERSPECTIVE_DISTANCE)
+# No attenuation at all, a parallel projection along z.
+register_attenuation("flat", lambda z: 0.0, lambda z: np.zeros(np.shape(z)))
+
+DEFAULT_ATTENUATION = "exponential"
 
 depth_attenuation = exp_complement_curve
-# TODO: Add interesting functions for wacky viewports
+depth_attenuation_array = exp_complement_curve_array
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The sources import each other as top-level modules (utils, exceptions, constants), the way main.py runs from src.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Render and the rasterizers only ever draw offscreen here.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from constants import VIEWPORT_RESOLUTION
+from utils.Camera import Camera
+from utils.Culling import Culler
+from utils.Point import Point3D
+from utils.Polygon import Cube
+from utils.Projection import VanishingPointProjection, PerspectiveProjection, project
+from utils.functions import ATTENUATION_CURVES, PERSPECTIVE_DISTANCE, attenuation_curve, register_attenuation
+
+WIDTH, HEIGHT = VIEWPORT_RESOLUTION
+
+def points(count, near=-900, far=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.random(count) * WIDTH, rng.random(count) * HEIGHT, near + rng.random(count) * (far - near)])
+
+@pytest.mark.parametrize("name", ["exponential", "perspective"])
+def test_tables_match_their_curves(name):
+    curve = ATTENUATION_CURVES[name]
+    # Linear interpolation is only as good as the curve is straight, keep clear of the perspective pole.
+    table = curve.table(-500, 20000, 4096)
+    depths = np.linspace(-500, 20000, 4096 * 7)
+
+    np.testing.assert_allclose(table(depths), curve(depths), atol=1e-4)
+    assert table.scalar(123.4) == pytest.approx(curve.scalar(123.4), abs=1e-4)
+
+def test_tables_fall_back_to_the_curve_outside_their_range():
+    curve = ATTENUATION_CURVES["exponential"]
+    depths = np.array([-5000.5, 25000.25, 1e6])
+
+    np.testing.assert_array_equal(curve.table(-900, 20000)(depths), curve(depths))
+
+def test_tables_are_built_once_per_range():
+    curve = ATTENUATION_CURVES["exponential"]
+
+    assert curve.table(0, 100, 64) is curve.table(0, 100, 64)
+    assert curve.table(0, 100, 64) is not curve.table(0, 200, 64)
+    with pytest.raises(ValueError):
+        curve.table(100, 0)
+
+def test_perspective_curve_is_a_pinhole_camera():
+    vertices = points(500)
+    curved = VanishingPointProjection(attenuation="perspective")
+
+    np.testing.assert_allclose(curved.project(vertices), PerspectiveProjection(PERSPECTIVE_DISTANCE).project(vertices))
+    assert curved.min_depth == PerspectiveProjection(PERSPECTIVE_DISTANCE).min_depth == -PERSPECTIVE_DISTANCE
+
+@pytest.mark.parametrize("name", list(ATTENUATION_CURVES))
+def test_to_2d_matches_project_for_every_curve(name):
+    vertices = points(20)
+    screen = project(vertices, attenuation=name)
+
+    for vertex, expected in zip(vertices, screen):
+        np.testing.assert_allclose(Point3D(*vertex).to_2D(attenuation=name).coords, expected)
+
+def test_registered_curves_can_be_selected_by_name():
+    try:
+        curve = register_attenuation("halfway", lambda z: 0.5, lambda z: np.full(np.shape(z), 0.5))
+        assert attenuation_curve("halfway") is curve
+
+        center = np.array(VIEWPORT_RESOLUTION) / 2
+        screen = VanishingPointProjection(attenuation="halfway").project(np.array([[0.0, 0.0, 10.0]]))
+        np.testing.assert_allclose(screen[0], center / 2)
+    finally:
+        del ATTENUATION_CURVES["halfway"]
+
+def test_unknown_curves_are_rejected():
+    with pytest.raises(ValueError):
+        attenuation_curve("hyperbolic")
+    with pytest.raises(ValueError):
+        VanishingPointProjection(attenuation="hyperbolic")
+
+def test_camera_attenuation_changes_the_projection():
+    camera = Camera(0, 0, 0, 0, 0)
+    version = camera.version
+    camera.attenuation = "flat"
+
+    assert camera.version != version
+    assert camera.attenuation is ATTENUATION_CURVES["flat"]
+    vertices = points(10)
+    np.testing.assert_allclose(camera.projection.project(vertices), vertices[:, :2])
+
+def test_camera_attenuation_needs_a_vanishing_point_projection():
+    camera = Camera(0, 0, 0, 0, 0, PerspectiveProjection())
+
+    assert camera.attenuation is None
+    with pytest.raises(ValueError):
+        camera.attenuation = "flat"
+
+def test_faces_past_the_curve_pole_are_culled():
+    projection = VanishingPointProjection(attenuation="perspective")
+    culler = Culler(backface=False, projection=projection)
+    cube = Cube(Point3D(WIDTH/2, HEIGHT/2, -PERSPECTIVE_DISTANCE - 50), 100).mesh
+    faces, _ = culler.cull(cube, projection.project(cube.vertices))
+
+    # Only the back face lies entirely in front of the eye.
+    assert np.all(cube.vertices[cube.face(faces[0])][:, 2] > -PERSPECTIVE_DISTANCE)
+    assert len(faces) == 1
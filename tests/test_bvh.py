@@ -0,0 +1,138 @@
+import numpy as np
+import pygame as pg
+import pytest
+
+from constants import VIEWPORT_RESOLUTION
+from utils.BVH import BVH
+from utils.Camera import Camera
+from utils.LOD import LODShape
+from utils.Mesh import Mesh
+from utils.Point import Point3D
+from utils.Polygon import Cube, Prism, Sphere, CompositeShape
+from utils.Projection import project
+from utils.Render import Render
+from utils.Transform import Transform
+
+def scene():
+    cubes = [Cube(Point3D(x, y, 0), 80) for x in range(-1000, 3200, 400) for y in range(-600, 1700, 400)]
+    return CompositeShape(cubes + [Prism(Point3D(700, 300, 100), 600, 400, 300)])
+
+def visible(mesh):
+    # Faces with a projected corner inside the viewport, every one of them must come out of a query.
+    screen = project(mesh.vertices)
+    inside = ((screen >= 0) & (screen <= VIEWPORT_RESOLUTION)).all(axis=1)
+    return np.flatnonzero(np.maximum.reduceat(inside[mesh.indices], mesh.offsets[:-1]))
+
+def check_tree(bvh, meshes):
+    """
+    The invariants of a built tree: every face in exactly one leaf, boxes around their faces, children inside their
+    parent's range, and component subtrees where component_nodes says.
+    """
+    lo, hi = zip(*(mesh.face_bounds() for mesh in meshes))
+    lo, hi = np.concatenate(lo), np.concatenate(hi)
+
+    assert list(bvh.face_starts) == list(np.cumsum([0] + [mesh.face_count for mesh in meshes]))
+    assert sorted(bvh.order.tolist()) == list(range(len(lo)))
+    for node in range(len(bvh.lo)):
+        faces = bvh.order[bvh.start[node]:bvh.end[node]]
+        assert (bvh.lo[node] <= lo[faces]).all() and (hi[faces] <= bvh.hi[node]).all()
+        if bvh.left[node] >= 0:
+            children = [bvh.left[node], bvh.right[node]]
+            assert (bvh.parent[children] == node).all()
+            assert bvh.start[children[0]] == bvh.start[node] and bvh.end[children[1]] == bvh.end[node]
+
+    for component, nodes in enumerate(bvh.component_nodes):
+        first, last = nodes
+        faces = bvh.order[bvh.start[first]:bvh.end[first]]
+        assert last - first == ((bvh.start[first:last] >= bvh.start[first]) & (bvh.end[first:last] <= bvh.end[first])).sum()
+        assert (faces >= bvh.face_starts[component]).all() and (faces < bvh.face_starts[component + 1]).all()
+
+def test_every_face_is_in_exactly_one_leaf():
+    shape = scene()
+    bvh = shape.build_bvh(leaf_size=4)
+    leaves = bvh.left < 0
+
+    assert sorted(bvh.order.tolist()) == list(range(sum(mesh.face_count for mesh in shape.meshes)))
+    assert (bvh.end[leaves] - bvh.start[leaves]).max() <= 4
+
+def test_boxes_contain_their_faces():
+    shape = scene()
+    bvh = shape.build_bvh()
+    lo, hi = zip(*(mesh.face_bounds() for mesh in shape.meshes))
+    lo, hi = np.concatenate(lo), np.concatenate(hi)
+
+    for node in range(len(bvh.lo)):
+        faces = bvh.order[bvh.start[node]:bvh.end[node]]
+        assert (bvh.lo[node] <= lo[faces]).all() and (hi[faces] <= bvh.hi[node]).all()
+
+def test_query_keeps_every_visible_face_and_drops_offscreen_ones():
+    shape = scene()
+    candidates = shape.build_bvh().query()
+
+    for mesh, faces in zip(shape.meshes, candidates):
+        assert set(visible(mesh).tolist()) <= set(faces.tolist())
+    assert sum(map(len, candidates)) < sum(mesh.face_count for mesh in shape.meshes)
+
+def test_moved_components_are_refitted():
+    shape = scene()
+    bvh = shape.build_bvh()
+    component = shape.components[0]
+
+    assert bvh.update() == 0
+    component.transform(Transform.translation((1500, 800, 0)))
+    assert bvh.update() == 1
+
+    faces = bvh.query()[0]
+    assert set(visible(component.mesh).tolist()) <= set(faces.tolist())
+    assert len(faces)
+
+def test_query_matches_a_fresh_build_after_refitting():
+    shape = scene()
+    bvh = shape.build_bvh()
+    for component in shape.components[::3]:
+        component.transform(Transform.translation((300, 200, 50)))
+    bvh.update()
+
+    fresh = BVH(shape.meshes)
+    for mesh, refitted, rebuilt in zip(shape.meshes, bvh.query(), fresh.query()):
+        assert set(visible(mesh).tolist()) <= set(refitted.tolist()) & set(rebuilt.tolist())
+
+@pytest.mark.parametrize("detail", [(8, 4), (48, 24)])
+def test_replaced_components_splice_a_valid_subtree(detail):
+    shape = scene()
+    bvh = shape.build_bvh(leaf_size=4)
+    replaced = len(shape.components) // 2
+    shape.components[replaced] = Sphere(Point3D(900, 300, 100), 150, *detail)
+
+    assert bvh.update(shape.meshes) == 0
+    assert bvh.meshes[replaced] is shape.components[replaced].mesh
+    check_tree(bvh, shape.meshes)
+
+    fresh = BVH(shape.meshes)
+    for mesh, spliced, rebuilt in zip(shape.meshes, bvh.query(), fresh.query()):
+        assert set(visible(mesh).tolist()) <= set(spliced.tolist()) & set(rebuilt.tolist())
+
+def test_replacing_with_an_empty_mesh_rebuilds():
+    shape = scene()
+    bvh = shape.build_bvh()
+    empty = Mesh(np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64))
+
+    bvh.replace(0, empty)
+    assert bvh.component_nodes[0] is None
+    assert bvh.face_starts[1] == 0 and sorted(bvh.order.tolist()) == list(range(bvh.face_starts[-1]))
+
+    bvh.replace(0, shape.meshes[0])
+    check_tree(bvh, shape.meshes)
+
+def test_render_draws_the_level_lod_shapes_select():
+    sphere = Sphere(Point3D(400, 300, 100), 100, 32, 16).mesh
+    lod = LODShape([sphere, Sphere(Point3D(400, 300, 100), 100, 8, 4).mesh], screen_sizes=[1e9, 0])
+    shape = CompositeShape([Cube(Point3D(100, 100, 0), 50), lod])
+    bvh = shape.build_bvh()
+    render = Render(Camera(0, 0, 0, 0, 0), pg.Surface((800, 600)))
+
+    render.draw_polygon(shape)
+
+    assert lod.level == 1
+    assert bvh.meshes[1] is lod.levels[1]
+    check_tree(bvh, shape.meshes)
@@ -0,0 +1,117 @@
+import numpy as np
+import pygame as pg
+import pytest
+
+from constants import VIEWPORT_RESOLUTION
+from utils.Camera import Camera
+from utils.Picking import Picker
+from utils.Point import Point3D
+from utils.Polygon import Cube, Sphere, CompositeShape
+from utils.Projection import Projection, MatrixProjection, PerspectiveProjection, OrthographicProjection, project
+from utils.Render import Render
+
+WIDTH, HEIGHT = VIEWPORT_RESOLUTION
+CENTER = np.array([WIDTH/2, HEIGHT/2])
+
+PROJECTIONS = [None, PerspectiveProjection(), OrthographicProjection(0.8)]
+
+def vertices(count=200, seed=0):
+    return np.random.default_rng(seed).uniform((0, 0, 0), (WIDTH, HEIGHT, 3000), (count, 3))
+
+def scene():
+    cubes = [Cube(Point3D(200 + i * 300, 150 + j * 250, 100 * i), 150) for i in range(6) for j in range(3)]
+    return CompositeShape([Sphere(Point3D(WIDTH/2, HEIGHT/2, 600), 400, 32, 16)] + cubes)
+
+def render(camera):
+    pg.init()
+    surface = pg.Surface(VIEWPORT_RESOLUTION)
+    renderer = Render(camera, surface)
+    surface.fill((255, 255, 255))
+    renderer.begin_frame()
+    renderer.draw_polygon(scene())
+    renderer.end_frame()
+    renderer.close()
+
+    return pg.surfarray.array3d(surface)
+
+def test_projection_is_abstract():
+    with pytest.raises(TypeError):
+        Projection()
+
+def test_camera_at_rest_is_the_original_view():
+    camera = Camera(0, 0, 0, 0, 0)
+    points = vertices()
+
+    assert camera.at_rest
+    assert camera.to_view(points) is points
+    np.testing.assert_allclose(camera.project(points), project(points))
+
+def test_every_change_bumps_the_version():
+    camera = Camera(0, 0, 0, 0, 0, PerspectiveProjection())
+    matrix = camera.matrix
+    versions = [camera.version]
+
+    camera.x = 10
+    versions.append(camera.version)
+    camera.move(0, 5, 0)
+    versions.append(camera.version)
+    camera.turn(0.1, 0)
+    versions.append(camera.version)
+    camera.projection = OrthographicProjection()
+    versions.append(camera.version)
+
+    assert len(set(versions)) == len(versions)
+    assert not camera.at_rest
+    assert not np.allclose(camera.matrix, matrix)
+
+@pytest.mark.parametrize("projection", PROJECTIONS)
+def test_unproject_inverts_project(projection):
+    camera = Camera(40, -30, 200, 0.3, -0.2, projection)
+    points = vertices()
+    depths = camera.to_view(points)[:, 2]
+
+    np.testing.assert_allclose(camera.unproject(camera.project(points), depths), points, atol=1e-6)
+
+@pytest.mark.parametrize("projection", PROJECTIONS)
+def test_matrix_cameras_project_like_the_view_then_the_projection(projection):
+    camera = Camera(40, -30, 200, 0.3, -0.2, projection)
+    points = vertices()
+
+    np.testing.assert_allclose(camera.project(points), camera.projection.project(camera.view.apply(points)), atol=1e-6)
+
+def test_eye_is_read_off_a_perspective_matrix():
+    projection = MatrixProjection(PerspectiveProjection(800).matrix)
+    points = vertices()
+
+    np.testing.assert_allclose(projection.eye, [*CENTER, -800])
+    np.testing.assert_allclose(projection.view_directions(points), points - (*CENTER, -800))
+    np.testing.assert_allclose(projection.distances(points), np.linalg.norm(points - (*CENTER, -800), axis=1))
+
+def test_eye_of_a_parallel_matrix_is_at_infinity_looking_along_z():
+    projection = MatrixProjection(OrthographicProjection(0.5).matrix)
+    points = vertices()
+
+    assert projection.eye is None
+    np.testing.assert_allclose(projection.direction, [0, 0, 1], atol=1e-12)
+    np.testing.assert_allclose(projection.view_directions(points), np.tile([0, 0, 1], (len(points), 1)), atol=1e-12)
+    np.testing.assert_allclose(projection.distances(points), points[:, 2], atol=1e-9)
+
+def test_eye_follows_the_camera_into_world_space():
+    camera = Camera(40, -30, 200, 0.3, -0.2, PerspectiveProjection())
+    projection = MatrixProjection(camera.matrix)
+
+    np.testing.assert_allclose(projection.eye, camera.view.inverse().apply(np.array([[*CENTER, -1000]]))[0], atol=1e-6)
+
+@pytest.mark.parametrize("projection", [PerspectiveProjection(), OrthographicProjection(0.8)])
+def test_plain_matrix_projections_draw_and_pick_like_their_subclass(projection):
+    named = Camera(30, 20, -100, 0.2, 0.1, projection)
+    plain = Camera(30, 20, -100, 0.2, 0.1, MatrixProjection(projection.matrix))
+
+    np.testing.assert_array_equal(render(plain), render(named))
+
+    points = np.random.default_rng(3).random((50, 2)) * VIEWPORT_RESOLUTION
+    for a, b in zip(Picker(scene()).pick_many(named, points), Picker(scene()).pick_many(plain, points)):
+        assert (a is None) == (b is None)
+        if a is not None:
+            assert a.face == b.face
+            np.testing.assert_allclose(a.point, b.point)
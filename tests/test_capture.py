@@ -0,0 +1,105 @@
+import threading
+
+import numpy as np
+import pygame as pg
+import pytest
+
+from utils import Capture
+from utils.Capture import FrameCapture
+
+WIDTH, HEIGHT = 24, 16
+
+def frame(seed, depth=32):
+    surface = pg.Surface((WIDTH, HEIGHT), depth=depth)
+    pixels = np.random.default_rng(seed).integers(0, 256, (WIDTH, HEIGHT, 3), dtype=np.uint8)
+    pg.surfarray.blit_array(surface, pixels)
+
+    return surface, pixels
+
+@pytest.mark.parametrize("depth", [32, 24])
+def test_raw_round_trip(tmp_path, depth):
+    path = str(tmp_path / "frames.rgb")
+    capture = FrameCapture(path, (WIDTH, HEIGHT), format="raw")
+    frames = [frame(seed, depth) for seed in range(5)]
+    for surface, _ in frames:
+        assert capture.capture(surface)
+    capture.close()
+
+    data = np.fromfile(path, dtype=np.uint8).reshape(len(frames), HEIGHT, WIDTH, 3)
+    for written, (_, pixels) in zip(data, frames):
+        np.testing.assert_array_equal(written, pixels.transpose(1, 0, 2))
+    assert capture.written == 5
+
+def test_png_round_trip(tmp_path):
+    capture = FrameCapture(str(tmp_path), (WIDTH, HEIGHT), format="png")
+    frames = [frame(seed) for seed in range(3)]
+    for surface, _ in frames:
+        capture.capture(surface)
+    capture.close()
+
+    for index, (_, pixels) in enumerate(frames):
+        loaded = pg.image.load(str(tmp_path / f"frame_{index:06d}.png"))
+        np.testing.assert_array_equal(pg.surfarray.array3d(loaded), pixels)
+
+def test_drop_policy_skips_frames_while_buffers_are_busy(tmp_path, monkeypatch):
+    writing, release = threading.Event(), threading.Event()
+    write_png = Capture.write_png
+
+    def slow_write_png(*args):
+        writing.set()
+        release.wait()
+        write_png(*args)
+
+    monkeypatch.setattr(Capture, "write_png", slow_write_png)
+    capture = FrameCapture(str(tmp_path), (WIDTH, HEIGHT), policy="drop", buffers=2, workers=1)
+    surface, _ = frame(0)
+
+    assert capture.capture(surface)
+    writing.wait()
+    assert capture.capture(surface) and capture.capture(surface)
+    assert not capture.capture(surface)
+    assert capture.dropped == 1
+
+    release.set()
+    capture.close()
+    assert capture.captured == capture.written == 3
+
+def test_writer_errors_are_raised_by_close(tmp_path, monkeypatch):
+    def failing_write_png(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(Capture, "write_png", failing_write_png)
+    capture = FrameCapture(str(tmp_path), (WIDTH, HEIGHT))
+    capture.capture(frame(0)[0])
+
+    with pytest.raises(OSError, match="disk full"):
+        capture.close()
+
+def test_failed_frames_are_not_counted_and_the_first_error_is_raised(tmp_path, monkeypatch):
+    write_png = Capture.write_png
+    queued, calls = threading.Event(), []
+
+    # capture raises pending errors too, nothing is written until every frame is queued.
+    def flaky_write_png(*args):
+        queued.wait()
+        calls.append(None)
+        if len(calls) % 2 == 0:
+            raise OSError(f"write {len(calls)} failed")
+        write_png(*args)
+
+    monkeypatch.setattr(Capture, "write_png", flaky_write_png)
+    capture = FrameCapture(str(tmp_path), (WIDTH, HEIGHT), workers=1)
+    for seed in range(4):
+        capture.capture(frame(seed)[0])
+    queued.set()
+
+    with pytest.raises(OSError, match="write 2 failed"):
+        capture.close()
+    assert capture.written == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["frame_000000.png", "frame_000002.png"]
+
+def test_unknown_options_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        FrameCapture(str(tmp_path), (WIDTH, HEIGHT), format="gif")
+    with pytest.raises(ValueError):
+        FrameCapture(str(tmp_path), (WIDTH, HEIGHT), policy="skip")
@@ -0,0 +1,54 @@
+import numpy as np
+
+from constants import VIEWPORT_RESOLUTION
+from utils.Culling import Culler, clip_polygon
+from utils.Point import Point3D
+from utils.Polygon import Cube
+from utils.Projection import project
+
+WIDTH, HEIGHT = VIEWPORT_RESOLUTION
+
+def cull(culler, mesh):
+    return culler.cull(mesh, project(mesh.vertices))
+
+def test_only_the_front_face_of_a_centered_cube_is_drawn():
+    mesh = Cube(Point3D(WIDTH/2 - 50, HEIGHT/2 - 50, 100), 100).mesh
+    culler = Culler()
+    faces, partial = cull(culler, mesh)
+
+    # The face at the smallest depth, facing the viewer.
+    assert faces.tolist() == [2]
+    assert np.all(mesh.face_vertices(2)[:, 2] == 100)
+    assert not partial.any()
+    assert culler.stats.backfacing == 5
+
+def test_back_faces_are_kept_when_backface_culling_is_off():
+    mesh = Cube(Point3D(WIDTH/2 - 50, HEIGHT/2 - 50, 100), 100).mesh
+    faces, _ = cull(Culler(backface=False), mesh)
+
+    assert faces.tolist() == list(range(6))
+
+def test_faces_outside_the_view_volume_are_dropped():
+    culler = Culler(backface=False, far=5000)
+
+    assert len(cull(culler, Cube(Point3D(-5000, -5000, 0), 100).mesh)[0]) == 0
+    assert len(cull(culler, Cube(Point3D(WIDTH/2, HEIGHT/2, 6000), 100).mesh)[0]) == 0
+    assert culler.stats.outside == 12
+
+def test_faces_across_the_viewport_edge_need_clipping():
+    faces, partial = cull(Culler(backface=False), Cube(Point3D(-50, HEIGHT/2, 0), 100).mesh)
+
+    assert len(faces) == 6
+    assert partial.any()
+
+def test_cull_restricted_to_candidate_faces():
+    mesh = Cube(Point3D(WIDTH/2 - 50, HEIGHT/2 - 50, 100), 100).mesh
+    faces, _ = Culler().cull(mesh, project(mesh.vertices), np.array([0, 1, 2]))
+
+    assert faces.tolist() == [2]
+
+def test_clip_polygon_to_the_viewport():
+    clipped = clip_polygon([[-10, -10], [10, -10], [10, 10], [-10, 10]], 100, 100)
+
+    assert sorted(map(tuple, clipped)) == [(0, 0), (0, 10), (10, 0), (10, 10)]
+    assert clip_polygon([[-10, -10], [-5, -10], [-5, -5]], 100, 100) == []
@@ -0,0 +1,84 @@
+import numpy as np
+import pygame as pg
+
+from utils.DirtyRects import DirtyRects, merge_rects
+
+SIZE = (200, 100)
+
+def started(**options):
+    """
+    A tracker past its first, always full, frame.
+    """
+    dirty = DirtyRects(SIZE, **options)
+    dirty.begin_frame()
+    assert dirty.rects() is None
+    return dirty
+
+def test_overlapping_rects_merge():
+    merged = merge_rects([pg.Rect(0, 0, 10, 10), pg.Rect(5, 5, 10, 10), pg.Rect(50, 50, 5, 5)])
+
+    assert sorted(map(tuple, merged)) == [(0, 0, 15, 15), (50, 50, 5, 5)]
+
+def test_unions_absorb_rects_checked_earlier():
+    # The last rect only overlaps the first, their union then reaches the second.
+    rects = [pg.Rect(0, 0, 30, 5), pg.Rect(0, 20, 5, 5), pg.Rect(25, 0, 5, 25)]
+
+    assert list(map(tuple, merge_rects(rects))) == [(0, 0, 30, 25)]
+
+def test_adjacent_rects_merge_and_separate_ones_do_not():
+    assert list(map(tuple, merge_rects([pg.Rect(0, 0, 10, 10), pg.Rect(10, 0, 10, 10)]))) == [(0, 0, 20, 10)]
+    assert list(map(tuple, merge_rects([pg.Rect(0, 0, 10, 10), pg.Rect(0, 10, 10, 5)]))) == [(0, 0, 10, 15)]
+    assert len(merge_rects([pg.Rect(0, 0, 10, 10), pg.Rect(11, 0, 10, 10)])) == 2
+
+def test_empty_rects_are_dropped():
+    assert merge_rects([pg.Rect(0, 0, 0, 10), pg.Rect(3, 3, 4, 0)]) == []
+
+def test_regions_are_grown_by_the_margin_and_clipped():
+    dirty = started(margin=2)
+    dirty.add(10.5, 20.2, 30.7, 40)
+    dirty.add(-50, -50, 1, 1)
+    dirty.add(300, 10, 400, 20)
+
+    assert [tuple(rect) for rect in dirty.current] == [(8, 18, 26, 25), (0, 0, 4, 4)]
+
+def test_add_bounds_skips_groups_with_nothing_drawn():
+    dirty = started(margin=0)
+    lows = np.array([[10, 10], [np.inf, np.inf], [50, 50]])
+    highs = np.array([[20, 20], [-np.inf, -np.inf], [60, 60]])
+    dirty.add_bounds(lows, highs)
+
+    assert len(dirty.current) == 2
+
+def test_previous_frame_rects_are_cleared_and_presented():
+    dirty = started(margin=0)
+    dirty.add(10, 10, 20, 20)
+    assert dirty.rects() == [pg.Rect(10, 10, 11, 11)]
+
+    assert dirty.begin_frame() == [pg.Rect(10, 10, 11, 11)]
+    dirty.add(100, 50, 110, 60)
+
+    assert sorted(map(tuple, dirty.rects())) == [(10, 10, 11, 11), (100, 50, 11, 11)]
+    assert dirty.begin_frame() == [pg.Rect(100, 50, 11, 11)]
+    assert dirty.rects() == [pg.Rect(100, 50, 11, 11)]
+
+def test_large_dirty_areas_fall_back_to_full_updates():
+    dirty = started(margin=0, full_ratio=0.5)
+    width, height = SIZE
+
+    # Half the screen exactly is still updated by rects, one more pixel (with last frame's half) is not.
+    dirty.add(0, 0, width / 2 - 1, height - 1)
+    assert dirty.rects() == [pg.Rect(0, 0, width // 2, height)]
+
+    dirty.begin_frame()
+    dirty.add(150, 0, 150, 0)
+    assert dirty.rects() is None
+
+def test_invalidate_asks_for_one_full_frame():
+    dirty = started(margin=0)
+    dirty.add(10, 10, 20, 20)
+    dirty.invalidate()
+
+    assert dirty.full
+    assert dirty.begin_frame() is None
+    assert dirty.rects() is None
+    assert not dirty.full
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from utils.Generators import heightfield, grid, uv_sphere, torus
+
+def outwards(mesh, inside):
+    """
+    How far each face normal points away from the matching point of inside, positive when outwards.
+    """
+    return np.einsum("ij,ij->i", mesh.normals(), mesh.face_centers() - inside)
+
+def test_heightfield_faces_point_up():
+    heights = np.random.default_rng(0).uniform(0, 5, (5, 7))
+    mesh = heightfield(heights, (10, 20), (100, 50, 0))
+
+    assert mesh.face_count == 4 * 6 and mesh.vertex_count == 5 * 7
+    assert not mesh.is_closed() and mesh.is_manifold()
+    # Up is towards -y on screen.
+    assert np.all(mesh.normals()[:, 1] < 0)
+    np.testing.assert_allclose(mesh.vertices[7 * 2 + 3], (100 + 3 * 10, 50 - heights[2, 3], 2 * 20))
+
+def test_heightfield_colors_are_per_cell():
+    colors = np.arange(6 * 3).reshape(6, 3)
+    mesh = heightfield(np.zeros((3, 4)), color=colors)
+
+    np.testing.assert_array_equal(mesh.colors, colors)
+    assert grid(3, 2).face_count == 6
+
+@pytest.mark.parametrize("segments, rings", [(3, 2), (8, 5), (24, 12)])
+def test_uv_sphere_is_closed_and_faces_outwards(segments, rings):
+    mesh = uv_sphere((10, 20, 30), 50, segments, rings)
+
+    assert mesh.face_count == segments * rings
+    assert mesh.face_sizes.tolist() == [3] * segments + [4] * (segments * (rings - 2)) + [3] * segments
+    assert mesh.is_closed() and mesh.is_manifold()
+    assert np.all(outwards(mesh, np.array([10, 20, 30])) > 0)
+    np.testing.assert_allclose(np.linalg.norm(mesh.vertices - (10, 20, 30), axis=1), 50)
+
+@pytest.mark.parametrize("segments, sides", [(8, 6), (32, 16)])
+def test_torus_is_closed_and_faces_outwards(segments, sides):
+    mesh = torus((0, 0, 0), 100, 20, segments, sides)
+
+    assert mesh.face_count == segments * sides
+    assert mesh.is_closed() and mesh.is_manifold()
+    # The tube's core circle, nearest each face.
+    centers = mesh.face_centers()
+    core = centers * [1, 0, 1]
+    core *= 100 / np.linalg.norm(core, axis=1, keepdims=True)
+    assert np.all(outwards(mesh, core) > 0)
+
+def test_degenerate_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        uv_sphere((0, 0, 0), 1, segments=2)
+    with pytest.raises(ValueError):
+        torus((0, 0, 0), 10, 1, sides=2)
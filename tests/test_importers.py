@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from exceptions.GraphicsExceptions import MeshFormatError
+from utils.Importers import load_mesh, load_shape, read_obj, read_ply, read_stl
+from utils.Mesh import DEFAULT_FACE_COLOR
+from utils.Point import Point3D
+from utils.Polygon import Cube, CompositeShape
+
+def cube_mesh():
+    return Cube(Point3D(0, 0, 0), 2).mesh
+
+def faces_of(mesh):
+    # Faces as tuples of corner positions, comparable whatever the vertex numbering.
+    return sorted(tuple(map(tuple, mesh.face_vertices(face).tolist())) for face in range(mesh.face_count))
+
+def write_obj(path, mesh):
+    lines = [f"v {x} {y} {z}" for x, y, z in mesh.vertices.tolist()]
+    lines += ["f " + " ".join(f"{index + 1}/{index + 1}/1" for index in mesh.face(face).tolist()) for face in range(mesh.face_count)]
+    path.write_text("# cube\nvn 0 0 1\n" + "\n".join(lines) + "\n")
+
+@pytest.mark.parametrize("block_size", [1 << 22, 64])
+def test_obj_round_trip(tmp_path, block_size):
+    mesh = cube_mesh()
+    write_obj(tmp_path / "cube.obj", mesh)
+    loaded = read_obj(str(tmp_path / "cube.obj"), block_size)
+
+    np.testing.assert_array_equal(loaded.vertices, mesh.vertices)
+    np.testing.assert_array_equal(loaded.indices, mesh.indices)
+    np.testing.assert_array_equal(loaded.offsets, mesh.offsets)
+
+def test_obj_negative_indices_and_vertex_colors(tmp_path):
+    path = tmp_path / "triangle.obj"
+    path.write_text("v 0 0 0 1 0 0\nv 1 0 0 0 1 0\nv 0 1 0 0 0 1\nf -3 -2 -1\n")
+    mesh = read_obj(str(path))
+
+    assert mesh.indices.tolist() == [0, 1, 2]
+    assert mesh.colors.tolist() == [[85, 85, 85]]
+
+@pytest.mark.parametrize("block_size", [1 << 22, 16])
+def test_obj_vertex_colors_are_read_per_line(tmp_path, block_size):
+    # Plain vertices mixed with coloured ones in the same block, and a "v x y z w" one, get the default colour.
+    path = tmp_path / "mixed.obj"
+    path.write_text("v 0 0 0 1 0 0\nv 1 0 0\nv 0 1 0 0 0 1\nv 1 1 0 1\nf 1 2 3\nf 2 4 3\nf 1 3 4\n")
+    mesh = read_obj(str(path), block_size)
+
+    default = np.array(DEFAULT_FACE_COLOR)
+    vertex_colors = np.array([[255, 0, 0], default, [0, 0, 255], default], dtype=np.float64)
+    expected = np.round([vertex_colors[[0, 1, 2]].mean(axis=0), vertex_colors[[1, 3, 2]].mean(axis=0), vertex_colors[[0, 2, 3]].mean(axis=0)])
+    np.testing.assert_array_equal(mesh.colors, expected)
+    np.testing.assert_array_equal(mesh.vertices[3], [1, 1, 0])
+
+def test_obj_objects_become_components(tmp_path):
+    path = tmp_path / "two.obj"
+    mesh = cube_mesh()
+    write_obj(path, mesh)
+    # The second copy is shifted along x and indexes its own vertices relatively.
+    lines = [f"v {x + 10} {y} {z}" for x, y, z in mesh.vertices.tolist()]
+    lines += ["f " + " ".join(str(index - 8) for index in mesh.face(face).tolist()) for face in range(mesh.face_count)]
+    path.write_text("o first\n" + path.read_text() + "o second\n" + "\n".join(lines) + "\n")
+
+    shape = load_shape(str(path))
+    assert isinstance(shape, CompositeShape) and len(shape.components) == 2
+    np.testing.assert_array_equal(shape.meshes[1].vertices, mesh.vertices + (10, 0, 0))
+
+def ply_header(form, mesh):
+    return (f"ply\nformat {form} 1.0\nelement vertex {mesh.vertex_count}\nproperty float x\nproperty float y\nproperty float z\n"
+            f"element face {mesh.face_count}\nproperty list uchar int vertex_indices\n"
+            "property uchar red\nproperty uchar green\nproperty uchar blue\nend_header\n")
+
+def test_ply_ascii_and_binary_agree(tmp_path):
+    mesh = cube_mesh()
+
+    lines = [" ".join(map(str, vertex)) for vertex in mesh.vertices.tolist()]
+    lines += [" ".join(map(str, [4] + mesh.face(face).tolist() + mesh.colors[face].tolist())) for face in range(mesh.face_count)]
+    (tmp_path / "ascii.ply").write_text(ply_header("ascii", mesh) + "\n".join(lines) + "\n")
+
+    face = np.dtype([("count", "u1"), ("indices", "<i4", (4,)), ("color", "u1", (3,))])
+    faces = np.zeros(mesh.face_count, dtype=face)
+    faces["count"] = 4
+    faces["indices"] = mesh.indices.reshape(-1, 4)
+    faces["color"] = mesh.colors
+    (tmp_path / "binary.ply").write_bytes(ply_header("binary_little_endian", mesh).encode() + mesh.vertices.astype("<f4").tobytes() + faces.tobytes())
+
+    for name in ("ascii.ply", "binary.ply"):
+        loaded = read_ply(str(tmp_path / name))
+        np.testing.assert_array_equal(loaded.vertices, mesh.vertices)
+        np.testing.assert_array_equal(loaded.indices, mesh.indices)
+        np.testing.assert_array_equal(loaded.colors, mesh.colors)
+
+def stl_triangles(mesh):
+    triangles, _ = mesh.triangles()
+    return mesh.vertices[triangles]
+
+def test_stl_binary_and_ascii_are_welded(tmp_path):
+    mesh = cube_mesh()
+    corners = stl_triangles(mesh)
+
+    records = np.zeros(len(corners), dtype=[("normal", "<f4", (3,)), ("corners", "<f4", (3, 3)), ("attribute", "<u2")])
+    records["corners"] = corners
+    (tmp_path / "binary.stl").write_bytes(b"\0" * 80 + np.uint32(len(records)).tobytes() + records.tobytes())
+
+    facets = "".join("facet normal 0 0 0\nouter loop\n" + "".join(f"vertex {x} {y} {z}\n" for x, y, z in triangle) + "endloop\nendfacet\n"
+                     for triangle in corners.tolist())
+    (tmp_path / "ascii.stl").write_text("solid cube\n" + facets + "endsolid cube\n")
+
+    for name in ("binary.stl", "ascii.stl"):
+        loaded = load_mesh(str(tmp_path / name))
+        assert loaded.vertex_count == 8 and loaded.face_count == 12
+        assert loaded.is_closed()
+        assert faces_of(loaded) == faces_of(read_stl(str(tmp_path / name), weld=False))
+
+@pytest.mark.parametrize("text", ["v 0 0 zz\nv 1 0 0\nv 0 1 0\nf 1 2 3\n", "v 0 0 1-2\nv 1 0 0\nv 0 1 0\nf 1 2 3\n",
+                                  "v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3x\n",
+                                  "v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 4\n", "v 0 0\nf 1 1 1\n"])
+def test_malformed_obj_raises_mesh_format_error(tmp_path, text):
+    path = tmp_path / "bad.obj"
+    path.write_text(text)
+
+    with pytest.raises(MeshFormatError, match="bad.obj"):
+        read_obj(str(path))
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(MeshFormatError):
+        load_mesh(str(tmp_path / "mesh.fbx"))
@@ -0,0 +1,102 @@
+import numpy as np
+import pygame as pg
+
+from utils.Camera import Camera
+from utils.Instancing import InstancedShape
+from utils.Mesh import Mesh
+from utils.Point import Point3D, Plane
+from utils.Polygon import Cube
+from utils.Render import Render
+from utils.Transform import Transform
+
+def placement(index):
+    return Transform.translation((150 + 160 * index, 200 + 40 * index, 50 * index)) @ Transform.rotation(Point3D(50, 50, 50), 0.3 * index, Plane((0, 2)))
+
+def expected_batch(cube, transforms, colors):
+    """
+    The instances built the slow way: one transformed copy of the cube each, merged.
+    """
+    copies = []
+    for transform, color in zip(transforms, colors):
+        copy = cube.mesh.transformed(transform)
+        copy.colors = np.broadcast_to(color, copy.colors.shape).astype(np.uint8) if color is not None else cube.mesh.colors.copy()
+        copies.append(copy)
+
+    return Mesh.concatenate(copies)
+
+def assert_same_mesh(mesh, expected):
+    np.testing.assert_allclose(mesh.vertices, expected.vertices, atol=1e-9)
+    np.testing.assert_array_equal(mesh.indices, expected.indices)
+    np.testing.assert_array_equal(mesh.offsets, expected.offsets)
+    np.testing.assert_array_equal(mesh.colors, expected.colors)
+
+def test_batch_matches_individually_transformed_cubes():
+    cube = Cube(Point3D(0, 0, 0), 100)
+    shape = InstancedShape(cube.mesh)
+    transforms = [placement(index) for index in range(4)]
+    colors = [None, (255, 0, 0), None, (0, 40, 80)]
+
+    assert [shape.add(transform, color) for transform, color in zip(transforms, colors)] == [0, 1, 2, 3]
+    assert_same_mesh(shape.batch(), expected_batch(cube, transforms, colors))
+
+def test_set_transform_updates_the_reused_batch():
+    cube = Cube(Point3D(0, 0, 0), 100)
+    shape = InstancedShape(cube.mesh)
+    transforms = [placement(index) for index in range(3)]
+    for transform in transforms:
+        shape.add(transform)
+
+    batch = shape.batch()
+    version = batch.version
+    transforms[1] = Transform.translation((0, 0, 500))
+    shape.set_transform(1, transforms[1])
+    shape.set_color(2, (9, 9, 9))
+
+    assert shape.batch() is batch and batch.version != version
+    assert_same_mesh(batch, expected_batch(cube, transforms, [None, None, (9, 9, 9)]))
+
+def test_removed_instances_take_their_colour_with_them():
+    cube = Cube(Point3D(0, 0, 0), 100)
+    shape = InstancedShape(cube.mesh)
+    transforms = [placement(index) for index in range(4)]
+    colors = [(255, 0, 0), None, (0, 255, 0), None]
+    for transform, color in zip(transforms, colors):
+        shape.add(transform, color)
+    shape.batch()
+
+    shape.remove(0)
+    shape.remove(1)
+
+    assert len(shape) == 2
+    assert_same_mesh(shape.batch(), expected_batch(cube, [transforms[1], transforms[3]], [None, None]))
+
+def test_set_transforms_resizes_the_instance_list():
+    cube = Cube(Point3D(0, 0, 0), 100)
+    shape = InstancedShape(cube.mesh)
+    shape.add(placement(0), (1, 2, 3))
+
+    transforms = [placement(index) for index in range(3)]
+    shape.set_transforms(np.array([transform.matrix for transform in transforms]))
+    assert_same_mesh(shape.batch(), expected_batch(cube, transforms, [(1, 2, 3), None, None]))
+
+    shape.set_transforms(transforms[0].matrix)
+    assert_same_mesh(shape.batch(), expected_batch(cube, transforms[:1], [(1, 2, 3)]))
+
+def test_instances_draw_like_separate_cubes():
+    cube = Cube(Point3D(0, 0, 0), 100)
+    shape = InstancedShape(cube.mesh)
+    transforms = [placement(index) for index in range(4)]
+    for transform in transforms:
+        shape.add(transform)
+
+    images = []
+    for draw in (lambda render: render.draw_polygon(shape), lambda render: render.draw_meshes([cube.mesh.transformed(t) for t in transforms])):
+        surface = pg.Surface((1000, 600))
+        render = Render(Camera(0, 0, 0, 0, 0), surface)
+        render.begin_frame()
+        draw(render)
+        render.end_frame()
+        images.append(pg.surfarray.array3d(surface))
+
+    assert images[0].any()
+    np.testing.assert_array_equal(images[0], images[1])
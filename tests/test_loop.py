@@ -0,0 +1,145 @@
+import pygame as pg
+import pytest
+
+from utils import Loop
+from utils.Loop import GameLoop, QualityController, QUALITY_LEVELS
+
+TIMESTEP = 0.25 # Exact in binary, lag sums never drift.
+
+class FakeClock:
+    """
+    Stands in for the time module, time only moves when a test says so.
+    """
+    def __init__(self):
+        self.now = 100.0
+
+    def perf_counter(self):
+        return self.now
+
+class FakeRender:
+    def __init__(self):
+        self.antialias = True
+        self.resolution_scale = 1.0
+        self.frames = 0
+
+    def begin_frame(self):
+        pass
+
+    def end_frame(self):
+        self.frames += 1
+
+@pytest.fixture
+def clock(monkeypatch):
+    pg.display.init()
+    clock = FakeClock()
+    monkeypatch.setattr(Loop, "time", clock)
+    yield clock
+    pg.display.quit()
+
+def game_loop(update=lambda dt: True, draw=lambda render: None, **options):
+    # target_fps 0 keeps pg.time.Clock from sleeping.
+    return GameLoop(FakeRender(), update, draw, timestep=TIMESTEP, target_fps=0, present=False, **options)
+
+def test_updates_follow_elapsed_time(clock):
+    counts = []
+    loop = game_loop(lambda dt: counts.append(dt))
+    loop.step()
+    assert loop.updates == 0 and loop.frames == 1
+
+    for elapsed, updates, alpha in [(0.625, 2, 0.5), (0.75, 3, 0.5), (0.125, 1, 0.0), (0.1875, 0, 0.75)]:
+        before = loop.updates
+        clock.now += elapsed
+        loop.step()
+        assert loop.updates - before == updates
+        assert loop.alpha == alpha
+
+    assert set(counts) == {TIMESTEP}
+
+def test_stalls_are_clamped_to_max_updates(clock):
+    loop = game_loop(max_updates=5)
+    loop.step()
+
+    clock.now += 30
+    loop.step()
+    assert loop.updates == 5 and loop.alpha == 0
+
+    # The backlog was dropped, the next frame is back to normal.
+    clock.now += TIMESTEP
+    loop.step()
+    assert loop.updates == 6
+
+def test_updates_slower_than_real_time_do_not_spiral(clock):
+    def slow_update(dt):
+        clock.now += 2 * dt
+
+    loop = game_loop(slow_update, max_updates=4)
+    loop.step()
+    clock.now += TIMESTEP
+
+    counts = []
+    for _ in range(6):
+        before = loop.updates
+        loop.step()
+        counts.append(loop.updates - before)
+
+    # Every frame takes twice as long as the last, until max_updates caps it.
+    assert counts == [1, 2, 4, 4, 4, 4]
+    assert loop.frames == 7
+
+def test_frames_are_only_drawn_after_changes(clock):
+    changes = iter([True, False, None])
+    loop = game_loop(lambda dt: next(changes))
+    loop.step()
+
+    drawn = []
+    for _ in range(3):
+        clock.now += TIMESTEP
+        drawn.append(loop.step())
+
+    assert drawn == [True, False, True]
+    assert loop.idle == 1
+
+def test_quality_steps_down_as_soon_as_the_budget_is_exceeded():
+    quality = QualityController(budget=0.016)
+
+    assert [quality.record(0.03) for _ in range(3)] == [False, False, True]
+    assert quality.level == 1 and quality.average is None
+
+def test_quality_steps_up_only_after_patience_calm_frames():
+    # Unsmoothed, so every sample is the average.
+    quality = QualityController(budget=0.016, patience=10, headroom=0.6, smoothing=1.0)
+    for _ in range(6):
+        quality.record(1.0)
+    assert quality.level == 2
+
+    # Under budget but above headroom: the level fits, it is kept.
+    assert not any(quality.record(0.012) for _ in range(50))
+
+    # One frame above headroom starts the count over.
+    assert not any(quality.record(0.005) for _ in range(9))
+    assert not quality.record(0.015)
+    assert [quality.record(0.005) for _ in range(10)] == [False] * 9 + [True]
+    assert quality.level == 1
+
+def test_quality_stays_within_its_levels():
+    quality = QualityController(budget=0.016)
+    for _ in range(100):
+        quality.record(1.0)
+    assert quality.level == len(QUALITY_LEVELS) - 1
+
+    quality = QualityController(budget=0.016, patience=1)
+    for _ in range(100):
+        quality.record(0.0)
+    assert quality.level == 0
+
+def test_the_loop_applies_quality_changes(clock):
+    def expensive_draw(render):
+        clock.now += 0.05
+
+    loop = game_loop(draw=expensive_draw, quality=QualityController(budget=0.016))
+    for _ in range(3):
+        clock.now += TIMESTEP
+        loop.step()
+
+    assert loop.quality.level == 1
+    assert (loop.render.antialias, loop.render.resolution_scale) == QUALITY_LEVELS[1]
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from exceptions.GraphicsExceptions import MeshError, PolygonFaceError
+from utils.Mesh import Mesh
+from utils.Point import Point3D, Plane
+from utils.Polygon import Face, Polygon3D, Cube
+from utils.Transform import Transform
+
+XY = Plane((0, 1))
+
+def square(z):
+    return [(0, 0, z), (1, 0, z), (1, 1, z), (0, 1, z)]
+
+def test_mixed_face_sizes_are_flattened():
+    mesh = Mesh(square(0) + [(0.5, 0.5, 1)], [[0, 1, 2, 3], [0, 1, 4]])
+
+    assert mesh.face_count == 2
+    assert mesh.face_sizes.tolist() == [4, 3]
+    assert mesh.offsets.tolist() == [0, 4, 7]
+    assert mesh.face(1).tolist() == [0, 1, 4]
+
+def test_invalid_faces_are_rejected():
+    with pytest.raises(MeshError):
+        Mesh(square(0), [[0, 1]])
+    with pytest.raises(MeshError):
+        Mesh(square(0), [[0, 1, 7]])
+
+def test_polygon3d_shares_corners_between_faces():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    rebuilt = Polygon3D([Face([Point3D(*corner) for corner in cube.mesh.face_vertices(index).tolist()]) for index in range(6)])
+
+    assert rebuilt.mesh.vertex_count == 8
+    assert rebuilt.mesh.is_closed() and rebuilt.mesh.is_manifold()
+
+def test_unclosed_polygon3d_is_rejected():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    faces = [Face([Point3D(*corner) for corner in cube.mesh.face_vertices(index).tolist()]) for index in range(5)]
+
+    with pytest.raises(PolygonFaceError):
+        Polygon3D(faces)
+    Polygon3D(faces, validate=False)
+
+def test_transform_is_applied_lazily():
+    mesh = Cube(Point3D(0, 0, 0), 10).mesh
+    before = mesh.vertices.copy()
+    version = mesh.version
+
+    mesh.transform(Transform.translation((1, 2, 3))).transform(Transform.scaling(2))
+    assert mesh.pending is not None
+    assert mesh.version != version
+
+    np.testing.assert_allclose(mesh.vertices, (before + (1, 2, 3)) * 2)
+    assert mesh.pending is None
+
+def test_partial_rotation_logs_changed_rows():
+    mesh = Cube(Point3D(0, 0, 0), 10).mesh
+    mesh.vertices
+    version = mesh.version
+
+    mesh.rotate(Point3D(5, 5, 5), 0.3, XY, np.array([3, 1, 3]))
+    assert mesh.changed_rows(version).tolist() == [1, 3]
+
+    mesh.rotate(Point3D(5, 5, 5), 0.3, XY)
+    assert mesh.changed_rows(version) is None
+
+def test_face_views_write_through():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    face = cube.faces[2]
+    corner = cube.mesh.face(2)[0]
+    version = cube.mesh.version
+
+    face.vertices[0].setx(-4)
+
+    assert cube.mesh.vertices[corner, 0] == -4
+    assert cube.mesh.version != version
+
+def test_triangles_fan_every_face():
+    mesh = Mesh(square(0) + [(0.5, 0.5, 1)], [[0, 1, 2, 3], [0, 1, 4]])
+    triangles, faces = mesh.triangles()
+
+    assert triangles.tolist() == [[0, 1, 2], [0, 2, 3], [0, 1, 4]]
+    assert faces.tolist() == [0, 0, 1]
+
+def test_concatenate_rebases_indices():
+    a = Mesh(square(0), [[0, 1, 2, 3]], (1, 2, 3))
+    b = Mesh(square(5) + [(0, 0, 9)], [[0, 1, 4], [1, 2, 3]], (4, 5, 6))
+    merged = Mesh.concatenate([a, b])
+
+    assert merged.vertex_count == 9
+    assert merged.face(1).tolist() == [4, 5, 8]
+    assert merged.colors.tolist() == [[1, 2, 3], [4, 5, 6], [4, 5, 6]]
+    np.testing.assert_array_equal(merged.face_vertices(2), b.face_vertices(1))
+
+def test_submesh_keeps_only_used_vertices():
+    mesh = Cube(Point3D(0, 0, 0), 10).mesh
+    part = mesh.submesh(np.array([2]))
+
+    assert part.vertex_count == 4
+    np.testing.assert_array_equal(part.face_vertices(0), mesh.face_vertices(2))
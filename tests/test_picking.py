@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from utils.Camera import Camera
+from utils.LOD import LODShape
+from utils.Picking import Picker
+from utils.Point import Point3D, Plane
+from utils.Polygon import Cube, Sphere, CompositeShape
+from utils.Projection import PerspectiveProjection, OrthographicProjection
+from utils.Transform import Transform
+
+CAMERAS = [
+    lambda: Camera(0, 0, 0, 0, 0),
+    lambda: Camera(0, 0, 0, 0, 0, PerspectiveProjection()),
+    lambda: Camera(50, 20, -100, 0.2, 0.1, OrthographicProjection(0.8)),
+]
+
+def scene():
+    cubes = [Cube(Point3D(100 + i * 150, 200 + j * 150, 0), 100) for i in range(6) for j in range(4)]
+    for cube in cubes:
+        cube.rotate(cube.center(), 0.4, Plane((0, 2)))
+
+    return CompositeShape([Sphere(Point3D(600, 500, 300), 300, 32, 16)] + cubes)
+
+def brute_force(picker, camera, point):
+    """
+    The nearest hit of point among every face of every component, without the BVH.
+    """
+    best = None
+    for component, mesh in enumerate(picker.meshes):
+        faces = np.arange(mesh.face_count)
+        _, _, faces, depths = picker._hits(camera, point[None], component, np.zeros(mesh.face_count, dtype=np.int64), faces)
+        if not len(depths):
+            continue
+
+        distances = camera.projection.distances(camera.projection.unproject(np.repeat(point[None], len(depths), axis=0), depths))
+        nearest = int(np.argmin(distances))
+        if best is None or distances[nearest] < best[0]:
+            best = (distances[nearest], component, faces[nearest])
+
+    return best
+
+@pytest.mark.parametrize("make_camera", CAMERAS)
+def test_matches_brute_force(make_camera):
+    camera = make_camera()
+    picker = Picker(scene())
+    points = np.random.default_rng(1).random((150, 2)) * [1200, 900]
+
+    hits = picker.pick_many(camera, points)
+    assert sum(hit is not None for hit in hits) > 20
+
+    for point, hit in zip(points, hits):
+        best = brute_force(picker, camera, point)
+        assert (best is None) == (hit is None)
+        if hit is not None:
+            assert hit.distance == pytest.approx(best[0])
+            assert hit.component is picker.components[best[1]]
+
+@pytest.mark.parametrize("make_camera", CAMERAS)
+def test_hits_lie_under_the_point_on_their_face(make_camera):
+    camera = make_camera()
+    # Depth is interpolated across the screen like the rasterizer does, which only stays on the face's plane
+    # for affine projections. Otherwise hits may sit slightly off it, still within the face.
+    tolerance = 1e-6 if isinstance(camera.projection, OrthographicProjection) else 1
+    picker = Picker(scene())
+    points = np.random.default_rng(2).random((40, 2)) * [1200, 900]
+
+    for point, hit in zip(points, picker.pick_many(camera, points)):
+        if hit is None:
+            continue
+
+        np.testing.assert_allclose(camera.project(hit.point[None])[0], point, atol=1e-3)
+        corners = hit.mesh.vertices[hit.mesh.face(hit.face)]
+        normal = np.cross(corners[1] - corners[0], corners[2] - corners[0])
+        assert abs(np.dot(hit.point - corners[0], normal / np.linalg.norm(normal))) < tolerance
+        assert np.all(hit.point >= corners.min(axis=0) - tolerance) and np.all(hit.point <= corners.max(axis=0) + tolerance)
+
+def test_nearest_component_wins():
+    near, far = Cube(Point3D(0, 0, 0), 100), Cube(Point3D(0, 0, 300), 100)
+    hit = Picker(CompositeShape([far, near])).pick(Camera(0, 0, 0, 0, 0), 50, 50)
+
+    assert hit.component is near
+    np.testing.assert_allclose(hit.point, [50, 50, 0], atol=1e-6)
+    np.testing.assert_allclose(hit.as_face().vertices[0].coords[2], 0)
+
+def test_misses_return_none():
+    picker = Picker(Cube(Point3D(0, 0, 0), 100))
+
+    assert picker.pick(Camera(0, 0, 0, 0, 0), 500, 500) is None
+    assert picker.pick_many(Camera(0, 0, 0, 0, 0), np.empty((0, 2))) == []
+
+def test_moved_components_are_found_where_they_are():
+    cube = Cube(Point3D(0, 0, 0), 100)
+    picker = Picker(CompositeShape([cube, Cube(Point3D(500, 500, 0), 100)]))
+    camera = Camera(0, 0, 0, 0, 0)
+    assert picker.pick(camera, 250, 50) is None
+
+    cube.transform(Transform.translation((200, 0, 0)))
+    assert picker.pick(camera, 250, 50).component is cube
+    assert picker.pick(camera, 50, 50) is None
+
+def test_camera_moves_are_followed():
+    picker = Picker(Cube(Point3D(0, 0, 0), 100))
+    camera = Camera(0, 0, 0, 0, 0)
+    assert picker.pick(camera, 50, 50) is not None
+
+    camera.x = 300
+    assert picker.pick(camera, 50, 50) is None
+
+def test_picks_follow_lod_level_changes():
+    camera = Camera(0, 0, 0, 0, 0)
+    lod = LODShape([Sphere(Point3D(600, 500, 300), 300, 32, 16).mesh, Sphere(Point3D(600, 500, 300), 300, 6, 3).mesh])
+    shape = CompositeShape([lod, Cube(Point3D(100, 200, 0), 100)])
+    shape.build_bvh()
+    picker = Picker(shape)
+    points = np.random.default_rng(3).random((60, 2)) * [1200, 900]
+    picker.pick_many(camera, points)
+
+    lod.level = 1
+    hits = picker.pick_many(camera, points)
+
+    assert picker.meshes[0] is lod.levels[1] and shape.bvh.meshes[0] is lod.levels[1]
+    for point, hit in zip(points, hits):
+        best = brute_force(picker, camera, point)
+        assert (best is None) == (hit is None)
+        if hit is not None:
+            assert hit.distance == pytest.approx(best[0])
+            assert hit.mesh is picker.meshes[best[1]]
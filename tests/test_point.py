@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from utils.Point import Point3D, Plane, PointArray
+from utils.Polygon import Cube
+from utils.Transform import Transform
+
+XZ = Plane((0, 2))
+
+def shared_corner(mesh):
+    """
+    Two faces sharing a vertex, and where that vertex sits in each of them.
+    """
+    first = mesh.face(0).tolist()
+    for other in range(1, mesh.face_count):
+        shared = set(first) & set(mesh.face(other).tolist())
+        if shared:
+            vertex = min(shared)
+            return vertex, (0, first.index(vertex)), (other, mesh.face(other).tolist().index(vertex))
+
+def test_rotating_a_face_point_moves_the_shared_corner():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    mesh = cube.mesh
+    vertex, (face, position), (neighbour, neighbour_position) = shared_corner(mesh)
+    about = Point3D(3, 4, 5)
+    expected = Point3D(*mesh.vertices[vertex].tolist()).rotate(about, 0.7, XZ)
+    mesh.vertices
+    version = mesh.version
+
+    cube.faces[face].vertices[position].rotate(about, 0.7, XZ)
+
+    np.testing.assert_allclose(cube.faces[neighbour].vertices[neighbour_position].coords, expected.coords)
+    np.testing.assert_allclose(mesh.vertices[vertex], expected.coords)
+    assert mesh.version != version
+    assert mesh.changed_rows(version).tolist() == [vertex]
+
+def test_rotating_a_face_point_array_writes_every_row_back():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    mesh = cube.mesh
+    rows = mesh.face(2)
+    before = mesh.vertices.copy()
+    version = mesh.version
+    about = Point3D(5, 5, 5)
+
+    cube.faces[2].vertices.rotate(about, 0.4, XZ)
+
+    for row in rows.tolist():
+        np.testing.assert_allclose(mesh.vertices[row], Point3D(*before[row].tolist()).rotate(about, 0.4, XZ).coords)
+    untouched = np.setdiff1d(np.arange(mesh.vertex_count), rows)
+    np.testing.assert_array_equal(mesh.vertices[untouched], before[untouched])
+    assert sorted(mesh.changed_rows(version).tolist()) == sorted(rows.tolist())
+
+def test_slices_view_the_same_rows():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    vertices = cube.faces[1].vertices
+    tail = vertices[1:]
+
+    tail[0].setx(-7)
+
+    assert vertices[1].x == -7 and cube.mesh.vertices[vertices.rows[1], 0] == -7
+
+def test_views_follow_pending_mesh_transforms():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    point = cube.faces[0].vertices[0]
+    before = point.coords
+
+    cube.mesh.transform(Transform.translation((1, 2, 3)))
+
+    assert point.coords == pytest.approx(tuple(np.add(before, (1, 2, 3))))
+
+def test_arithmetic_on_views_returns_owning_points():
+    cube = Cube(Point3D(0, 0, 0), 10)
+    point = cube.faces[0].vertices[0]
+    moved = point + Point3D(1, 1, 1)
+    moved.setx(100)
+
+    assert type(moved) is Point3D
+    assert point.x != 100
+
+def test_standalone_point_arrays_rotate_like_points():
+    points = np.random.default_rng(0).random((20, 3)) * 100
+    about = Point3D(10, 20, 30)
+    array = PointArray(points.copy()).rotate(about, 1.1, XZ)
+
+    for row, point in zip(array.array, points.tolist()):
+        np.testing.assert_allclose(row, Point3D(*point).rotate(about, 1.1, XZ).coords)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from constants import VIEWPORT_RESOLUTION
+from utils.Point import Point3D, PointArray
+from utils.Projection import project
+
+CENTER = (VIEWPORT_RESOLUTION[0]/2, VIEWPORT_RESOLUTION[1]/2)
+
+def to_2D(vertices):
+    return np.array([Point3D(*vertex).to_2D().coords for vertex in vertices.tolist()])
+
+def test_project_matches_to_2D():
+    vertices = np.random.default_rng(0).uniform((-500, -500, -2000), (2500, 1500, 8000), (500, 3))
+
+    np.testing.assert_allclose(project(vertices), to_2D(vertices), atol=1e-6)
+
+def test_project_matches_to_2D_on_the_vanishing_point_axes():
+    # Straight above, below and beside the vanishing point, where to_2D picks its sign differently.
+    vertices = np.array([
+        (CENTER[0], 100, 300), (CENTER[0], 900, 300),
+        (100, CENTER[1], 300), (2000, CENTER[1], 300),
+        (CENTER[0], CENTER[1], 300)
+    ], dtype=np.float64)
+
+    np.testing.assert_allclose(project(vertices), to_2D(vertices), atol=1e-6)
+
+def test_points_at_depth_zero_keep_their_position():
+    vertices = np.array([(10, 20, 0), (1500, 700, 0)], dtype=np.float64)
+
+    np.testing.assert_allclose(project(vertices), vertices[:, :2])
+
+def test_point_array_projects_like_its_points():
+    vertices = np.random.default_rng(1).uniform(0, 1000, (20, 3))
+
+    np.testing.assert_allclose(PointArray(vertices).to_2D().array, to_2D(vertices), atol=1e-6)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from utils import ProjectionCache as ProjectionCacheModule
+from utils.Point import Point3D, Plane
+from utils.Polygon import Cube
+from utils.Projection import project
+from utils.ProjectionCache import ProjectionCache
+
+def test_unchanged_meshes_are_reused():
+    cache = ProjectionCache()
+    mesh = Cube(Point3D(100, 100, 0), 50).mesh
+    cache.begin_frame("view")
+    cache.project_mesh(mesh)
+    cache.begin_frame("view")
+    screen = cache.project_mesh(mesh)
+
+    np.testing.assert_array_equal(screen, project(mesh.vertices))
+    assert (cache.projected, cache.reused) == (0, 8)
+
+def test_only_changed_rows_are_reprojected():
+    cache = ProjectionCache()
+    mesh = Cube(Point3D(100, 100, 0), 50).mesh
+    cache.begin_frame("view")
+    cache.project_mesh(mesh)
+
+    mesh.rotate(Point3D(125, 125, 25), 0.3, Plane((0, 1)), np.array([0, 3]))
+    cache.begin_frame("view")
+    np.testing.assert_allclose(cache.project_mesh(mesh), project(mesh.vertices))
+    assert (cache.projected, cache.reused) == (2, 6)
+
+def test_view_changes_drop_everything():
+    cache = ProjectionCache()
+    mesh = Cube(Point3D(100, 100, 0), 50).mesh
+    cache.begin_frame("view")
+    cache.project_mesh(mesh)
+
+    cache.begin_frame("other view", lambda vertices: vertices[:, :2] * 2)
+    np.testing.assert_array_equal(cache.project_mesh(mesh), mesh.vertices[:, :2] * 2)
+    assert cache.projected == 8
+
+def test_points_are_reprojected_once_they_move():
+    cache = ProjectionCache()
+    points = [Point3D(10, 20, 30), Point3D(400, 300, 0)]
+    cache.begin_frame("view")
+    cache.project_points(points)
+
+    points[0].setx(50)
+    cache.begin_frame("view")
+    screens = cache.project_points(points)
+
+    np.testing.assert_allclose(screens, project(np.array([point.coords for point in points])))
+    assert (cache.projected, cache.reused) == (1, 1)
+
+def test_points_not_drawn_last_frame_are_dropped():
+    cache = ProjectionCache()
+    point = Point3D(10, 20, 30)
+    cache.begin_frame("view")
+    cache.project_points([point])
+    cache.begin_frame("view")
+    cache.begin_frame("view")
+    cache.project_points([point])
+
+    assert cache.projected == 1
+
+def test_point_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(ProjectionCacheModule, "POINT_CACHE_SIZE", 4)
+    cache = ProjectionCache()
+    points = [Point3D(i, i, i) for i in range(10)]
+    cache.begin_frame("view")
+    for point in points:
+        cache.project_points([point])
+    cache.project_points(points[-4:])
+
+    assert cache.projected == 10 and cache.reused == 4
+    cache.project_points(points[:1])
+    assert cache.projected == 11
@@ -0,0 +1,101 @@
+import numpy as np
+import pygame as pg
+import pytest
+
+from utils.Raster import Rasterizer, frame_buffers
+
+SIZE = (40, 30)
+WHITE, RED, BLUE = (255, 255, 255), (255, 0, 0), (0, 0, 255)
+
+def interpenetrating():
+    """
+    Two triangles covering the whole frame: the first slopes from depth 0 on the left to 10 on the right, the
+    second is flat at depth 5, so they cross at x = 15.
+    """
+    screen = np.array([(-10, -10), (90, -10), (-10, 90)] * 2, dtype=np.float64)
+    depth = np.array([0, 20, 0, 5, 5, 5], dtype=np.float64)
+    return screen, depth, np.array([[0, 1, 2], [3, 4, 5]]), np.array([RED, BLUE], dtype=np.uint8)
+
+def test_nearest_surface_wins_per_pixel():
+    rasterizer = Rasterizer(SIZE)
+    rasterizer.draw_triangles(*interpenetrating())
+
+    # Depth of the sloped triangle at pixel center x + 0.5 is (x + 10.5) / 5.
+    left, right = rasterizer.color[:15], rasterizer.color[15:]
+    assert np.all(left == RED) and np.all(right == BLUE)
+    np.testing.assert_allclose(rasterizer.depth[:15, 0], (np.arange(15) + 10.5) / 5, rtol=1e-6)
+    assert np.all(rasterizer.depth[15:] == 5)
+
+def test_submission_order_does_not_matter():
+    screen, depth, triangles, colors = interpenetrating()
+    forward, backward = Rasterizer(SIZE), Rasterizer(SIZE)
+    forward.draw_triangles(screen, depth, triangles, colors)
+    backward.draw_triangles(screen, depth, triangles[::-1], colors[::-1])
+
+    np.testing.assert_array_equal(forward.color, backward.color)
+
+def test_equal_depth_keeps_what_was_drawn_first():
+    rasterizer = Rasterizer(SIZE)
+    screen = np.array([(0, 0), (40, 0), (0, 40)], dtype=np.float64)
+    rasterizer.draw_triangles(screen, np.full(3, 1 / 3), np.array([[0, 1, 2]]), np.array([RED]))
+    rasterizer.draw_triangles(screen, np.full(3, 1 / 3), np.array([[0, 1, 2]]), np.array([BLUE]))
+
+    assert rasterizer.color[0, 0].tolist() == list(RED)
+
+def test_bounds_clip_drawing():
+    rasterizer = Rasterizer(SIZE)
+    rasterizer.draw_triangles(*interpenetrating(), bounds=(5, 5, 15, 12))
+
+    drawn = np.any(rasterizer.color != WHITE, axis=2)
+    assert drawn[5:15, 5:12].all()
+    assert drawn.sum() == 10 * 7
+    assert np.all(np.isinf(rasterizer.depth[~drawn]))
+
+def test_small_chunks_draw_the_same_frame():
+    rng = np.random.default_rng(0)
+    screen = rng.uniform(-5, 45, (300, 2))
+    depth = rng.uniform(0, 100, 300)
+    triangles = rng.integers(0, 300, (100, 3))
+    colors = rng.integers(0, 256, (100, 3))
+
+    whole, chunked = Rasterizer(SIZE), Rasterizer(SIZE, chunk_pixels=7)
+    whole.draw_triangles(screen, depth, triangles, colors)
+    chunked.draw_triangles(screen, depth, triangles, colors)
+
+    np.testing.assert_array_equal(whole.color, chunked.color)
+    np.testing.assert_array_equal(whole.depth, chunked.depth)
+
+def test_clear_resets_only_the_given_rects():
+    rasterizer = Rasterizer(SIZE, background=(10, 20, 30))
+    rasterizer.draw_triangles(*interpenetrating())
+    rasterizer.clear([pg.Rect(2, 3, 5, 4)])
+
+    assert np.all(rasterizer.color[2:7, 3:7] == (10, 20, 30))
+    assert np.all(np.isinf(rasterizer.depth[2:7, 3:7]))
+    assert np.all(rasterizer.color[7:15] == RED)
+
+    rasterizer.clear()
+    assert np.all(rasterizer.color == (10, 20, 30)) and np.all(np.isinf(rasterizer.depth))
+
+def test_blit_copies_the_frame_or_just_the_rects():
+    rasterizer = Rasterizer(SIZE)
+    rasterizer.draw_triangles(*interpenetrating())
+    surface = pg.Surface(SIZE)
+
+    rasterizer.blit(surface)
+    np.testing.assert_array_equal(pg.surfarray.array3d(surface), rasterizer.color)
+
+    surface.fill((0, 0, 0))
+    rasterizer.blit(surface, [pg.Rect(0, 0, 5, 5), pg.Rect(35, 25, 10, 10)])
+    pixels = pg.surfarray.array3d(surface)
+    np.testing.assert_array_equal(pixels[:5, :5], rasterizer.color[:5, :5])
+    np.testing.assert_array_equal(pixels[35:, 25:], rasterizer.color[35:, 25:])
+    assert np.all(pixels[5:35] == 0)
+
+def test_buffers_must_be_laid_out_by_rows():
+    color, depth = frame_buffers(SIZE)
+    assert color.shape == (40, 30, 3) and depth.dtype == np.float32
+    Rasterizer(SIZE, color=color, depth=depth)
+
+    with pytest.raises(ValueError):
+        Rasterizer(SIZE, color=np.zeros((40, 30, 3), dtype=np.uint8), depth=depth)
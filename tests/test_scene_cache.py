@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+from exceptions.GraphicsExceptions import MeshFormatError
+from utils.Mesh import Mesh
+from utils.Point import Point3D
+from utils.Polygon import Cube, Prism, Polygon3D, CompositeShape
+from utils.SceneCache import save_scene, load_scene, read_key, cached_scene, source_key
+from utils.Transform import Transform
+
+def pyramid(x, y, z, size):
+    # A square base and four triangles, so the scene mixes face sizes.
+    corners = [(x, y, z), (x + size, y, z), (x + size, y, z + size), (x, y, z + size), (x + size/2, y - size, z + size/2)]
+    return Polygon3D.from_mesh(Mesh(corners, [[0, 1, 2, 3], [1, 0, 4], [2, 1, 4], [3, 2, 4], [0, 3, 4]]))
+
+def scene():
+    inner = CompositeShape([pyramid(5, 5, 5, 3), Prism(Point3D(0, 20, 0), 8, 2, 4)])
+    return CompositeShape([Cube(Point3D(0, 0, 0), 10), inner, Cube(Point3D(30, 0, 0), 4)])
+
+def meshes(shape):
+    # Depth first, through nested composites.
+    if isinstance(shape, CompositeShape):
+        return [mesh for component in shape.components for mesh in meshes(component)]
+    return [shape.mesh]
+
+def assert_same_meshes(a, b):
+    assert len(meshes(a)) == len(meshes(b))
+    for saved, loaded in zip(meshes(a), meshes(b)):
+        np.testing.assert_array_equal(saved.vertices, loaded.vertices)
+        np.testing.assert_array_equal(saved.indices, loaded.indices)
+        np.testing.assert_array_equal(saved.offsets, loaded.offsets)
+        np.testing.assert_array_equal(saved.colors, loaded.colors)
+
+def test_round_trip_keeps_the_hierarchy(tmp_path):
+    path = str(tmp_path / "scene.bin")
+    original = scene()
+    save_scene(path, original, key="v1")
+    loaded = load_scene(path)
+
+    assert_same_meshes(original, loaded)
+    assert isinstance(loaded.components[1], CompositeShape)
+    assert isinstance(loaded.components[0], Polygon3D) and len(loaded.components[1].components) == 2
+    assert read_key(path) == "v1"
+
+def test_single_polygon_round_trip(tmp_path):
+    path = str(tmp_path / "cube.bin")
+    cube = Cube(Point3D(1, 2, 3), 5)
+    save_scene(path, cube)
+    loaded = load_scene(path)
+
+    assert isinstance(loaded, Polygon3D)
+    np.testing.assert_array_equal(loaded.mesh.vertices, cube.mesh.vertices)
+
+def test_transforming_a_loaded_scene_leaves_the_file_alone(tmp_path):
+    path = str(tmp_path / "scene.bin")
+    save_scene(path, scene())
+
+    loaded = load_scene(path)
+    loaded.transform(Transform.translation((100, 0, 0)))
+    meshes(loaded)[0].vertices
+
+    assert_same_meshes(scene(), load_scene(path))
+
+def test_cached_scene_rebuilds_only_when_the_key_changes(tmp_path):
+    path = str(tmp_path / "scene.bin")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return scene()
+
+    cached_scene(path, build, key="a")
+    assert_same_meshes(scene(), cached_scene(path, build, key="a"))
+    cached_scene(path, build, key="b")
+
+    assert len(builds) == 2
+
+def test_read_key_of_other_files(tmp_path):
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a scene")
+
+    assert read_key(str(other)) is None
+    assert read_key(str(tmp_path / "missing.bin")) is None
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / "scene.bin"
+    save_scene(str(path), scene())
+    path.write_bytes(path.read_bytes()[:200])
+
+    with pytest.raises(MeshFormatError):
+        load_scene(str(path))
+
+def test_source_key_follows_the_source_files(tmp_path):
+    source = tmp_path / "model.obj"
+    source.write_text("v 0 0 0\n")
+    key = source_key(str(source))
+
+    assert source_key(str(source)) == key
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert source_key(str(source)) != key
@@ -0,0 +1,101 @@
+import numpy as np
+
+from utils import Mesh as MeshModule
+from utils.Mesh import newell_normals, unit_normals
+from utils.Point import Point3D, Plane
+from utils.Polygon import Cube, Sphere
+from utils.SceneGraph import SceneNode
+from utils.Transform import Transform
+
+def spin(angle):
+    return Transform.rotation(Point3D(0, 0, 0), angle, Plane((0, 2)))
+
+def scene():
+    """
+    root -> arm -> hand, and a static sibling of arm.
+    """
+    hand = SceneNode(Cube(Point3D(0, 0, 0), 10), Transform.translation((0, 50, 0)), name="hand")
+    arm = SceneNode(Sphere(Point3D(0, 0, 0), 20), Transform.translation((100, 0, 0)), [hand], name="arm")
+    sibling = SceneNode(Cube(Point3D(0, 0, 0), 30), Transform.translation((-100, 0, 0)), name="sibling")
+    return SceneNode(None, spin(0.3), [arm, sibling], name="root"), arm, hand, sibling
+
+def test_world_transforms_compose_down_the_tree():
+    root, arm, hand, _ = scene()
+    expected = spin(0.3) @ Transform.translation((100, 0, 0)) @ Transform.translation((0, 50, 0))
+
+    np.testing.assert_allclose(hand.world.matrix, expected.matrix)
+    np.testing.assert_allclose(hand.world_mesh.vertices, expected.apply(hand.mesh.vertices))
+    assert len(root.meshes) == 3
+
+def test_moving_a_parent_reresolves_only_its_subtree():
+    root, arm, hand, sibling = scene()
+    meshes = root.meshes
+    worlds = [node.world for node in (arm, hand, sibling)]
+    versions = [mesh.version for mesh in meshes]
+
+    arm.translate((0, 0, 25))
+    moved = root.meshes
+
+    assert arm.world is not worlds[0] and hand.world is not worlds[1]
+    assert sibling.world is worlds[2]
+    assert [a is b for a, b in zip(moved, meshes)] == [True] * 3
+    assert [mesh.version != version for mesh, version in zip(moved, versions)] == [True, True, False]
+    np.testing.assert_allclose(hand.world_mesh.vertices, hand.world.apply(hand.mesh.vertices))
+
+def test_reading_twice_costs_nothing():
+    root, _, hand, _ = scene()
+    mesh = hand.world_mesh
+    version = mesh.version
+
+    assert hand.world_mesh is mesh and mesh.version == version
+
+def test_moving_nodes_never_touches_the_source_meshes():
+    root, arm, hand, _ = scene()
+    source = hand.mesh.vertices.copy()
+    root.meshes
+    arm.rotate(Point3D(0, 0, 0), 0.5, Plane((0, 1)))
+    root.meshes
+
+    np.testing.assert_array_equal(hand.mesh.vertices, source)
+
+def test_identity_nodes_draw_their_source():
+    node = SceneNode(Cube(Point3D(0, 0, 0), 10))
+
+    assert node.world_mesh is node.mesh
+
+def test_source_edits_are_picked_up():
+    root, arm, _, _ = scene()
+    arm.world_mesh
+    arm.mesh.transform(Transform.scaling(2))
+
+    np.testing.assert_allclose(arm.world_mesh.vertices, arm.world.apply(arm.mesh.vertices))
+
+def test_structure_changes_update_the_drawn_meshes():
+    root, arm, hand, sibling = scene()
+    assert len(root.meshes) == 3
+
+    root.remove(arm)
+    assert len(root.meshes) == 1
+    sibling.add(hand)
+    assert len(root.meshes) == 2
+    np.testing.assert_allclose(hand.world.matrix, (root.world @ sibling.local @ hand.local).matrix)
+
+def test_moves_carry_normals_over(monkeypatch):
+    root, arm, hand, _ = scene()
+    hand.world_mesh.normals()
+    # The first move computes the source's normals, once.
+    arm.translate((0, 0, 5))
+    hand.world_mesh
+
+    def fail(*args):
+        raise AssertionError("normals were recomputed")
+
+    monkeypatch.setattr(MeshModule, "newell_normals", fail)
+    for angle in (0.2, 0.4, 0.8):
+        arm.rotate(Point3D(0, 0, 0), angle, Plane((1, 2)))
+        mesh = hand.world_mesh
+        monkeypatch.setattr(MeshModule, "newell_normals", newell_normals)
+        expected = unit_normals(newell_normals(mesh.vertices, mesh.indices, mesh.offsets))
+        monkeypatch.setattr(MeshModule, "newell_normals", fail)
+
+        np.testing.assert_allclose(mesh.normals(), expected, atol=1e-9)
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from utils import Mesh as MeshModule
+from utils.Mesh import Mesh, newell_normals, unit_normals
+from utils.Point import Point3D, Plane
+from utils.Polygon import Cube, Prism
+from utils.Shading import Shader
+from utils.Transform import Transform
+
+def recomputed(mesh):
+    return unit_normals(newell_normals(mesh.vertices, mesh.indices, mesh.offsets))
+
+def no_recompute(monkeypatch):
+    def fail(*args):
+        raise AssertionError("normals were recomputed")
+
+    monkeypatch.setattr(MeshModule, "newell_normals", fail)
+
+def test_cube_normals_are_unit_axes_pointing_outwards():
+    mesh = Cube(Point3D(0, 0, 0), 10).mesh
+    normals = mesh.normals()
+
+    np.testing.assert_allclose(np.abs(normals).sum(axis=1), 1)
+    outwards = np.einsum("ij,ij->i", normals, mesh.face_centers() - 5)
+    assert np.all(outwards > 0)
+
+@pytest.mark.parametrize("transform", [
+    Transform.rotation(Point3D(3, 4, 5), 0.7, Plane((0, 2))) @ Transform.rotation(Point3D(0, 0, 0), 1.1, Plane((0, 1))),
+    Transform.scaling((2, 0.5, 3), Point3D(1, 1, 1)),
+    Transform.scaling((-1, 1, 1)),
+    Transform.translation((10, -20, 30)) @ Transform.scaling((1, 4, 1)),
+])
+def test_transforms_carry_normals_over(transform, monkeypatch):
+    # Tilted so that no normal lies along an axis, non-uniform scalings then change their directions.
+    mesh = Cube(Point3D(0, 0, 0), 50).mesh
+    mesh.transform(Transform.rotation(Point3D(25, 25, 25), 0.5, Plane((0, 1))) @ Transform.rotation(Point3D(25, 25, 25), 0.4, Plane((1, 2))))
+    mesh.normals()
+    expected = recomputed(mesh.transformed(transform))
+
+    mesh.transform(transform)
+    no_recompute(monkeypatch)
+    np.testing.assert_allclose(mesh.normals(), expected, atol=1e-9)
+
+def test_transformed_copies_carry_normals_over(monkeypatch):
+    mesh = Cube(Point3D(0, 0, 0), 10).mesh
+    normals = mesh.normals().copy()
+    transform = Transform.rotation(Point3D(0, 0, 0), 0.3, Plane((1, 2)))
+    expected = recomputed(mesh.transformed(transform))
+
+    no_recompute(monkeypatch)
+    moved = mesh.transformed(transform)
+    np.testing.assert_allclose(moved.normals(), expected, atol=1e-9)
+    np.testing.assert_array_equal(mesh.normals(), normals)
+
+def test_flattening_transforms_recompute_normals():
+    mesh = Cube(Point3D(0, 0, 0), 10).mesh
+    mesh.normals()
+    mesh.transform(Transform.scaling((1, 1, 0)))
+
+    np.testing.assert_allclose(mesh.normals(), recomputed(mesh))
+    assert np.sum(np.linalg.norm(mesh.normals(), axis=1) == 0) == 4
+
+def test_vertex_edits_recompute_normals():
+    mesh = Mesh([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [[0, 1, 2]])
+    np.testing.assert_allclose(mesh.normals(), [[0, 0, 1]])
+
+    mesh.vertices[2] = (0, 0, 1)
+    mesh.touch([2])
+    np.testing.assert_allclose(mesh.normals(), [[0, -1, 0]])
+
+def test_concatenate_keeps_cached_normals(monkeypatch):
+    meshes = [Cube(Point3D(0, 0, 0), 10).mesh, Prism(Point3D(50, 0, 0), 10, 20, 5).mesh]
+    expected = np.concatenate([mesh.normals() for mesh in meshes])
+
+    no_recompute(monkeypatch)
+    np.testing.assert_array_equal(Mesh.concatenate(meshes).normals(), expected)
+
+def facing(*normals):
+    # One triangle per normal, wound so that Newell's method gives that normal.
+    vertices, faces = [], []
+    for normal in normals:
+        normal = np.asarray(normal, dtype=np.float64)
+        side = np.cross(normal, (1, 0, 0) if abs(normal[0]) < 0.9 else (0, 1, 0))
+        up = np.cross(normal, side)
+        faces.append([len(vertices), len(vertices) + 1, len(vertices) + 2])
+        vertices += [(0, 0, 0), side, up]
+
+    return Mesh(vertices, faces, (200, 100, 50))
+
+def test_shader_modes():
+    direction = np.array([0.5, 1, 2]) / np.linalg.norm([0.5, 1, 2])
+    mesh = facing(-direction, direction)
+    np.testing.assert_allclose(mesh.normals(), [-direction, direction], atol=1e-9)
+
+    np.testing.assert_array_equal(Shader("flat").shade(mesh), mesh.colors)
+    np.testing.assert_array_equal(Shader("ambient", ambient=0.5).shade(mesh), [[100, 50, 25]] * 2)
+    # Facing the light gets ambient + diffuse, facing away ambient only.
+    np.testing.assert_array_equal(Shader("lambert", ambient=0.25, diffuse=0.5).shade(mesh), [[150, 75, 37], [50, 25, 12]])
+
+def test_shader_clips_and_selects_faces():
+    mesh = facing((0, 0, -1), (0, 0, 1), (0, -1, 0))
+    shader = Shader("lambert", direction=(0, 0, 1), ambient=1, diffuse=1)
+
+    np.testing.assert_array_equal(shader.shade(mesh, np.array([2, 0])), [[200, 100, 50], [255, 200, 100]])
+    with pytest.raises(ValueError):
+        Shader("phong")
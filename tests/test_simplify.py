@@ -0,0 +1,97 @@
+import numpy as np
+
+from utils.LOD import LODShape
+from utils.Mesh import Mesh
+from utils.Simplify import simplify
+from utils.Transform import Transform
+
+def grid(size, color=(0, 255, 0)):
+    x, y = np.meshgrid(np.arange(size + 1), np.arange(size + 1), indexing="ij")
+    vertices = np.column_stack([x.ravel(), y.ravel(), np.zeros(x.size)]).astype(np.float64) * 10
+    corners = np.arange(size * (size + 1)).reshape(size, size + 1)[:, :-1].ravel()
+    quads = np.column_stack([corners, corners + size + 1, corners + size + 2, corners + 1])
+
+    return Mesh(vertices, quads, np.tile(color, (len(quads), 1)))
+
+def ball(center, radius, segments=24, rings=12):
+    # A closed UV sphere, triangle fans around the poles and quads in between.
+    polar = np.arange(1, rings)[:, None] * np.pi / rings
+    azimuth = np.arange(segments) * 2 * np.pi / segments
+    ring = np.stack([np.sin(polar) * np.cos(azimuth), -np.cos(polar) * np.ones(segments), np.sin(polar) * np.sin(azimuth)], axis=-1)
+    vertices = np.vstack([[0, -1, 0], ring.reshape(-1, 3), [0, 1, 0]]) * radius + center
+
+    def at(k, j):
+        return 1 + k * segments + j % segments
+
+    bottom = len(vertices) - 1
+    faces = [[0, at(0, j), at(0, j + 1)] for j in range(segments)]
+    faces += [[at(k, j), at(k + 1, j), at(k + 1, j + 1), at(k, j + 1)] for k in range(rings - 2) for j in range(segments)]
+    faces += [[bottom, at(rings - 2, j + 1), at(rings - 2, j)] for j in range(segments)]
+
+    return Mesh(vertices, faces)
+
+def test_face_count_reaches_the_target():
+    sphere = ball((0, 0, 0), 100, segments=32, rings=16)
+    simplified = simplify(sphere, 200)
+
+    assert 100 <= simplified.face_count <= 200
+    assert simplified.face_sizes.tolist() == [3] * simplified.face_count
+
+def test_input_is_not_modified():
+    sphere = ball((0, 0, 0), 100)
+    vertices, indices = sphere.vertices.copy(), sphere.indices.copy()
+    simplify(sphere, 50)
+
+    np.testing.assert_array_equal(sphere.vertices, vertices)
+    np.testing.assert_array_equal(sphere.indices, indices)
+
+def test_shape_is_kept():
+    simplified = simplify(ball((5, 5, 5), 100, segments=32, rings=16), 300)
+    radii = np.linalg.norm(simplified.vertices - 5, axis=1)
+
+    assert np.all(np.abs(radii - 100) < 10)
+
+def test_flat_grid_stays_flat_and_keeps_its_outline():
+    simplified = simplify(grid(16), 64)
+
+    assert simplified.face_count <= 64
+    np.testing.assert_allclose(simplified.vertices[:, 2], 0, atol=1e-9)
+    np.testing.assert_allclose(simplified.vertices.min(axis=0), [0, 0, 0], atol=1e-6)
+    np.testing.assert_allclose(simplified.vertices.max(axis=0), [160, 160, 0], atol=1e-6)
+
+def test_triangles_keep_their_face_colours():
+    simplified = simplify(grid(8, color=(12, 34, 56)), 20)
+
+    assert np.all(simplified.colors == (12, 34, 56))
+
+def test_build_makes_coarser_levels():
+    lod = LODShape.build(ball((0, 0, 0), 100, segments=48, rings=24), count=4, ratio=0.25)
+    counts = [level.face_count for level in lod.levels]
+
+    assert len(counts) == 4
+    assert all(coarse < fine for fine, coarse in zip(counts, counts[1:]))
+    assert lod.screen_sizes[-1] == 0 and np.all(np.diff(lod.screen_sizes) < 0)
+
+def test_build_stops_at_min_faces():
+    lod = LODShape.build(grid(4), count=10, ratio=0.5, min_faces=6)
+
+    assert all(level.face_count >= 6 for level in lod.levels[1:])
+    assert int(lod.levels[-1].face_count * 0.5) < 6
+
+def test_selection_has_hysteresis():
+    lod = LODShape([grid(4), grid(2), grid(1)], screen_sizes=[100, 50, 0], hysteresis=0.2)
+
+    assert lod.select(10) == 2
+    assert lod.select(55) == 2
+    assert lod.select(65) == 1
+    assert lod.select(45) == 1
+    assert lod.select(35) == 2
+    assert lod.select(1000) == 0
+    assert lod.mesh is lod.levels[0]
+
+def test_transforms_reach_every_level():
+    lod = LODShape([grid(4), grid(2)])
+    lod.transform(Transform.translation((0, 0, 7)))
+
+    for level in lod.levels:
+        np.testing.assert_allclose(level.vertices[:, 2], 7)
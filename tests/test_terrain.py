@@ -0,0 +1,117 @@
+import gc
+import logging
+import weakref
+
+import numpy as np
+import pygame as pg
+import pytest
+
+from utils.Camera import Camera
+from utils.Generators import grid
+from utils.Render import Render
+from utils.Terrain import ChunkedTerrain, HeightfieldChunks, value_noise
+
+SIZE = 100
+
+class Source:
+    """
+    Flat chunks that record the order they were asked for, optionally failing for some of them.
+    """
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    def __call__(self, i, j):
+        self.calls.append((i, j))
+        if (i, j) in self.failing:
+            raise RuntimeError(f"no chunk {(i, j)}")
+        return grid(2, 2, (SIZE / 2, SIZE / 2), (i * SIZE, 0, j * SIZE))
+
+def at(i, j):
+    return (i * SIZE + SIZE / 2, 0, j * SIZE + SIZE / 2)
+
+def test_nearest_chunks_are_built_first():
+    source = Source()
+    terrain = ChunkedTerrain(source, SIZE, radius=1, workers=0)
+    terrain.update(at(0, 0))
+
+    assert source.calls[0] == (0, 0)
+    assert sorted(source.calls[1:5]) == [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    assert len(source.calls) == len(terrain) == len(terrain.meshes) == 9
+
+def test_chunks_that_left_longest_ago_are_evicted_first():
+    source = Source()
+    terrain = ChunkedTerrain(source, SIZE, radius=1, cache_size=12, workers=0)
+    terrain.update(at(0, 0))
+    terrain.update(at(1, 0))
+    assert terrain.evicted == 0 and len(terrain) == 12
+
+    # Moving on drops the column left behind first, never what is in view.
+    terrain.update(at(2, 0))
+    assert terrain.evicted == 3
+    source.calls.clear()
+    terrain.update(at(1, 0))
+    assert source.calls == []
+    terrain.update(at(0, 0))
+    assert sorted(source.calls) == [(-1, -1), (-1, 0), (-1, 1)]
+    assert len(terrain) == 12
+
+def test_chunks_are_built_in_the_background():
+    terrain = ChunkedTerrain(HeightfieldChunks(value_noise, SIZE, resolution=8), SIZE, radius=1, workers=2)
+    try:
+        terrain.update(at(0, 0))
+        assert len(terrain.meshes) + terrain.pending == 9
+
+        terrain.wait(at(0, 0))
+        assert terrain.pending == 0 and len(terrain.meshes) == 9
+        assert all(mesh._has_normals() for mesh in terrain.meshes)
+    finally:
+        terrain.close()
+
+def test_neighbouring_chunks_meet():
+    source = HeightfieldChunks(value_noise, SIZE, resolution=8)
+    left, right = source(0, 0), source(1, 0)
+
+    np.testing.assert_allclose(left.vertices.reshape(9, 9, 3)[:, -1], right.vertices.reshape(9, 9, 3)[:, 0])
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_failed_chunks_are_skipped_and_kept(workers, caplog):
+    source = Source(failing=[(1, 0)])
+    terrain = ChunkedTerrain(source, SIZE, radius=1, workers=workers)
+    try:
+        with caplog.at_level(logging.ERROR, logger="utils.Terrain"):
+            terrain.wait(at(0, 0))
+            terrain.update(at(0, 0))
+
+        assert len(terrain.meshes) == 8
+        assert isinstance(terrain.errors[(1, 0)], RuntimeError)
+        assert source.calls.count((1, 0)) == 1
+        assert "(1, 0)" in caplog.text
+
+        terrain.clear()
+        terrain.wait(at(0, 0))
+        assert source.calls.count((1, 0)) == 2
+    finally:
+        terrain.close()
+
+def test_evicted_chunks_are_not_kept_alive_by_render():
+    terrain = ChunkedTerrain(Source(), SIZE, radius=1, workers=0)
+    camera = Camera(0, 0, 0, 0, 0)
+    render = Render(camera, pg.Surface((320, 240)))
+
+    def frame(i):
+        camera.x = at(i, 0)[0] - camera.position[0] + camera.x
+        render.begin_frame()
+        render.draw_polygon(terrain)
+        render.end_frame()
+
+    frame(0)
+    first = [weakref.ref(mesh) for mesh in terrain.meshes]
+    for i in range(1, 8):
+        frame(i * 3)
+    gc.collect()
+
+    assert terrain.evicted > 0
+    assert all(ref() is None for ref in first)
+    render.close()
@@ -0,0 +1,81 @@
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pygame as pg
+import pytest
+
+from utils.Raster import Rasterizer
+from utils.TiledRaster import TiledRasterizer, _attach
+
+SIZE = (300, 200)
+
+def scene(seed=0, count=400):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform((-20, -20), (320, 220), (count, 1, 2))
+    screen = (centers + rng.normal(0, 25, (count, 3, 2))).reshape(-1, 2)
+    depth = rng.uniform(0, 1000, count * 3)
+
+    return screen, depth, np.arange(count * 3).reshape(-1, 3), rng.integers(0, 256, (count, 3))
+
+@pytest.fixture(params=[0, 2], ids=["serial", "pool"])
+def tiled(request):
+    rasterizer = TiledRasterizer(SIZE, tile_size=(64, 48), workers=request.param)
+    yield rasterizer
+    rasterizer.close()
+
+def test_frames_match_the_rasterizer(tiled):
+    reference = Rasterizer(SIZE)
+    for seed in range(3):
+        reference.draw_triangles(*scene(seed))
+        tiled.draw_triangles(*scene(seed))
+
+    np.testing.assert_array_equal(tiled.color, reference.color)
+    np.testing.assert_array_equal(tiled.depth, reference.depth)
+
+def test_clearing_matches_the_rasterizer(tiled):
+    reference = Rasterizer(SIZE)
+    rects = [pg.Rect(10, 10, 150, 120), pg.Rect(250, 150, 100, 100), pg.Rect(0, 190, 5, 5)]
+
+    for rasterizer in (reference, tiled):
+        rasterizer.draw_triangles(*scene())
+        rasterizer.clear(rects)
+    np.testing.assert_array_equal(tiled.color, reference.color)
+    np.testing.assert_array_equal(tiled.depth, reference.depth)
+
+    tiled.clear()
+    assert np.all(tiled.color == 255) and np.all(np.isinf(tiled.depth))
+
+def test_blit_shows_the_shared_frame(tiled):
+    tiled.draw_triangles(*scene())
+    surface = pg.Surface(SIZE)
+    tiled.blit(surface)
+
+    np.testing.assert_array_equal(pg.surfarray.array3d(surface), tiled.color)
+
+def test_close_unlinks_the_shared_memory():
+    rasterizer = TiledRasterizer(SIZE, workers=2)
+    rasterizer.draw_triangles(*scene(count=5000))
+    names = [memory.name for memory in rasterizer._owned]
+    rasterizer.close()
+
+    assert len(names) == 3
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+def test_attaching_does_not_register_with_the_resource_tracker(monkeypatch):
+    # Workers attach to segments the main process owns and unlinks, the tracker must only know them from there.
+    owner = shared_memory.SharedMemory(create=True, size=64)
+    registered = []
+    monkeypatch.setattr(resource_tracker, "register", lambda name, rtype: registered.append(name))
+    register = resource_tracker.register
+
+    try:
+        attached = _attach(owner.name)
+        attached.close()
+    finally:
+        owner.close()
+        owner.unlink()
+
+    assert registered == []
+    assert resource_tracker.register is register
@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+import pytest
+
+from utils.Point import Point3D, Plane
+from utils.Transform import Transform
+
+XZ = Plane((0, 2))
+
+def test_composition_applies_the_right_operand_first():
+    move = Transform.translation((1, 0, 0))
+    double = Transform.scaling(2)
+
+    np.testing.assert_allclose((double @ move).apply([(1, 1, 1)]), [(4, 2, 2)])
+    np.testing.assert_allclose((move @ double).apply([(1, 1, 1)]), [(3, 2, 2)])
+    assert (double * move).matrix.tolist() == (double @ move).matrix.tolist()
+
+def test_scaling_about_a_point_keeps_it_fixed():
+    about = Point3D(5, 6, 7)
+    scale = Transform.scaling((2, 3, 4), about)
+
+    np.testing.assert_allclose(scale.apply([about.coords]), [about.coords])
+    np.testing.assert_allclose(scale.apply([(6, 7, 8)]), [(7, 9, 11)])
+
+def test_rotation_matches_point_rotate():
+    about = Point3D(10, -4, 3)
+    point = Point3D(25, 8, -9)
+    rotation = Transform.rotation(about, 0.7 + math.pi, XZ)
+
+    np.testing.assert_allclose(rotation.apply_point(point).coords, point.rotate(about, 0.7, XZ).coords, atol=1e-9)
+
+def test_rotation_rejects_bad_arguments():
+    with pytest.raises(TypeError):
+        Transform.rotation((0, 0, 0), 1.0, XZ)
+    with pytest.raises(TypeError):
+        Transform.rotation(Point3D(0, 0, 0), "1", XZ)
+
+def test_inverse_undoes_the_transform():
+    transform = Transform.rotation(Point3D(1, 2, 3), 1.1, XZ) @ Transform.scaling(3) @ Transform.translation((4, 5, 6))
+    vertices = np.random.default_rng(0).uniform(-100, 100, (10, 3))
+
+    np.testing.assert_allclose(transform.inverse().apply(transform.apply(vertices)), vertices, atol=1e-9)
+    assert (transform.inverse() @ transform).matrix.round(12).tolist() == np.identity(4).tolist()
+    assert Transform.identity().is_identity()
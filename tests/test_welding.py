@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from exceptions.GraphicsExceptions import PolygonFaceError
+from utils.Mesh import Mesh
+from utils.Point import Point3D
+from utils.Polygon import Polygon3D, Cube
+from utils.Welding import weld_vertices
+
+TOLERANCE = 0.1
+
+def brute_force_groups(points, tolerance):
+    """
+    Group label (its smallest member) of every point, from every pairwise distance and a transitive closure.
+    """
+    close = np.linalg.norm(points[:, None] - points[None], axis=2) <= tolerance
+    labels = np.arange(len(points))
+    while True:
+        merged = np.where(close, labels[None], len(points)).min(axis=1)
+        if np.array_equal(merged, labels):
+            return labels
+        labels = merged
+
+def same_grouping(a, b):
+    return len(set(zip(a.tolist(), b.tolist()))) == len(set(a.tolist())) == len(set(b.tolist()))
+
+# The first point sits just below a cell boundary on every axis, its partner lies across it.
+@pytest.mark.parametrize("corner", [(0.09, 0.09, 0.09), (-0.01, -0.01, -0.01)])
+def test_points_across_a_cell_boundary_merge_just_under_the_tolerance(corner):
+    corner = np.array(corner)
+    direction = np.ones(3) / np.sqrt(3)
+    points = np.array([corner, corner + direction * TOLERANCE * 0.999, corner + 5, corner + 5 + direction * TOLERANCE * 1.001])
+
+    welded, inverse = weld_vertices(points, TOLERANCE)
+
+    assert inverse.tolist() == [0, 0, 1, 2]
+    np.testing.assert_array_equal(welded, points[[0, 2, 3]])
+
+def test_chains_merge_transitively():
+    # Only neighbours are within the tolerance, the ends are 0.32 apart.
+    points = np.array([(x, 0, 0) for x in (0.0, 0.08, 0.16, 0.24, 0.32)] + [(0.45, 0, 0)])
+    welded, inverse = weld_vertices(points, TOLERANCE)
+
+    assert inverse.tolist() == [0, 0, 0, 0, 0, 1]
+    np.testing.assert_array_equal(welded, points[[0, 5]])
+
+def test_matches_brute_force():
+    points = np.random.default_rng(0).random((400, 3)) * 1.5
+    welded, inverse = weld_vertices(points, TOLERANCE)
+
+    assert same_grouping(inverse, brute_force_groups(points, TOLERANCE))
+    # Every welded vertex keeps the first of its points.
+    np.testing.assert_array_equal(welded, points[np.unique(inverse, return_index=True)[1]])
+
+def test_zero_tolerance_merges_only_equal_points():
+    points = np.array([(0, 0, 0), (1, 0, 0), (0, 0, 0), (1e-12, 0, 0)])
+    welded, inverse = weld_vertices(points)
+
+    assert inverse.tolist() == [0, 1, 0, 2]
+    assert len(welded) == 3
+
+def cube_soup(jitter):
+    # Every face with its own corners, slightly moved, like an STL file stores them.
+    cube = Cube(Point3D(0, 0, 0), 10).mesh
+    corners = cube.vertices[cube.indices] + np.random.default_rng(1).uniform(-jitter, jitter, (len(cube.indices), 3))
+    return Mesh(corners, np.arange(len(corners)).reshape(-1, 4))
+
+def test_welding_a_face_soup_closes_it():
+    soup = cube_soup(1e-4)
+    assert not soup.is_closed()
+
+    welded = soup.weld(1e-3)
+    assert welded.vertex_count == 8
+    assert welded.is_closed() and welded.is_manifold()
+
+def test_open_box_is_not_closed():
+    cube = Cube(Point3D(0, 0, 0), 10).mesh
+    box = cube.submesh(np.arange(5))
+
+    assert not box.is_closed() and box.is_manifold()
+    with pytest.raises(PolygonFaceError, match="Unclosed"):
+        Polygon3D.from_mesh(box)
+
+def test_bowtie_edge_is_only_rejected_as_non_manifold():
+    # Two cubes touching along one edge: closed, but that edge has four faces.
+    a, b = Cube(Point3D(0, 0, 0), 10).mesh, Cube(Point3D(10, 10, 0), 10).mesh
+    bowtie = Mesh.concatenate([a, b]).weld()
+    poly = Polygon3D.from_mesh(bowtie)
+
+    assert bowtie.vertex_count == 14
+    assert bowtie.is_closed() and not bowtie.is_manifold()
+    poly.validate()
+    with pytest.raises(PolygonFaceError, match="Non-manifold"):
+        poly.validate(manifold=True)